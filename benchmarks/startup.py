@@ -0,0 +1,53 @@
+"""Benchmark the cold start of the CLI.
+
+Imports the CLI module in fresh interpreters with `python -X importtime` and
+reports the median import time and the slowest imports. Pass a module to
+measure another entry point, like `visoma.timers`.
+
+Usage:
+    python benchmarks/startup.py [module] [runs]
+"""
+
+import statistics
+import subprocess
+import sys
+
+
+def import_times(module):
+    """Returns the cumulative import time in microseconds per imported module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    module = sys.argv[1] if len(sys.argv) > 1 else "visoma.__cli__"
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    samples = [import_times(module) for _ in range(runs)]
+    total = statistics.median(times[module] for times in samples)
+
+    print(f"import {module}: {total / 1000:.1f} ms (median of {runs} runs)")
+    print(f"{len(samples[-1])} modules imported, slowest packages:")
+    top_level = {
+        name: statistics.median(times.get(name, 0) for times in samples)
+        for name in samples[-1]
+        if "." not in name or name.startswith("visoma.")
+    }
+    slowest = sorted(top_level.items(), key=lambda item: item[1], reverse=True)
+    for name, micros in slowest[1:11]:
+        print(f"  {name:<30}{micros / 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark structuring and unstructuring of a large timer list.
+
+Compares the global cattrs converter, which the models used before, with the
+per-model converter in `visoma.timers`.
+
+Usage:
+    python benchmarks/structuring.py [count]
+"""
+
+from datetime import datetime
+import sys
+import time
+
+import cattrs
+
+from visoma.timers import Timer
+
+
+def timer_dicts(count):
+    return [
+        {
+            "Id": i,
+            "UserId": i % 50,
+            "User": f"user-{i % 50}",
+            "Start": "2024-03-01 08:00:00",
+            "Stop": "2024-03-01 10:30:00",
+            "Description": f"Timer {i}",
+            "TicketId": i % 1000,
+            "TypeId": 3,
+            "Billable": i % 2 == 0,
+        }
+        for i in range(count)
+    ]
+
+
+def rate(func, items):
+    start = time.perf_counter()
+    result = [func(item) for item in items]
+    return result, len(items) / (time.perf_counter() - start)
+
+
+def global_structure(data):
+    return cattrs.structure(data, Timer)
+
+
+def global_to_dict(timer):
+    d = cattrs.unstructure(timer)
+    return {k: v for k, v in d.items() if v is not None}
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    data = timer_dicts(count)
+
+    cattrs.register_structure_hook(datetime, lambda v, _: datetime.fromisoformat(v))
+    cattrs.register_unstructure_hook(datetime, lambda v: v.isoformat(sep=" "))
+
+    timers, before = rate(global_structure, data)
+    _, before_dict = rate(global_to_dict, timers)
+    timers, after = rate(Timer.from_dict, data)
+    _, after_dict = rate(Timer.to_dict, timers)
+
+    print(f"{count} timers, objects per second")
+    print(f"{'':<12}{'global':>12}{'per-model':>12}")
+    print(f"{'from_dict':<12}{before:>12,.0f}{after:>12,.0f}")
+    print(f"{'to_dict':<12}{before_dict:>12,.0f}{after_dict:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,3 @@
-import fire
 import logging
 import sys
 
@@ -10,13 +9,49 @@ log = logging.getLogger(__name__)
 def main():
     logging.basicConfig(level=logging.WARNING)
 
+    # --profile[=PATH] profiles the command; fire never sees the flag.
+    path, argv = split_profile_flag(sys.argv[1:])
     try:
-        with VisomaClient.from_env() as client:
-            fire.Fire(client)
+        if path is None:
+            run(argv)
+        else:
+            from visoma.profiling import profiled
+
+            with profiled(path):
+                run(argv)
     except Exception as e:
         log.error(f"An error occurred: {e}")
         sys.exit(1)
 
 
+def run(argv):
+    # A command reads reference data repeatedly and lives shortly, so it
+    # caches it by default. A user runs it interactively, so it retries
+    # failed requests by default instead of failing at once.
+    with VisomaClient.from_env(cache="memory", retries=3) as client:
+        # Imported late, so invalid settings fail before paying for it.
+        import fire
+
+        fire.Fire(client, command=argv)
+
+
+def split_profile_flag(argv):
+    """Returns the path of `--profile[=PATH]`, empty for the default, and the other arguments."""
+    path = None
+    rest = []
+    for idx, arg in enumerate(argv):
+        if arg == "--":
+            # Flags after -- are those of fire.
+            rest += argv[idx:]
+            break
+        if arg == "--profile":
+            path = ""
+        elif arg.startswith("--profile="):
+            path = arg.partition("=")[2]
+        else:
+            rest.append(arg)
+    return path, rest
+
+
 if __name__ == "__main__":
     main()
@@ -1,9 +1,17 @@
-from datetime import datetime
-import cattrs
+from typing import TYPE_CHECKING
 
-from visoma.client import VisomaClient
+# The clients are imported on first access, so importing a single module of
+# the package (like the CLI does) does not import all of them.
+if TYPE_CHECKING:
+    from visoma.client import AsyncVisomaClient
+    from visoma.client import VisomaClient
 
-cattrs.register_structure_hook(datetime, lambda v, _: datetime.fromisoformat(v))
-cattrs.register_unstructure_hook(datetime, lambda v: v.isoformat(sep=" "))
+__all__ = ["AsyncVisomaClient", "VisomaClient"]
 
-__all__ = ["VisomaClient"]
+
+def __getattr__(name):
+    if name in __all__:
+        from visoma import client
+
+        return getattr(client, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
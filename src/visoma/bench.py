@@ -0,0 +1,270 @@
+"""Load generator for a Visoma service.
+
+Runs a mix of operations from a pool of threads, either as fast as the
+threads allow (closed loop) or at a target rate (open loop), and reports
+throughput, latency percentiles, error rates, requests and bytes per
+operation. Calls bypass the response cache and are not coalesced, so every
+call reaches the service.
+
+Writes create timers and close workdays, so the default mix only reads. Use
+writes against a local stand-in like `visoma.fakeserver`:
+
+    python -m visoma.fakeserver --port=8000 &
+    VISOMA_HOST=http://127.0.0.1:8000 visoma bench run --concurrency=16 \\
+        --mix=tickets.list:4,timers.list:4,timers.create:1,workdays.close:1
+"""
+
+from attrs import define
+from attrs import field
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+from itertools import count
+import httpx
+import logging
+import math
+import random
+import threading
+import time
+
+from visoma.http import HttpClient
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MIX = {"tickets.list": 1, "timers.list": 1}
+PERCENTILES = (50, 95, 99)
+
+
+@define
+class OperationStats:
+    """Measurements of one operation."""
+
+    latencies: list[float] = field(factory=list)
+    errors: int = 0
+    requests: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+
+    def summary(self) -> dict[str, float]:
+        calls = len(self.latencies)
+        latencies = sorted(self.latencies)
+        summary = {
+            "calls": calls,
+            "errors": self.errors,
+            "error_rate": self.errors / calls if calls else 0.0,
+        }
+        for p in PERCENTILES:
+            summary[f"p{p}_ms"] = percentile(latencies, p) * 1000
+        summary["requests"] = self.requests
+        summary["bytes_sent"] = self.bytes_sent
+        summary["bytes_received"] = self.bytes_received
+        return summary
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Returns the nearest-rank percentile of sorted values."""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def parse_mix(mix) -> dict[str, float]:
+    """Returns the weights of a mix like "tickets.list:4,timers.create:1"."""
+    if mix is None:
+        return dict(DEFAULT_MIX)
+    if isinstance(mix, str):
+        mix = dict(
+            (name.strip(), float(weight or 1))
+            for name, _, weight in (part.partition(":") for part in mix.split(","))
+            if name.strip()
+        )
+    unknown = set(mix) - set(OPERATIONS)
+    if unknown or not mix:
+        raise ValueError(
+            f"Operations of the mix must be some of {sorted(OPERATIONS)}: {mix}"
+        )
+    return {name: float(weight) for name, weight in mix.items()}
+
+
+def list_tickets(client, rng, limit, user_id):
+    from visoma.tickets import TicketsManager
+
+    TicketsManager(client=client).list(limit=limit)
+
+
+def list_timers(client, rng, limit, user_id):
+    from visoma.timers import TimersManager
+
+    TimersManager(client=client).list(limit=limit)
+
+
+def create_timer(client, rng, limit, user_id):
+    from visoma.timers import TimerRequest
+    from visoma.timers import TimersManager
+
+    start = datetime(2024, 1, 1, 8) + timedelta(days=rng.randrange(365))
+    request = TimerRequest(
+        UserId=user_id,
+        Start=start,
+        Stop=start + timedelta(minutes=rng.randrange(15, 240, 15)),
+        Description="Load test",
+    )
+    TimersManager(client=client).create(request)
+
+
+def close_workday(client, rng, limit, user_id):
+    from visoma.workdays import WorkdaysManager
+
+    day = date(2024, 1, 1) + timedelta(days=rng.randrange(365))
+    WorkdaysManager(client=client).close(day)
+
+
+OPERATIONS: dict[str, Callable] = {
+    "tickets.list": list_tickets,
+    "timers.list": list_timers,
+    "timers.create": create_timer,
+    "workdays.close": close_workday,
+}
+
+
+@define
+class BenchManager:
+    """Generates load on a Visoma service."""
+
+    client: HttpClient
+
+    def run(
+        self,
+        duration: float = 10.0,
+        concurrency: int = 8,
+        rate: float | None = None,
+        mix: str | dict[str, float] | None = None,
+        requests: int | None = None,
+        limit: int = 50,
+        user_id: int = 1,
+        seed: int = 0,
+    ) -> dict:
+        """Run a load test.
+
+        Args:
+            duration: Seconds to run.
+            concurrency: Number of threads making calls.
+            rate: Calls per second to start. Without a rate, each thread
+                starts the next call when the last one is done. With a rate,
+                latency counts from the planned start, so waiting for a free
+                thread is part of it.
+            mix: Weights of the operations, like "tickets.list:4,timers.list:1".
+                Operations are tickets.list, timers.list, timers.create and
+                workdays.close. The default mix only reads.
+            requests: Stop after this many calls, even before `duration`.
+            limit: Query limit of the list operations.
+            user_id: User of the created timers.
+            seed: Seed of the random choice of operations.
+
+        Returns:
+            Calls per second and, per operation and in total, the number of
+            calls and errors, the error rate, latency percentiles in
+            milliseconds, the number of requests the service answered,
+            retries included, and bytes sent and received. Received bytes
+            are those downloaded, so compressed bodies count compressed.
+        """
+        weights = parse_mix(mix)
+        if concurrency < 1 or (rate is not None and rate <= 0):
+            raise ValueError(
+                f"Concurrency and rate must be positive: {concurrency}, {rate}"
+            )
+        names = list(weights)
+        rng = random.Random(seed)
+        stats = {name: OperationStats() for name in names}
+        lock = threading.Lock()
+        calls = count()
+        current = threading.local()
+        # The responses of a call are counted once their bodies are read.
+        current.responses = None
+
+        def on_response(response):
+            responses = getattr(current, "responses", None)
+            if responses is not None:
+                responses.append(response)
+
+        # A client of its own, with the hook above and neither the cache nor
+        # the coalescing of identical requests. It shares the transport, so
+        # the connection pool, and the retries and rate limit of the client.
+        source = self.client.client
+        client = HttpClient(
+            httpx.Client(
+                base_url=source.base_url,
+                headers=source.headers,
+                timeout=source.timeout,
+                event_hooks={"response": [on_response]},
+                transport=source._transport,
+            ),
+            retry=self.client.retry,
+            limiter=self.client.limiter,
+        )
+
+        def worker():
+            while True:
+                with lock:
+                    idx = next(calls)
+                    name = rng.choices(names, [weights[n] for n in names])[0]
+                    call_seed = rng.random()
+                if requests is not None and idx >= requests:
+                    return
+                now = time.perf_counter()
+                due = start + idx / rate if rate else now
+                if due >= deadline or now >= deadline:
+                    return
+                if due > now:
+                    time.sleep(due - now)
+
+                current.responses = responses = []
+                try:
+                    OPERATIONS[name](client, random.Random(call_seed), limit, user_id)
+                    failed = False
+                except Exception as err:
+                    log.debug("%s failed: %s", name, err)
+                    failed = True
+                finally:
+                    current.responses = None
+                latency = time.perf_counter() - due
+                sent = 0
+                for response in responses:
+                    try:
+                        sent += len(response.request.content)
+                    except httpx.RequestNotRead:
+                        pass
+                with lock:
+                    operation = stats[name]
+                    operation.latencies.append(latency)
+                    operation.errors += failed
+                    operation.requests += len(responses)
+                    operation.bytes_sent += sent
+                    operation.bytes_received += sum(
+                        r.num_bytes_downloaded for r in responses
+                    )
+
+        log.info("Running %s for %ss with %s threads", weights, duration, concurrency)
+        start = time.perf_counter()
+        deadline = start + duration
+        # The client is not closed, which would close the shared transport.
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for future in [pool.submit(worker) for _ in range(concurrency)]:
+                future.result()
+        elapsed = time.perf_counter() - start
+
+        total = OperationStats()
+        for operation in stats.values():
+            total.latencies += operation.latencies
+            total.errors += operation.errors
+            total.requests += operation.requests
+            total.bytes_sent += operation.bytes_sent
+            total.bytes_received += operation.bytes_received
+        return {
+            "seconds": elapsed,
+            "calls_per_second": len(total.latencies) / elapsed if elapsed else 0.0,
+            "operations": {name: stats[name].summary() for name in names},
+            "total": total.summary(),
+        }
@@ -0,0 +1,345 @@
+"""Response caches for reference data which rarely changes."""
+
+from attrs import define
+from attrs import field
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING
+import httpx
+import json
+import logging
+import os
+import threading
+import time
+
+# Only the disk cache needs sqlite3, which is slow to import.
+if TYPE_CHECKING:
+    import sqlite3
+
+log = logging.getLogger(__name__)
+
+# Time to live in seconds for cached search results, per endpoint.
+DEFAULT_TTLS = {
+    "/api2/ticketstatus/search/": 3600,
+    "/api2/tickettype/search/": 3600,
+    "/api2/timertype/search/": 3600,
+    "/api2/usergroups/search/": 3600,
+    "/api2/user/search/": 600,
+}
+DEFAULT_MAXSIZE = 256
+
+
+def cache_key(url: str, params: dict | None) -> str:
+    """Returns a cache key for a GET request.
+
+    Params are expected to be normalized already, see
+    `visoma_params_from_filters_with_limit`.
+    """
+    if not params:
+        return url
+    query = "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+    return f"{url}?{query}"
+
+
+def resource_of(url: str) -> str:
+    """Returns the resource name of an API URL.
+
+    Searches and writes use the same name, even though some searches use the
+    plural (/api2/tickets/search/) and writes the singular (/api2/ticket/).
+    """
+    parts = url.strip("/").split("/")
+    name = parts[1] if len(parts) > 1 and parts[0] == "api2" else parts[0]
+    return name.removesuffix("s")
+
+
+@define
+class ResponseCache:
+    """In-memory TTL/LRU cache for GET responses.
+
+    Only URLs with a TTL are cached. The least recently used entry is evicted
+    when the cache is full. Writes to a resource invalidate its entries.
+    Expired entries are kept until they are evicted, so they can be
+    revalidated with the server.
+    """
+
+    ttls: dict[str, float] = field(factory=lambda: dict(DEFAULT_TTLS))
+    maxsize: int = DEFAULT_MAXSIZE
+    clock: Callable[[], float] = time.monotonic
+
+    hits: int = field(default=0, init=False)
+    misses: int = field(default=0, init=False)
+    evictions: int = field(default=0, init=False)
+    invalidations: int = field(default=0, init=False)
+
+    _entries: OrderedDict = field(factory=OrderedDict, init=False, repr=False)
+    _lock: threading.Lock = field(factory=threading.Lock, init=False, repr=False)
+
+    def cacheable(self, url: str) -> bool:
+        return url in self.ttls
+
+    def get(self, url: str, params: dict | None = None) -> httpx.Response | None:
+        """Returns a cached response, or None when there is no fresh entry."""
+        key = cache_key(url, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self.clock():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def get_stale(self, url: str, params: dict | None = None) -> httpx.Response | None:
+        """Returns a cached response even when it is expired."""
+        with self._lock:
+            entry = self._entries.get(cache_key(url, params))
+        return entry[1] if entry else None
+
+    def set(self, url: str, params: dict | None, response: httpx.Response) -> None:
+        """Stores a response for the TTL of its URL."""
+        expires = self.clock() + self.ttls[url]
+        key = cache_key(url, params)
+        with self._lock:
+            self._entries[key] = (expires, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, url: str | None = None) -> int:
+        """Removes the entries for the resource of a URL, or all entries.
+
+        Returns:
+            The number of removed entries.
+        """
+        with self._lock:
+            if url is None:
+                keys = list(self._entries)
+            else:
+                resource = resource_of(url)
+                keys = [k for k in self._entries if resource_of(k) == resource]
+            for key in keys:
+                del self._entries[key]
+            self.invalidations += len(keys)
+
+        if keys:
+            log.debug("Invalidated %s cache entries for %s", len(keys), url or "all")
+        return len(keys)
+
+    def stats(self) -> dict[str, int]:
+        """Returns hit and miss statistics."""
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def close(self) -> None:
+        pass
+
+
+# Response headers kept in the disk cache. The validators allow cheap
+# revalidation of expired entries.
+STORED_HEADERS = ("content-type", "etag", "last-modified")
+
+
+@define
+class DiskCache:
+    """Persistent TTL/LRU cache for GET responses in a SQLite database.
+
+    The database runs in WAL mode, so many processes (like concurrent CLI
+    runs) can read and write it at the same time. Entries are stored per
+    namespace, which should identify the account and host, because users may
+    see different data.
+    """
+
+    path: Path
+    namespace: str
+    ttls: dict[str, float] = field(factory=lambda: dict(DEFAULT_TTLS))
+    maxsize: int = DEFAULT_MAXSIZE
+    clock: Callable[[], float] = time.time
+
+    hits: int = field(default=0, init=False)
+    misses: int = field(default=0, init=False)
+    evictions: int = field(default=0, init=False)
+    invalidations: int = field(default=0, init=False)
+
+    # SQLite connections must not be shared between threads.
+    _local: threading.local = field(factory=threading.local, init=False, repr=False)
+
+    @property
+    def db(self) -> "sqlite3.Connection":
+        db = getattr(self._local, "db", None)
+        if db is None:
+            import sqlite3
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " namespace TEXT NOT NULL,"
+                " resource TEXT NOT NULL,"
+                " expires REAL NOT NULL,"
+                " used REAL NOT NULL,"
+                " url TEXT NOT NULL,"
+                " status INTEGER NOT NULL,"
+                " headers TEXT NOT NULL,"
+                " content BLOB NOT NULL)"
+            )
+            db.execute(
+                "CREATE INDEX IF NOT EXISTS responses_used"
+                " ON responses (namespace, used)"
+            )
+            self._local.db = db
+        return db
+
+    def cacheable(self, url: str) -> bool:
+        return url in self.ttls
+
+    def _key(self, url: str, params: dict | None) -> str:
+        return f"{self.namespace} {cache_key(url, params)}"
+
+    def _load(self, key: str, fresh: bool) -> httpx.Response | None:
+        row = self.db.execute(
+            "SELECT expires, url, status, headers, content FROM responses"
+            " WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+
+        expires, url, status, headers, content = row
+        now = self.clock()
+        if fresh and expires <= now:
+            return None
+        if fresh:
+            self.db.execute("UPDATE responses SET used = ? WHERE key = ?", (now, key))
+
+        return httpx.Response(
+            status,
+            headers=json.loads(headers),
+            content=content,
+            request=httpx.Request("GET", url),
+        )
+
+    def get(self, url: str, params: dict | None = None) -> httpx.Response | None:
+        """Returns a cached response, or None when there is no fresh entry."""
+        response = self._load(self._key(url, params), fresh=True)
+        if response is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return response
+
+    def get_stale(self, url: str, params: dict | None = None) -> httpx.Response | None:
+        """Returns a cached response even when it is expired."""
+        return self._load(self._key(url, params), fresh=False)
+
+    def set(self, url: str, params: dict | None, response: httpx.Response) -> None:
+        """Stores a response for the TTL of its URL."""
+        now = self.clock()
+        headers = {k: v for k, v in response.headers.items() if k in STORED_HEADERS}
+        with self.db as db:
+            db.execute("BEGIN IMMEDIATE")
+            db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self._key(url, params),
+                    self.namespace,
+                    resource_of(url),
+                    now + self.ttls[url],
+                    now,
+                    str(response.request.url),
+                    response.status_code,
+                    json.dumps(headers),
+                    response.content,
+                ),
+            )
+            evicted = db.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses WHERE namespace = ?"
+                " ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                (self.namespace, self.maxsize),
+            ).rowcount
+        self.evictions += evicted
+
+    def invalidate(self, url: str | None = None) -> int:
+        """Removes the entries for the resource of a URL, or all entries.
+
+        Returns:
+            The number of removed entries.
+        """
+        if url is None:
+            cursor = self.db.execute(
+                "DELETE FROM responses WHERE namespace = ?", (self.namespace,)
+            )
+        else:
+            cursor = self.db.execute(
+                "DELETE FROM responses WHERE namespace = ? AND resource = ?",
+                (self.namespace, resource_of(url)),
+            )
+        self.invalidations += cursor.rowcount
+
+        if cursor.rowcount:
+            log.debug("Invalidated %s cache entries for %s", cursor.rowcount, url)
+        return cursor.rowcount
+
+    def stats(self) -> dict[str, int]:
+        """Returns hit and miss statistics of this process."""
+        (size,) = self.db.execute(
+            "SELECT count(*) FROM responses WHERE namespace = ?", (self.namespace,)
+        ).fetchone()
+        return {
+            "size": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def close(self) -> None:
+        """Closes the database connection of the current thread."""
+        db = getattr(self._local, "db", None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+
+def default_cache_path() -> Path:
+    """Returns the path of the disk cache in the XDG cache directory."""
+    cache_home = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "visoma" / "cache.sqlite3"
+
+
+def cache_from_env(
+    namespace: str, default: str = "off"
+) -> ResponseCache | DiskCache | None:
+    """Returns a response cache configured by environment variables.
+
+    Environment variables:
+        - VISOMA_CACHE: "memory" for an in-memory cache, "disk" for a
+          persistent cache shared by all processes or "off" to disable
+          caching. The default is `default`.
+        - VISOMA_CACHE_PATH: The database file of the disk cache. The default
+          is visoma/cache.sqlite3 in the XDG cache directory.
+
+    Args:
+        namespace: Separates entries of different accounts in the disk cache.
+        default: The cache without VISOMA_CACHE. Off, so that library users
+            only get cached data when they opt in; the CLI uses "memory".
+    """
+    kind = (os.getenv("VISOMA_CACHE") or default).casefold()
+    if kind == "off":
+        return None
+    if kind == "memory":
+        return ResponseCache()
+    if kind == "disk":
+        path = os.getenv("VISOMA_CACHE_PATH") or default_cache_path()
+        return DiskCache(Path(path), namespace)
+    raise ValueError(f"Unknown cache: VISOMA_CACHE={kind}")
@@ -1,63 +1,124 @@
 """Client for connecting to Visoma service."""
 
 from attrs import define
+from attrs import field
+from contextlib import AbstractAsyncContextManager
 from contextlib import AbstractContextManager
+from typing import TYPE_CHECKING
 import logging
 import os
 
+from visoma.http import AsyncHttpClient
 from visoma.http import HttpClient
-from visoma.projects import ProjectsManager
-from visoma.ticket_statuses import TicketStatusesManager
-from visoma.ticket_types import TicketTypesManager
-from visoma.tickets import TicketsManager
-from visoma.timer_types import TimerTypesManager
-from visoma.timers import TimersManager
-from visoma.user_groups import UserGroupsManager
-from visoma.users import UsersManager
-from visoma.workdays import WorkdaysManager
+
+if TYPE_CHECKING:
+    from visoma.sync import Mirror
 
 log = logging.getLogger(__name__)
 
 
+def settings_from_env() -> tuple[str, dict[str, str], str]:
+    """Returns connection settings using environment variables.
+
+    Environment variables:
+        - VISOMA_HOST: Full-qualified domain name of the Visoma service,
+          or a URL like http://127.0.0.1:8000.
+        - VISOMA_USER: The user name for the Visoma login.
+        - VISOMA_PASSWORD: The user's password for the Visoma login.
+
+    Returns:
+        The base URL, the login headers and the user name.
+
+    Raises:
+        ValueError when required environment variable is not set.
+    """
+    host = os.getenv("VISOMA_HOST")
+    user = os.getenv("VISOMA_USER")
+    password = os.getenv("VISOMA_PASSWORD")
+    if not all((host, user, password)):
+        raise ValueError(
+            f"Missing values from env: VISOMA_HOST={host}, VISOMA_USER={user}, VISOMA_PASSWORD={password}"
+        )
+
+    # A scheme selects plain HTTP for local stand-ins like visoma.fakeserver.
+    base_url = host if "://" in host else f"https://{host}"
+    visoma_headers = {
+        "X_VSM_USERNAME": user,
+        "X_VSM_PASSWORD": password,
+    }
+
+    return base_url, visoma_headers, user
+
+
 @define
 class VisomaClient(AbstractContextManager):
-    """Client to connect to a Visoma service."""
+    """Client to connect to a Visoma service.
+
+    The modules of the managers are imported on first access, so a command
+    only imports the models it uses.
+    """
 
     client: HttpClient
     user: str
 
+    # The local mirror, opened on first use of `sync`.
+    _mirror: "Mirror | None" = field(default=None, init=False, repr=False)
+
     @classmethod
-    def from_env(cls) -> "VisomaClient":
+    def from_env(cls, cache: str = "off", retries: int = 0) -> "VisomaClient":
         """Returns connection to service using environment variables and parameters.
 
         Environment variables:
-            - VISOMA_HOST: Full-qualified domain name of the Visoma service
+            - VISOMA_HOST: Full-qualified domain name of the Visoma service,
+              or a URL like http://127.0.0.1:8000.
             - VISOMA_USER: The user name for the Visoma login.
             - VISOMA_PASSWORD: The user's password for the Visoma login.
+            - VISOMA_CACHE: Cache for reference data, "memory", "disk" or
+              "off". See `visoma.cache.cache_from_env`.
+            - VISOMA_POOL_SIZE, VISOMA_POOL_KEEPALIVE,
+              VISOMA_POOL_KEEPALIVE_EXPIRY, VISOMA_HTTP2,
+              VISOMA_CONNECT_TIMEOUT, VISOMA_READ_TIMEOUT,
+              VISOMA_POOL_TIMEOUT: Connection pool settings. See
+              `visoma.pool.PoolSettings.from_env`.
+            - VISOMA_RETRIES, VISOMA_RETRY_BACKOFF, VISOMA_BREAKER_THRESHOLD,
+              VISOMA_BREAKER_RESET: Retries of failed requests and the
+              circuit breaker. See `visoma.retry.RetryPolicy.from_env`.
+            - VISOMA_READ_RATE, VISOMA_READ_BURST, VISOMA_WRITE_RATE,
+              VISOMA_WRITE_BURST: Request rate limits shared by all
+              managers. See `visoma.ratelimit.RateLimiter.from_env`.
+
+        Args:
+            cache: The cache for reference data without VISOMA_CACHE. It is
+                off by default, so data is live unless a user opts in; the
+                CLI uses "memory".
+            retries: Retries per request without VISOMA_RETRIES. They are
+                off by default, so a request is sent once unless a user opts
+                in; the CLI uses 3.
 
         Returns:
             Client used to communicate with a Visoma service.
 
         Raises:
-            ValueError when required environment variable is not set.
+            ValueError when required environment variable is not set or a
+            setting is invalid.
         """
 
-        host = os.getenv("VISOMA_HOST")
-        user = os.getenv("VISOMA_USER")
-        password = os.getenv("VISOMA_PASSWORD")
-        if not all((host, user, password)):
-            raise ValueError(
-                f"Missing values from env: VISOMA_HOST={host}, VISOMA_USER={user}, VISOMA_PASSWORD={password}"
-            )
+        from visoma.cache import cache_from_env
+        from visoma.pool import PoolSettings
+        from visoma.ratelimit import RateLimiter
+        from visoma.retry import RetryPolicy
 
-        base_url = f"https://{host}"
-        visoma_headers = {
-            "X_VSM_USERNAME": user,
-            "X_VSM_PASSWORD": password,
-        }
+        base_url, visoma_headers, user = settings_from_env()
 
-        client = HttpClient.with_extra_headers(base_url, visoma_headers)
-        log.debug(f"HTTP Client: {client}")
+        client = HttpClient.with_extra_headers(
+            base_url,
+            visoma_headers,
+            cache=cache_from_env(f"{user}@{base_url}", cache),
+            pool=PoolSettings.from_env(),
+            retry=RetryPolicy.from_env(retries),
+            limiter=RateLimiter.from_env(),
+        )
+        log.debug("HTTP Client: %s", client)
 
         return cls(client, user)
 
@@ -66,49 +127,268 @@ class VisomaClient(AbstractContextManager):
 
     def close(self):
         log.debug("Closing resources")
+        if self._mirror is not None:
+            self._mirror.close()
         return self.client.close()
 
+    @property
+    def cache(self):
+        """Returns the response cache for reference data, if enabled."""
+        return self.client.cache
+
+    @property
+    def pool_stats(self):
+        """Returns connection reuse and pool wait statistics."""
+        return self.client.pool_stats
+
+    @property
+    def retry(self):
+        """Returns the retry policy with its metrics, if enabled."""
+        return self.client.retry
+
+    @property
+    def limiter(self):
+        """Returns the rate limiter with its metrics, if enabled."""
+        return self.client.limiter
+
+    @property
+    def metrics(self):
+        """Returns request metrics per endpoint."""
+        return self.client.metrics
+
     @property
     def tickets(self):
         """Returns a manager for operations on tickets maintained by a Visoma service."""
+        from visoma.tickets import TicketsManager
+
         return TicketsManager(client=self.client)
 
     @property
     def ticket_statuses(self):
         """Returns a manager for operations on ticket statuses maintained by a Visoma service."""
+        from visoma.ticket_statuses import TicketStatusesManager
+
         return TicketStatusesManager(client=self.client)
 
     @property
     def ticket_types(self):
         """Returns a manager for operations on ticket types maintained by a Visoma service."""
+        from visoma.ticket_types import TicketTypesManager
+
         return TicketTypesManager(client=self.client)
 
     @property
     def timers(self):
         """Returns a manager for operations on timers maintained by a Visoma service."""
+        from visoma.timers import TimersManager
+
         return TimersManager(client=self.client)
 
     @property
     def timer_types(self):
         """Returns a manager for operations on timer types maintained by a Visoma service."""
+        from visoma.timer_types import TimerTypesManager
+
         return TimerTypesManager(client=self.client)
 
     @property
     def users(self):
         """Returns a manager for operations on users maintained by a Visoma service."""
+        from visoma.users import UsersManager
+
         return UsersManager(client=self.client)
 
     @property
     def user_groups(self):
         """Returns a manager for operations on user groups maintained by a Visoma service."""
+        from visoma.user_groups import UserGroupsManager
+
         return UserGroupsManager(client=self.client)
 
     @property
     def workdays(self):
         """Returns a manager for operations on workdays maintained by a Visoma service."""
+        from visoma.workdays import WorkdaysManager
+
         return WorkdaysManager(client=self.client)
 
     @property
     def projects(self):
         """Returns a manager for operations on projects maintained by a Visoma service."""
+        from visoma.projects import ProjectsManager
+
         return ProjectsManager(client=self.client)
+
+    @property
+    def timesheet(self):
+        """Returns a manager for reports on the hours of timers."""
+        from visoma.timesheet import TimesheetManager
+
+        return TimesheetManager(client=self.client)
+
+    @property
+    def bench(self):
+        """Returns a load generator for the Visoma service."""
+        from visoma.bench import BenchManager
+
+        return BenchManager(client=self.client)
+
+    @property
+    def export(self):
+        """Returns a manager for exporting timers and tickets to files."""
+        from visoma.export import ExportManager
+
+        return ExportManager(client=self.client)
+
+    @property
+    def sync(self):
+        """Returns a manager for the local mirror of tickets and projects.
+
+        See `visoma.sync.Mirror.from_env` for where the mirror is stored.
+        """
+        from visoma.sync import Mirror
+        from visoma.sync import SyncManager
+
+        if self._mirror is None:
+            host = self.client.client.base_url.host
+            self._mirror = Mirror.from_env(f"{self.user}@{host}")
+        return SyncManager(self.client, self._mirror)
+
+
+@define
+class AsyncVisomaClient(AbstractAsyncContextManager):
+    """Asynchronous client to connect to a Visoma service."""
+
+    client: AsyncHttpClient
+    user: str
+
+    @classmethod
+    def from_env(cls, cache: str = "off", retries: int = 0) -> "AsyncVisomaClient":
+        """Returns connection to service using environment variables and parameters.
+
+        See `VisomaClient.from_env` for the environment variables.
+
+        Args:
+            cache: The cache for reference data without VISOMA_CACHE.
+            retries: Retries per request without VISOMA_RETRIES.
+
+        Returns:
+            Client used to communicate with a Visoma service.
+
+        Raises:
+            ValueError when required environment variable is not set.
+        """
+
+        from visoma.cache import cache_from_env
+        from visoma.pool import PoolSettings
+        from visoma.ratelimit import RateLimiter
+        from visoma.retry import RetryPolicy
+
+        base_url, visoma_headers, user = settings_from_env()
+
+        client = AsyncHttpClient.with_extra_headers(
+            base_url,
+            visoma_headers,
+            cache=cache_from_env(f"{user}@{base_url}", cache),
+            pool=PoolSettings.from_env(),
+            retry=RetryPolicy.from_env(retries),
+            limiter=RateLimiter.from_env(),
+        )
+        log.debug("Async HTTP Client: %s", client)
+
+        return cls(client, user)
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+    async def close(self):
+        log.debug("Closing resources")
+        return await self.client.close()
+
+    @property
+    def cache(self):
+        """Returns the response cache for reference data, if enabled."""
+        return self.client.cache
+
+    @property
+    def pool_stats(self):
+        """Returns connection reuse and pool wait statistics."""
+        return self.client.pool_stats
+
+    @property
+    def retry(self):
+        """Returns the retry policy with its metrics, if enabled."""
+        return self.client.retry
+
+    @property
+    def limiter(self):
+        """Returns the rate limiter with its metrics, if enabled."""
+        return self.client.limiter
+
+    @property
+    def metrics(self):
+        """Returns request metrics per endpoint."""
+        return self.client.metrics
+
+    @property
+    def tickets(self):
+        """Returns an async manager for operations on tickets maintained by a Visoma service."""
+        from visoma.tickets import AsyncTicketsManager
+
+        return AsyncTicketsManager(client=self.client)
+
+    @property
+    def ticket_statuses(self):
+        """Returns an async manager for operations on ticket statuses maintained by a Visoma service."""
+        from visoma.ticket_statuses import AsyncTicketStatusesManager
+
+        return AsyncTicketStatusesManager(client=self.client)
+
+    @property
+    def ticket_types(self):
+        """Returns an async manager for operations on ticket types maintained by a Visoma service."""
+        from visoma.ticket_types import AsyncTicketTypesManager
+
+        return AsyncTicketTypesManager(client=self.client)
+
+    @property
+    def timers(self):
+        """Returns an async manager for operations on timers maintained by a Visoma service."""
+        from visoma.timers import AsyncTimersManager
+
+        return AsyncTimersManager(client=self.client)
+
+    @property
+    def timer_types(self):
+        """Returns an async manager for operations on timer types maintained by a Visoma service."""
+        from visoma.timer_types import AsyncTimerTypesManager
+
+        return AsyncTimerTypesManager(client=self.client)
+
+    @property
+    def users(self):
+        """Returns an async manager for operations on users maintained by a Visoma service."""
+        from visoma.users import AsyncUsersManager
+
+        return AsyncUsersManager(client=self.client)
+
+    @property
+    def user_groups(self):
+        """Returns an async manager for operations on user groups maintained by a Visoma service."""
+        from visoma.user_groups import AsyncUserGroupsManager
+
+        return AsyncUserGroupsManager(client=self.client)
+
+    @property
+    def workdays(self):
+        """Returns an async manager for operations on workdays maintained by a Visoma service."""
+        from visoma.workdays import AsyncWorkdaysManager
+
+        return AsyncWorkdaysManager(client=self.client)
+
+    @property
+    def projects(self):
+        """Returns an async manager for operations on projects maintained by a Visoma service."""
+        from visoma.projects import AsyncProjectsManager
+
+        return AsyncProjectsManager(client=self.client)
@@ -0,0 +1,253 @@
+"""Streaming export of models to CSV, NDJSON and Parquet files.
+
+Items are written while they are fetched, in batches, so exports of any size
+run in constant memory. CSV and NDJSON files contain the models in the format
+of the API (see `to_dict`), Parquet files keep the types of the attributes.
+"""
+
+from attrs import define
+from attrs import fields
+from collections.abc import Iterable
+from collections.abc import Iterator
+from datetime import date
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+import bz2
+import csv
+import gzip
+import json
+import logging
+import lzma
+
+from visoma.http import HttpClient
+from visoma.lib import is_no_results
+from visoma.lib import optional_type
+
+log = logging.getLogger(__name__)
+
+FORMATS = ("csv", "ndjson", "parquet")
+BATCH_SIZE = 10_000
+
+# Compressed text files are opened with these functions.
+OPENERS = {"gzip": gzip.open, "bz2": bz2.open, "xz": lzma.open}
+SUFFIXES = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+
+
+def searched(items: Iterable) -> Iterator:
+    """Yields the items of a search, or none when it found nothing.
+
+    A search without results answers with a message like "No Timer found",
+    which `iter` of a manager raises.
+    """
+    try:
+        yield from items
+    except ValueError as err:
+        if not is_no_results(err):
+            raise
+        log.debug("Search found nothing: %s", err)
+
+
+def export(
+    items: Iterable,
+    path: str | Path,
+    format: str | None = None,
+    columns: Iterable[str] | str | None = None,
+    compression: str | None = None,
+) -> int:
+    """Writes items to a file while they are read.
+
+    Args:
+        items: attrs models like timers or tickets, all of the same class.
+        path: The file to write.
+        format: "csv", "ndjson" or "parquet". The default is taken from the
+            file name, like export.csv.gz.
+        columns: Attributes to export, as a list or a comma separated string.
+            The default exports all.
+        compression: For CSV and NDJSON "gzip", "bz2" or "xz", for Parquet a
+            codec like "snappy" (the default) or "zstd". The default for text
+            files is taken from the file name.
+
+    Returns:
+        The number of exported items.
+    """
+    path = Path(path)
+    format, compression = format_of(path, format, compression)
+    if isinstance(columns, str):
+        columns = columns.split(",")
+    columns = tuple(c.strip() for c in columns) if columns else None
+
+    items = iter(items)
+    first = next(items, None)
+    if first is None:
+        log.warning("Nothing to export to %s", path)
+        return 0
+    columns = check_columns(type(first), columns)
+    batches = batched(items, first)
+
+    if format == "parquet":
+        count = write_parquet(batches, path, type(first), columns, compression)
+    else:
+        opener = OPENERS[compression] if compression else open
+        with opener(path, "wt", encoding="utf-8", newline="") as file:
+            if format == "csv":
+                count = write_csv(batches, file, columns)
+            else:
+                count = write_ndjson(batches, file, columns)
+
+    log.info("Exported %s items to %s", count, path)
+    return count
+
+
+def format_of(path: Path, format, compression) -> tuple[str, str | None]:
+    """Returns the format and compression for a file name."""
+    suffixes = path.suffixes
+    if compression is None and suffixes and suffixes[-1] in SUFFIXES:
+        compression = SUFFIXES[suffixes.pop()]
+    if format is None:
+        format = suffixes[-1].lstrip(".") if suffixes else None
+        format = "ndjson" if format in ("jsonl", "json") else format
+
+    if format not in FORMATS:
+        raise ValueError(f"Export format must be one of {FORMATS}: {format}")
+    if format != "parquet" and compression not in (None, *OPENERS):
+        raise ValueError(f"Compression must be one of {tuple(OPENERS)}: {compression}")
+    return format, compression
+
+
+def check_columns(cls, columns) -> tuple[str, ...]:
+    names = tuple(a.name for a in fields(cls))
+    if columns is None:
+        return names
+    unknown = [c for c in columns if c not in names]
+    if unknown:
+        raise ValueError(f"Unknown columns for {cls.__name__}: {unknown}")
+    return columns
+
+
+def batched(items, first):
+    """Yields lists of items, starting with the first item."""
+    batch = [first, *islice(items, BATCH_SIZE - 1)]
+    while batch:
+        yield batch
+        batch = list(islice(items, BATCH_SIZE))
+
+
+def write_csv(batches, file, columns) -> int:
+    writer = csv.DictWriter(file, columns, extrasaction="ignore")
+    writer.writeheader()
+    count = 0
+    for batch in batches:
+        writer.writerows(item.to_dict() for item in batch)
+        count += len(batch)
+    return count
+
+
+def write_ndjson(batches, file, columns) -> int:
+    count = 0
+    for batch in batches:
+        lines = []
+        for item in batch:
+            data = item.to_dict()
+            lines.append(json.dumps({c: data[c] for c in columns if c in data}))
+        file.write("\n".join(lines) + "\n")
+        count += len(batch)
+    return count
+
+
+def write_parquet(batches, path, cls, columns, compression) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as err:
+        raise ValueError(
+            "Parquet export needs pyarrow: pip install 'visoma[parquet]'"
+        ) from err
+
+    types = {a.name: a.type for a in fields(cls)}
+    schema = pa.schema([(c, arrow_type(pa, types[c])) for c in columns])
+    count = 0
+    with pq.ParquetWriter(path, schema, compression=compression or "snappy") as writer:
+        for batch in batches:
+            arrays = {c: [getattr(item, c) for item in batch] for c in columns}
+            writer.write_table(pa.table(arrays, schema=schema))
+            count += len(batch)
+    return count
+
+
+def arrow_type(pa, type_):
+    """Returns the Arrow type for the type of an attribute."""
+    type_ = optional_type(type_) or type_
+    if type_ == list[int]:
+        return pa.list_(pa.int64())
+    return {
+        bool: pa.bool_(),
+        int: pa.int64(),
+        float: pa.float64(),
+        str: pa.string(),
+        datetime: pa.timestamp("us"),
+        date: pa.date32(),
+    }.get(type_, pa.string())
+
+
+@define
+class ExportManager:
+    """Exports timers and tickets to files."""
+
+    client: HttpClient
+
+    def timers(
+        self,
+        path: str,
+        start: date | str | None = None,
+        end: date | str | None = None,
+        filters: dict[str, str] | None = None,
+        columns: str | list[str] | None = None,
+        compression: str | None = None,
+        format: str | None = None,
+        limit: int = 500,
+    ) -> int:
+        """Export timers.
+
+        With start and end, all timers in the date range are exported (see
+        `TimersManager.scan`), otherwise up to `limit` timers.
+
+        Returns:
+            The number of exported timers.
+        """
+        from visoma.timers import TimersManager
+
+        manager = TimersManager(client=self.client)
+        if start is not None and end is not None:
+            items = manager.scan(start, end, limit=limit, filters=filters)
+        else:
+            items = searched(manager.iter(limit=limit, filters=filters))
+        return export(items, path, format, columns, compression)
+
+    def tickets(
+        self,
+        path: str,
+        start: date | str | None = None,
+        end: date | str | None = None,
+        filters: dict[str, str] | None = None,
+        columns: str | list[str] | None = None,
+        compression: str | None = None,
+        format: str | None = None,
+        limit: int = 500,
+    ) -> int:
+        """Export tickets.
+
+        With start and end, all tickets created in the date range are
+        exported (see `TicketsManager.scan`), otherwise up to `limit` tickets.
+
+        Returns:
+            The number of exported tickets.
+        """
+        from visoma.tickets import TicketsManager
+
+        manager = TicketsManager(client=self.client)
+        if start is not None and end is not None:
+            items = manager.scan(start, end, limit=limit, filters=filters)
+        else:
+            items = searched(manager.iter(limit=limit, filters=filters))
+        return export(items, path, format, columns, compression)
@@ -0,0 +1,493 @@
+"""A local stand-in for a Visoma service with synthetic data.
+
+`FakeVisoma` is an ASGI application serving the endpoints this library uses
+from generated users, projects, tickets and timers. It answers searches like
+the service: filters are matched case-insensitively, `From` and `To` filters
+select ranges, and `params[QueryLimit]` limits the result. Latency and
+server errors can be injected to exercise retries, rate limits and
+concurrency.
+
+Use it in tests of the async clients with `httpx.ASGITransport`, which is
+async only. For the sync clients, serve it on a local port with
+`make_server`, or from the command line without further dependencies:
+
+    python -m visoma.fakeserver --port=8000 --timers=1000000 --latency=0.05
+
+and point the clients at it with VISOMA_HOST=http://127.0.0.1:8000.
+"""
+
+from attrs import define
+from attrs import field
+from collections import Counter
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from urllib.parse import parse_qsl
+from urllib.parse import unquote
+import json
+import logging
+import random
+import re
+import threading
+
+log = logging.getLogger(__name__)
+
+TIMESTAMP = "%Y-%m-%d %H:%M:%S"
+
+# Search endpoints, the resource they search and the name in their messages.
+SEARCHES = {
+    "/api2/timer/search/": ("timers", "Timer"),
+    "/api2/tickets/search/": ("tickets", "Ticket"),
+    "/api2/project/search/": ("projects", "Project"),
+    "/api2/user/search/": ("users", "User"),
+    "/api2/usergroups/search/": ("user_groups", "User Group"),
+    "/api2/ticketstatus/search/": ("ticket_statuses", "Ticket Status"),
+    "/api2/tickettype/search/": ("ticket_types", "Ticket Type"),
+    "/api2/timertype/search/": ("timer_types", "Timer Type"),
+}
+
+QUERY_LIMIT = "params[QueryLimit]"
+# Searches without a query limit return this many records.
+DEFAULT_QUERY_LIMIT = 100
+
+TIMER_PATH = re.compile(r"/api2/timer/(\d+)")
+CLOSE_TIMER_PATH = re.compile(r"/timer/close/id/(\d+)/?")
+WORKDAY_PATH = re.compile(r"/workend/index/date/(\d{4}-\d{2}-\d{2})")
+CLOSE_WORKDAY_PATH = re.compile(r"/workend/submitworkend/id/(\d+)/?")
+
+
+@define(frozen=True)
+class Redirect:
+    """A 302 response to another page, like the HTML pages of the service."""
+
+    location: str
+
+
+@define
+class FakeData:
+    """Synthetic records in the format of the API, by resource."""
+
+    users: list[dict] = field(factory=list)
+    user_groups: list[dict] = field(factory=list)
+    ticket_statuses: list[dict] = field(factory=list)
+    ticket_types: list[dict] = field(factory=list)
+    timer_types: list[dict] = field(factory=list)
+    projects: list[dict] = field(factory=list)
+    tickets: list[dict] = field(factory=list)
+    timers: list[dict] = field(factory=list)
+
+    @classmethod
+    def generate(
+        cls,
+        users: int = 20,
+        projects: int = 50,
+        tickets: int = 1000,
+        timers: int = 10_000,
+        start: date = date(2024, 1, 1),
+        days: int = 365,
+        seed: int = 0,
+    ) -> "FakeData":
+        """Returns random records, the same for the same arguments.
+
+        Tickets are created and timers are started on the `days` from `start`.
+        """
+        rng = random.Random(seed)
+        begin = datetime.combine(start, datetime.min.time())
+
+        def moment():
+            return begin + timedelta(
+                days=rng.randrange(days), hours=rng.randrange(7, 18)
+            )
+
+        data = cls()
+        data.user_groups = [
+            {"id": 1, "title": "Staff", "active": True},
+            {"id": 2, "title": "Admins", "active": True},
+        ]
+        data.ticket_statuses = [
+            {"Id": idx, "Title": title, "Default": idx == 1}
+            for idx, title in enumerate(("Open", "In progress", "Closed"), 1)
+        ]
+        data.ticket_types = [
+            {"Id": idx, "Title": title, "Description": f"{title} tickets"}
+            for idx, title in enumerate(("Incident", "Request", "Change"), 1)
+        ]
+        data.timer_types = [
+            {"id": idx, "title": title, "description": f"{title} work"}
+            for idx, title in enumerate(("Remote", "On site", "Travel"), 1)
+        ]
+        data.users = [
+            {
+                "id": idx,
+                "username": f"user-{idx}",
+                "FullName": f"User {idx}",
+                "email": f"user-{idx}@example.com",
+                "usertype": "user",
+                "comment": "",
+                "lastlogin": moment().strftime(TIMESTAMP),
+            }
+            for idx in range(1, users + 1)
+        ]
+
+        project_ids = range(1, projects + 1)
+        links = {idx: [] for idx in project_ids}
+        for idx in range(1, tickets + 1):
+            created = moment()
+            modified = created + timedelta(hours=rng.randrange(0, 240))
+            status = rng.choice(data.ticket_statuses)
+            linked = rng.sample(project_ids, k=min(rng.randrange(3), projects))
+            for project_id in linked:
+                links[project_id].append(idx)
+            customer = rng.randrange(1, 51)
+            data.tickets.append(
+                {
+                    "Id": idx,
+                    "Number": 10_000 + idx,
+                    "Title": f"Ticket {idx}",
+                    "Description": f"Synthetic ticket {idx}.",
+                    "CustomerName": f"Customer {customer}",
+                    "CustomerId": customer,
+                    "Status": status["Title"],
+                    "StatusId": status["Id"],
+                    "Created": created.strftime(TIMESTAMP),
+                    "Modified": modified.strftime(TIMESTAMP),
+                    "NotifyCustomer": False,
+                    "PriorityId": rng.randrange(1, 4),
+                    "ProjectIds": ",".join(map(str, linked)),
+                }
+            )
+
+        data.projects = [
+            {
+                "Id": idx,
+                "Title": f"Project {idx}",
+                "Description": f"Synthetic project {idx}.",
+                "Begin": (start + timedelta(days=rng.randrange(days))).strftime(
+                    "%d.%m.%Y"
+                ),
+                "Archived": False,
+                "TicketIds": links[idx],
+            }
+            for idx in project_ids
+        ]
+
+        for idx in range(1, timers + 1):
+            user = rng.randrange(1, users + 1)
+            started = moment() + timedelta(minutes=rng.randrange(0, 60, 15))
+            data.timers.append(
+                {
+                    "Id": idx,
+                    "UserId": user,
+                    "User": f"user-{user}",
+                    "Start": started.strftime(TIMESTAMP),
+                    "Stop": (
+                        started + timedelta(minutes=rng.randrange(15, 480, 15))
+                    ).strftime(TIMESTAMP),
+                    "Description": f"Synthetic timer {idx}.",
+                    "TicketId": rng.randrange(1, tickets + 1) if tickets else None,
+                    "TypeId": rng.randrange(1, 4),
+                    "Billable": rng.random() < 0.7,
+                    "Closed": False,
+                }
+            )
+        # Timer searches return timers ordered by start.
+        data.timers.sort(key=lambda timer: timer["Start"])
+        return data
+
+
+@define
+class FakeVisoma:
+    """ASGI application imitating a Visoma service.
+
+    Args:
+        data: The records served. Writes change them.
+        latency: Seconds each request takes at least.
+        jitter: Up to this many seconds are added at random to the latency.
+        error_rate: Share of requests which fail with `error_status`.
+        error_status: Status code of injected errors.
+        seed: Seed of the random latency and errors.
+    """
+
+    data: FakeData = field(factory=FakeData.generate)
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    seed: int | None = None
+
+    requests: Counter = field(factory=Counter, init=False)
+    errors: int = field(default=0, init=False)
+    _rng: random.Random = field(init=False, repr=False)
+    _lock: threading.Lock = field(factory=threading.Lock, init=False, repr=False)
+
+    def __attrs_post_init__(self):
+        self._rng = random.Random(self.seed)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+
+        import asyncio
+
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+
+        method = scope["method"]
+        path = scope["path"]
+        headers = {k.decode().lower(): v.decode() for k, v in scope["headers"]}
+        params = dict(parse_qsl(scope["query_string"].decode()))
+
+        with self._lock:
+            self.requests[f"{method} {path}"] += 1
+            delay = self.latency + self._rng.random() * self.jitter
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if fail:
+            status, content = self.error_status, {"Message": "Injected error"}
+        elif "x_vsm_username" not in headers:
+            status, content = 401, {"Message": "Missing login"}
+        else:
+            status, content = self.handle(method, path, params, body)
+
+        extra = []
+        if isinstance(content, Redirect):
+            extra = [(b"location", content.location.encode())]
+            content = ""
+        if isinstance(content, str):
+            payload, content_type = content.encode(), "text/html; charset=utf-8"
+        else:
+            payload, content_type = json.dumps(content).encode(), "application/json"
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", content_type.encode()),
+                    (b"content-length", str(len(payload)).encode()),
+                    *extra,
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": payload})
+
+    def handle(
+        self, method, path, params, body
+    ) -> tuple[int, dict | list | str | Redirect]:
+        """Returns the status and content of a response."""
+        if method == "GET" and path in SEARCHES:
+            resource, name = SEARCHES[path]
+            return 200, self.search(resource, name, params)
+        if method == "POST" and path == "/api2/timer/":
+            return 200, self.create("timers", json.loads(body or b"{}"))
+        if method == "POST" and path == "/api2/ticket/":
+            return 200, self.create("tickets", json.loads(body or b"{}"))
+        if method == "DELETE" and (match := TIMER_PATH.fullmatch(path)):
+            return 200, self.delete_timer(int(match[1]))
+        if method == "GET" and (match := CLOSE_TIMER_PATH.fullmatch(path)):
+            return 302, self.close_timer(int(match[1]))
+        if method == "GET" and (match := WORKDAY_PATH.fullmatch(path)):
+            day = date.fromisoformat(match[1])
+            link = f"/workend/submitworkend/id/{day.toordinal()}/"
+            return 200, f'<html><a id="btnworkend" href="{link}">Close</a></html>'
+        if method == "GET" and (match := CLOSE_WORKDAY_PATH.fullmatch(path)):
+            day = date.fromordinal(int(match[1]))
+            return 302, Redirect(f"/workend/index/date/{day}")
+        return 404, {"Message": f"Not found: {method} {path}"}
+
+    def search(self, resource: str, name: str, params: dict) -> list | dict:
+        limit = int(params.pop(QUERY_LIMIT, DEFAULT_QUERY_LIMIT))
+        filters = {
+            key[len("params[") : -1].casefold(): value.casefold()
+            for key, value in params.items()
+            if key.startswith("params[")
+        }
+        found = []
+        for record in getattr(self.data, resource):
+            if matches(record, filters):
+                found.append(record)
+                if len(found) >= limit:
+                    break
+        return found or {"Message": f"No {name} found"}
+
+    def create(self, resource: str, request: dict) -> dict:
+        with self._lock:
+            records = getattr(self.data, resource)
+            idx = max((record["Id"] for record in records), default=0) + 1
+            record = {"Id": idx} | request
+            if resource == "tickets":
+                record = {"Number": 10_000 + idx, "Status": "Open", "StatusId": 1} | (
+                    record
+                )
+                record.setdefault("CustomerName", f"Customer {record['CustomerId']}")
+            records.append(record)
+        return {"Success": True, "Id": idx, "Message": ""}
+
+    def delete_timer(self, idx: int) -> dict:
+        with self._lock:
+            for pos, timer in enumerate(self.data.timers):
+                if timer["Id"] == idx:
+                    del self.data.timers[pos]
+                    return {"Success": True, "Id": idx, "Message": ""}
+        return {"Success": False, "Id": idx, "Message": "Timer not found"}
+
+    def close_timer(self, idx: int) -> Redirect:
+        for timer in self.data.timers:
+            if timer["Id"] == idx:
+                timer["Closed"] = True
+                return Redirect(f"/workend/index/date/{timer['Start'][:10]}")
+        return Redirect("/workend/index/date/")
+
+    def stats(self) -> dict[str, int]:
+        """Returns the number of requests per endpoint and of injected errors."""
+        return dict(self.requests) | {"errors": self.errors}
+
+
+def matches(record: dict, filters: dict[str, str]) -> bool:
+    """Returns whether a record matches casefolded search filters.
+
+    A filter on an attribute matches equal values. Filters named like an
+    attribute with `From` or `To` appended select a range, where a date
+    matches all times of the day.
+    """
+    if not filters:
+        return True
+    values = {key.casefold(): value for key, value in record.items()}
+    for key, wanted in filters.items():
+        if key in values:
+            if f"{values[key]}".casefold() != wanted:
+                return False
+        elif key.endswith("from") and key[:-4] in values:
+            if compare(values[key[:-4]], wanted) < 0:
+                return False
+        elif key.endswith("to") and key[:-2] in values:
+            if compare(values[key[:-2]], wanted) > 0:
+                return False
+    return True
+
+
+def compare(value, wanted: str) -> int:
+    """Compares a value with a filter value, like `cmp`."""
+    if value is None:
+        return -1
+    if isinstance(value, int) and wanted.lstrip("-").isdigit():
+        left, right = value, int(wanted)
+    else:
+        # Timestamps compare as strings, a date with the whole day.
+        left, right = f"{value}"[: len(wanted)].casefold(), wanted
+    return (left > right) - (left < right)
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Serves an ASGI application with the standard library."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately. With Nagle's algorithm and
+    # delayed ACKs, that adds about 40 ms to each request on a reused
+    # connection.
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.handle_asgi()
+
+    do_POST = do_DELETE = do_PUT = do_GET
+
+    def handle_asgi(self):
+        import asyncio
+
+        body = self.rfile.read(int(self.headers.get("content-length") or 0))
+        path, _, query = self.path.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": self.command,
+            "scheme": "http",
+            "path": unquote(path),
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "headers": [
+                (key.lower().encode(), value.encode())
+                for key, value in self.headers.items()
+            ],
+            "server": self.server.server_address,
+            "client": self.client_address,
+        }
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        asyncio.run(self.server.app(scope, receive, send))
+        start, *bodies = messages
+        self.send_response(start["status"])
+        for key, value in start["headers"]:
+            self.send_header(key.decode(), value.decode())
+        self.end_headers()
+        for message in bodies:
+            self.wfile.write(message.get("body", b""))
+
+    def log_message(self, format, *args):
+        log.debug(format, *args)
+
+
+def make_server(app, host: str = "127.0.0.1", port: int = 8000) -> ThreadingHTTPServer:
+    """Returns an HTTP server for an ASGI app, which is started with `serve_forever`."""
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.app = app
+    return server
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    users: int = 20,
+    projects: int = 50,
+    tickets: int = 1000,
+    timers: int = 10_000,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+    error_status: int = 503,
+    seed: int = 0,
+) -> None:
+    """Serve a fake Visoma service with synthetic data until interrupted."""
+    data = FakeData.generate(users, projects, tickets, timers, seed=seed)
+    app = FakeVisoma(data, latency, jitter, error_rate, error_status, seed)
+    server = make_server(app, host, port)
+    log.warning(
+        "Serving a fake Visoma service on http://%s:%s", host, server.server_port
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        log.warning("Requests: %s", app.stats())
+
+
+if __name__ == "__main__":
+    import fire
+
+    logging.basicConfig(level=logging.INFO)
+    fire.Fire(serve)
@@ -1,15 +1,39 @@
+from attrs import define
+from attrs import field
 from attrs import frozen
+from contextlib import nullcontext
+from typing import TYPE_CHECKING
 import httpx
 import json
 import logging
+import time
+
+from visoma.tracing import sample_payload
+
+# The parts of a client are imported when a client is created, so importing
+# the CLI stays fast.
+if TYPE_CHECKING:
+    from visoma.cache import DiskCache
+    from visoma.cache import ResponseCache
+    from visoma.metrics import Metrics
+    from visoma.pool import PoolStats
+    from visoma.ratelimit import RateLimiter
+    from visoma.retry import RetryPolicy
+    from visoma.singleflight import AsyncSingleFlight
+    from visoma.singleflight import SingleFlight
 
 log = logging.getLogger(__name__)
 
-DEFAULT_TIMEOUT = 20
 DEFAULT_HEADERS = {
     "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36 Edg/121.0.0."
 }
 
+# Bytes of an unused response body read to keep its connection, see `send`.
+DRAIN_LIMIT = 64 * 1024
+
+# Characters which continue a JSON number, see `JsonArrayDecoder`.
+NUMBER_CHARS = frozenset("0123456789+-.eE")
+
 
 class HttpError(Exception):
     """Custom exception for HTTP errors."""
@@ -17,19 +41,66 @@ class HttpError(Exception):
     pass
 
 
+class CircuitOpenError(HttpError):
+    """Raised instead of sending a request while a host keeps failing."""
+
+    pass
+
+
 @frozen
 class HttpClient:
     """A client for basic HTTP requests/responses."""
 
     client: httpx.Client
+    cache: "ResponseCache | DiskCache | None" = None
+    pool_stats: "PoolStats | None" = None
+    retry: "RetryPolicy | None" = None
+    limiter: "RateLimiter | None" = None
+    flights: "SingleFlight | None" = None
+    metrics: "Metrics | None" = None
 
     @classmethod
-    def with_extra_headers(cls, base_url, headers) -> "HttpClient":
+    def with_extra_headers(
+        cls,
+        base_url,
+        headers,
+        cache=None,
+        pool=None,
+        retry=None,
+        limiter=None,
+        coalesce=True,
+        transport=None,
+    ) -> "HttpClient":
+        """Returns a client with pool settings, by default those of httpx.
+
+        A transport replaces the network, like `httpx.MockTransport`. The
+        fake server in `visoma.fakeserver` is an ASGI application, which
+        httpx only mounts for async clients; serve it with
+        `visoma.fakeserver.make_server` for this client.
+        """
+        from visoma.metrics import Metrics
+        from visoma.pool import PoolSettings
+        from visoma.pool import PoolStats
+        from visoma.singleflight import SingleFlight
+
         headers = DEFAULT_HEADERS | headers
+        pool = pool if pool is not None else PoolSettings()
+        pool_stats = PoolStats()
+        metrics = Metrics()
         client = httpx.Client(
-            timeout=DEFAULT_TIMEOUT, base_url=base_url, headers=headers
+            timeout=pool.timeout(),
+            limits=pool.limits(),
+            http2=pool.http2,
+            base_url=base_url,
+            headers=headers,
+            event_hooks={
+                "request": [pool_stats.on_request, metrics.on_request],
+                "response": [metrics.on_response],
+            },
+            transport=transport,
         )
-        return cls(client)
+        flights = SingleFlight() if coalesce else None
+        return cls(client, cache, pool_stats, retry, limiter, flights, metrics)
 
     def get(
         self,
@@ -40,44 +111,500 @@ class HttpClient:
         verify_cert=True,
         basic_auth=None,
     ):
-        """Make a GET requests."""
-        response = self.client.get(url, headers=headers, params=params, auth=basic_auth)
-        log.debug(f"GET {response.url}")
+        """Make a GET requests.
+
+        Responses for URLs with a TTL in the cache are served from the cache.
+        Identical requests made at the same time share one response, which
+        each caller decodes on its own.
+        """
+        key = flight_key(self.flights, url, headers, params, basic_auth)
+        cacheable = self.cache is not None and self.cache.cacheable(url)
+        if cacheable:
+            response = self.cache.get(url, params)
+            if response is not None:
+                log.debug("GET %s (cached)", response.url)
+                return handle_response(response, as_json)
+
+            # Expired entries can be revalidated instead of downloaded again.
+            stale = self.cache.get_stale(url, params)
+            headers = (headers or {}) | revalidation_headers(stale)
+
+        def fetch():
+            response = self._send(
+                "GET", url, True, headers=headers, params=params, auth=basic_auth
+            )
+            log.debug("GET %s", response.url)
+            if cacheable:
+                response = self._update_cache(url, params, response, stale)
+            return response
+
+        response = fetch() if key is None else self.flights.do(key, fetch)
         return handle_response(response, as_json)
 
-    def post(self, url, headers=None, data=None):
-        """Make a POST requests."""
-        response = self.client.post(url, headers=headers, json=data)
-        log.debug(f"POST {response.url} :: {data}")
+    def iter_json(self, url, headers=None, params=None):
+        """Make a streaming GET request and yield the items of a JSON array.
+
+        The body is decoded incrementally while it is downloaded, so only one
+        item at a time is held in memory. A body that is not a JSON array is
+        yielded as a single item.
+        """
+        response = self._send(
+            "GET", url, True, stream=True, headers=headers, params=params
+        )
+        try:
+            log.debug("GET %s (streaming)", response.url)
+            if not 200 <= response.status_code < 300:
+                response.read()
+                handle_response(response)
+                return
+
+            decoder = JsonArrayDecoder()
+            for chunk in response.iter_text():
+                yield from decoder.feed(chunk)
+            yield from decoder.close()
+        finally:
+            response.close()
+
+    def send(self, method, url, headers=None, retry=False):
+        """Make a request and return its status code without decoding the body.
+
+        This is for requests which only matter for their effect, like the
+        HTML pages answering with a redirect. The body is only decoded to
+        raise an HttpError for an error response. Otherwise up to DRAIN_LIMIT
+        bytes of it are read and dropped, so the connection can be reused;
+        a larger body closes the connection instead. The requests change
+        state even when they are GET requests, like closing a timer, so they
+        are only retried with `retry=True`.
+        """
+        response = self._send(method, url, retry, stream=True, headers=headers)
+        try:
+            log.debug("%s %s (status only)", method, response.url)
+            if response.status_code >= 400:
+                response.read()
+                handle_response(response)
+            else:
+                # A small body is read, so the connection goes back to the pool.
+                size = 0
+                for chunk in response.iter_raw():
+                    size += len(chunk)
+                    if size > DRAIN_LIMIT:
+                        break
+            return response.status_code
+        finally:
+            response.close()
+
+    def post(self, url, headers=None, data=None, retry=False):
+        """Make a POST requests.
+
+        POST requests are only retried with `retry=True`, because most of
+        them are not idempotent.
+        """
+        response = self._send("POST", url, retry, headers=headers, json=data)
+        if self.cache is not None:
+            # Writes make cached searches of the same resource stale.
+            self.cache.invalidate(url)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("POST %s :: %s", response.url, sample_payload(data))
         return handle_response(response)
 
-    def delete(self, url, headers=None):
-        """Make a DELETE requests."""
-        response = self.client.delete(url, headers=headers)
-        log.debug(f"DELETE {response.url}")
+    def delete(self, url, headers=None, retry=False):
+        """Make a DELETE requests.
+
+        DELETE requests are only retried with `retry=True`.
+        """
+        response = self._send("DELETE", url, retry, headers=headers)
+        if self.cache is not None:
+            # Writes make cached searches of the same resource stale.
+            self.cache.invalidate(url)
+        log.debug("DELETE %s", response.url)
         return handle_response(response)
 
+    def _send(self, method, url, retry, stream=False, auth=None, **kwargs):
+        """Send a request and retry it according to the retry policy."""
+        request = self.client.build_request(method, url, **kwargs)
+        if self.retry is None:
+            self._throttle(method)
+            return self.client.send(request, stream=stream, auth=auth)
+
+        host = request.url.host
+        attempt = 0
+        while True:
+            if not self.retry.breaker.allow(host):
+                raise CircuitOpenError(
+                    f"Circuit open for {host}: {method} {request.url}"
+                )
+            self._throttle(method)
+            try:
+                response = self.client.send(request, stream=stream, auth=auth)
+            except httpx.TransportError as err:
+                self.retry.breaker.record(host, ok=False)
+                delay = self.retry.delay(attempt, retry, error=err)
+                if delay is None:
+                    raise
+                reason = repr(err)
+            else:
+                self.retry.breaker.record(host, ok=response.status_code < 500)
+                delay = self.retry.delay(attempt, retry, response=response)
+                if delay is None:
+                    return response
+                response.close()
+                reason = response.status_code
+
+            log.info(
+                "Retrying %s %s in %.2fs after %s", method, request.url, delay, reason
+            )
+            time.sleep(delay)
+            attempt += 1
+
+    def _throttle(self, method):
+        """Wait for the rate limiter to allow a request."""
+        if self.limiter is not None:
+            delay = self.limiter.reserve(method)
+            if delay > 0:
+                time.sleep(delay)
+
+    def _update_cache(self, url, params, response, stale):
+        if response.status_code == 304 and stale is not None:
+            log.debug("GET %s (revalidated)", response.url)
+            response = stale
+        if 200 <= response.status_code < 300:
+            self.cache.set(url, params, response)
+        return response
+
+    def structuring(self, url):
+        """Returns a context which measures structuring the response of url."""
+        if self.metrics is None:
+            return nullcontext()
+        return self.metrics.structuring(url)
+
+    def structuring_items(self, url):
+        """Returns a context which measures structuring the items of url.
+
+        See `Metrics.structuring_items`.
+        """
+        if self.metrics is None:
+            return nullcontext(nullcontext())
+        return self.metrics.structuring_items(url)
+
     def close(self):
         """Close the client."""
         log.debug("Closing client")
+        if self.pool_stats is not None:
+            log.debug("Connection pool: %s", self.pool_stats.stats())
+        if self.retry is not None:
+            log.debug("Retries: %s", self.retry.stats())
+        if self.limiter is not None:
+            log.debug("Rate limits: %s", self.limiter.stats())
+        if self.flights is not None:
+            log.debug("Coalesced requests: %s", self.flights.stats())
         self.client.close()
+        if self.cache is not None:
+            self.cache.close()
         log.debug("HttpClient closed")
+        # Written last, so a file which cannot be written leaks nothing.
+        if self.metrics is not None:
+            log.debug("Metrics: %s", self.metrics.snapshot())
+            self.metrics.write_to_env_file()
+
+
+@frozen
+class AsyncHttpClient:
+    """An asynchronous client for basic HTTP requests/responses."""
+
+    client: httpx.AsyncClient
+    cache: "ResponseCache | DiskCache | None" = None
+    pool_stats: "PoolStats | None" = None
+    retry: "RetryPolicy | None" = None
+    limiter: "RateLimiter | None" = None
+    flights: "AsyncSingleFlight | None" = None
+    metrics: "Metrics | None" = None
+
+    @classmethod
+    def with_extra_headers(
+        cls,
+        base_url,
+        headers,
+        cache=None,
+        pool=None,
+        retry=None,
+        limiter=None,
+        coalesce=True,
+        transport=None,
+    ) -> "AsyncHttpClient":
+        """Returns a client with pool settings, by default those of httpx.
+
+        A transport replaces the network, like `httpx.ASGITransport` for
+        the fake server in `visoma.fakeserver`.
+        """
+        from visoma.metrics import Metrics
+        from visoma.pool import PoolSettings
+        from visoma.pool import PoolStats
+        from visoma.singleflight import AsyncSingleFlight
+
+        headers = DEFAULT_HEADERS | headers
+        pool = pool if pool is not None else PoolSettings()
+        pool_stats = PoolStats()
+        metrics = Metrics()
+        client = httpx.AsyncClient(
+            timeout=pool.timeout(),
+            limits=pool.limits(),
+            http2=pool.http2,
+            base_url=base_url,
+            headers=headers,
+            event_hooks={
+                "request": [pool_stats.on_async_request, metrics.on_async_request],
+                "response": [metrics.on_async_response],
+            },
+            transport=transport,
+        )
+        flights = AsyncSingleFlight() if coalesce else None
+        return cls(client, cache, pool_stats, retry, limiter, flights, metrics)
+
+    async def get(
+        self,
+        url,
+        headers=None,
+        params=None,
+        as_json=True,
+        verify_cert=True,
+        basic_auth=None,
+    ):
+        """Make a GET requests.
+
+        See `HttpClient.get` for details.
+        """
+        key = flight_key(self.flights, url, headers, params, basic_auth)
+        cacheable = self.cache is not None and self.cache.cacheable(url)
+        if cacheable:
+            response = self.cache.get(url, params)
+            if response is not None:
+                log.debug("GET %s (cached)", response.url)
+                return handle_response(response, as_json)
+
+            # Expired entries can be revalidated instead of downloaded again.
+            stale = self.cache.get_stale(url, params)
+            headers = (headers or {}) | revalidation_headers(stale)
+
+        async def fetch():
+            response = await self._send(
+                "GET", url, True, headers=headers, params=params, auth=basic_auth
+            )
+            log.debug("GET %s", response.url)
+            if cacheable:
+                response = self._update_cache(url, params, response, stale)
+            return response
+
+        response = await (fetch() if key is None else self.flights.do(key, fetch))
+        return handle_response(response, as_json)
+
+    async def iter_json(self, url, headers=None, params=None):
+        """Make a streaming GET request and yield the items of a JSON array.
+
+        See `HttpClient.iter_json` for details.
+        """
+        response = await self._send(
+            "GET", url, True, stream=True, headers=headers, params=params
+        )
+        try:
+            log.debug("GET %s (streaming)", response.url)
+            if not 200 <= response.status_code < 300:
+                await response.aread()
+                handle_response(response)
+                return
+
+            decoder = JsonArrayDecoder()
+            async for chunk in response.aiter_text():
+                for item in decoder.feed(chunk):
+                    yield item
+            for item in decoder.close():
+                yield item
+        finally:
+            await response.aclose()
+
+    async def send(self, method, url, headers=None, retry=False):
+        """Make a request and return its status code without decoding the body.
+
+        See `HttpClient.send` for details.
+        """
+        response = await self._send(method, url, retry, stream=True, headers=headers)
+        try:
+            log.debug("%s %s (status only)", method, response.url)
+            if response.status_code >= 400:
+                await response.aread()
+                handle_response(response)
+            else:
+                # A small body is read, so the connection goes back to the pool.
+                size = 0
+                async for chunk in response.aiter_raw():
+                    size += len(chunk)
+                    if size > DRAIN_LIMIT:
+                        break
+            return response.status_code
+        finally:
+            await response.aclose()
+
+    async def post(self, url, headers=None, data=None, retry=False):
+        """Make a POST requests.
+
+        POST requests are only retried with `retry=True`.
+        """
+        response = await self._send("POST", url, retry, headers=headers, json=data)
+        if self.cache is not None:
+            # Writes make cached searches of the same resource stale.
+            self.cache.invalidate(url)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("POST %s :: %s", response.url, sample_payload(data))
+        return handle_response(response)
+
+    async def delete(self, url, headers=None, retry=False):
+        """Make a DELETE requests.
+
+        DELETE requests are only retried with `retry=True`.
+        """
+        response = await self._send("DELETE", url, retry, headers=headers)
+        if self.cache is not None:
+            # Writes make cached searches of the same resource stale.
+            self.cache.invalidate(url)
+        log.debug("DELETE %s", response.url)
+        return handle_response(response)
+
+    async def _send(self, method, url, retry, stream=False, auth=None, **kwargs):
+        """Send a request and retry it according to the retry policy."""
+        request = self.client.build_request(method, url, **kwargs)
+        if self.retry is None:
+            await self._throttle(method)
+            return await self.client.send(request, stream=stream, auth=auth)
+
+        host = request.url.host
+        attempt = 0
+        while True:
+            if not self.retry.breaker.allow(host):
+                raise CircuitOpenError(
+                    f"Circuit open for {host}: {method} {request.url}"
+                )
+            await self._throttle(method)
+            try:
+                response = await self.client.send(request, stream=stream, auth=auth)
+            except httpx.TransportError as err:
+                self.retry.breaker.record(host, ok=False)
+                delay = self.retry.delay(attempt, retry, error=err)
+                if delay is None:
+                    raise
+                reason = repr(err)
+            else:
+                self.retry.breaker.record(host, ok=response.status_code < 500)
+                delay = self.retry.delay(attempt, retry, response=response)
+                if delay is None:
+                    return response
+                await response.aclose()
+                reason = response.status_code
+
+            log.info(
+                "Retrying %s %s in %.2fs after %s", method, request.url, delay, reason
+            )
+            await async_sleep(delay)
+            attempt += 1
+
+    async def _throttle(self, method):
+        """Wait for the rate limiter to allow a request."""
+        if self.limiter is not None:
+            delay = self.limiter.reserve(method)
+            if delay > 0:
+                await async_sleep(delay)
+
+    def _update_cache(self, url, params, response, stale):
+        if response.status_code == 304 and stale is not None:
+            log.debug("GET %s (revalidated)", response.url)
+            response = stale
+        if 200 <= response.status_code < 300:
+            self.cache.set(url, params, response)
+        return response
+
+    def structuring(self, url):
+        """Returns a context which measures structuring the response of url."""
+        if self.metrics is None:
+            return nullcontext()
+        return self.metrics.structuring(url)
+
+    def structuring_items(self, url):
+        """Returns a context which measures structuring the items of url.
+
+        See `Metrics.structuring_items`.
+        """
+        if self.metrics is None:
+            return nullcontext(nullcontext())
+        return self.metrics.structuring_items(url)
+
+    async def close(self):
+        """Close the client."""
+        log.debug("Closing client")
+        if self.pool_stats is not None:
+            log.debug("Connection pool: %s", self.pool_stats.stats())
+        if self.retry is not None:
+            log.debug("Retries: %s", self.retry.stats())
+        if self.limiter is not None:
+            log.debug("Rate limits: %s", self.limiter.stats())
+        if self.flights is not None:
+            log.debug("Coalesced requests: %s", self.flights.stats())
+        await self.client.aclose()
+        if self.cache is not None:
+            self.cache.close()
+        log.debug("AsyncHttpClient closed")
+        # Written last, so a file which cannot be written leaks nothing.
+        if self.metrics is not None:
+            log.debug("Metrics: %s", self.metrics.snapshot())
+            self.metrics.write_to_env_file()
+
+
+async def async_sleep(seconds):
+    # Only async clients need asyncio, which is slow to import.
+    import asyncio
+
+    await asyncio.sleep(seconds)
+
+
+def flight_key(flights, url, headers, params, basic_auth) -> str | None:
+    """Returns the key for coalescing a GET request, or None to send it alone.
+
+    Requests with their own headers or credentials are not coalesced, because
+    their responses may differ.
+    """
+    if flights is None or headers or basic_auth is not None:
+        return None
+    from visoma.cache import cache_key
+
+    return cache_key(url, params)
+
+
+def revalidation_headers(response) -> dict[str, str]:
+    """Returns conditional request headers for revalidating a cached response."""
+    if response is None:
+        return {}
+
+    headers = {}
+    if "etag" in response.headers:
+        headers["if-none-match"] = response.headers["etag"]
+    if "last-modified" in response.headers:
+        headers["if-modified-since"] = response.headers["last-modified"]
+    return headers
 
 
 def handle_response(response, as_json=True):
     """Handle HTTP responses."""
-    log.debug(f"Response: {response.status_code}")
+    log.debug("Response: %s", response.status_code)
 
     # Success
     if 200 <= response.status_code < 300:
         if as_json:
             response = response.json()
-            log.debug(f"Response: {json.dumps(response, indent=4)}")
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("Response: %s", sample_payload(response))
         else:
             response = response.text
-            # Extract the first line of potentially long text (could be a
-            # whole HTML page)
-            log.debug(f"Response: {response.partition('\n')[0]}")
+            if log.isEnabledFor(logging.DEBUG):
+                # Extract the first line of potentially long text (could be a
+                # whole HTML page)
+                log.debug("Response: %s", sample_payload(response.partition("\n")[0]))
         return response
 
     # Redirect
@@ -86,3 +613,79 @@ def handle_response(response, as_json=True):
 
     else:
         raise HttpError(f"{response.status_code}: {response.text}")
+
+
+@define
+class JsonArrayDecoder:
+    """Incremental decoder for the items of a top-level JSON array.
+
+    Text is fed in chunks of any size. Each call returns the items which are
+    complete so far. When the document is not an array, it is decoded as a
+    whole on close and returned as a single item.
+    """
+
+    buffer: str = ""
+    pos: int = 0
+    # One of: start, first, value, separator, end, other
+    state: str = "start"
+    decoder: json.JSONDecoder = field(factory=json.JSONDecoder)
+
+    def feed(self, text: str) -> list:
+        """Add a chunk of text and return the items completed by it."""
+        self.buffer = self.buffer[self.pos :] + text
+        self.pos = 0
+        return self._decode(final=False)
+
+    def close(self) -> list:
+        """Finish decoding and return the remaining items."""
+        items = self._decode(final=True)
+        if self.state == "other":
+            return [json.loads(self.buffer)]
+        if self.state != "end":
+            raise ValueError(f"Incomplete JSON array: {self.buffer[:100]!r}")
+        return items
+
+    def _decode(self, final: bool) -> list:
+        items = []
+        buffer = self.buffer
+        while self.state not in ("end", "other"):
+            pos = self.pos
+            while pos < len(buffer) and buffer[pos] in " \t\n\r":
+                pos += 1
+            self.pos = pos
+            if pos == len(buffer):
+                break
+
+            char = buffer[pos]
+            if self.state == "start":
+                if char == "[":
+                    self.state = "first"
+                    self.pos += 1
+                else:
+                    self.state = "other"
+            elif char == "]" and self.state in ("first", "separator"):
+                self.state = "end"
+            elif self.state == "separator":
+                if char != ",":
+                    raise ValueError(
+                        f"Expected ',' or ']' at {buffer[pos : pos + 20]!r}"
+                    )
+                self.state = "value"
+                self.pos += 1
+            else:
+                try:
+                    item, end = self.decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    break
+                # A number may continue in the next chunk, even when it
+                # decodes, like "1." of "1.5e3". It is complete once
+                # anything but a digit, sign, point or exponent follows it.
+                if not final and not isinstance(item, (str, list, dict)):
+                    if end == len(buffer) or buffer[end] in NUMBER_CHARS:
+                        break
+                items.append(item)
+                self.state = "separator"
+                self.pos = end
+        return items
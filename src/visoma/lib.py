@@ -1,6 +1,27 @@
 from attrs import define
-import cattrs
+from attrs import fields
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+from itertools import islice
+from operator import attrgetter
+from functools import cache
+from types import NoneType
+from typing import TYPE_CHECKING
+from typing import get_args
 import logging
+import re
+
+from visoma.tracing import sample_payload
+
+# cattrs is imported when it is used first, because it is slow to import and
+# not every command needs it.
+if TYPE_CHECKING:
+    import cattrs
 
 log = logging.getLogger(__name__)
 
@@ -9,19 +30,162 @@ class FiltersError(Exception):
     pass
 
 
-def structure(data, cls):
+# Message of a search without results, like "No Timer found".
+NO_RESULTS = re.compile(r"No .+ found", re.IGNORECASE)
+
+
+def is_no_results(err: ValueError) -> bool:
+    """Returns whether a search failed only because nothing was found."""
+    return NO_RESULTS.fullmatch(str(err)) is not None
+
+
+def make_converter() -> "cattrs.Converter":
+    """Returns a converter with the hooks shared by all Visoma models.
+
+    Each model family gets its own converter, so hooks for one family (like
+    the date format of projects) do not leak into the others.
+    """
+    import cattrs
+
+    converter = cattrs.Converter()
+    converter.register_structure_hook(datetime, lambda v, _: datetime.fromisoformat(v))
+    converter.register_unstructure_hook(datetime, lambda v: v.isoformat(sep=" "))
+    return converter
+
+
+def register_models(converter: "cattrs.Converter", *classes) -> None:
+    """Registers precompiled structure and unstructure functions for attrs classes.
+
+    The functions are compiled when a class is structured or unstructured
+    for the first time, so importing a model module stays cheap.
+    """
+    for cls in classes:
+        converter.register_structure_hook(
+            cls,
+            compile_on_first_use(
+                make_structure_fn, cls, converter, converter.register_structure_hook
+            ),
+        )
+        converter.register_unstructure_hook(
+            cls,
+            compile_on_first_use(
+                make_unstructure_fn, cls, converter, converter.register_unstructure_hook
+            ),
+        )
+
+
+def compile_on_first_use(make_fn, cls, converter, register):
+    """Returns a hook which compiles the real hook and replaces itself with it."""
+
+    def hook(*args):
+        fn = make_fn(cls, converter)
+        register(cls, fn)
+        return fn(*args)
+
+    return hook
+
+
+def optional_type(type_):
+    """Returns T for an optional type `T | None`, otherwise None."""
+    args = get_args(type_)
+    if NoneType in args and len(args) == 2:
+        return next(arg for arg in args if arg is not NoneType)
+    return None
+
+
+def make_structure_fn(cls, converter: "cattrs.Converter"):
+    """Returns a structure function for an attrs class.
+
+    Data is first structured without detailed validation, which is faster.
+    Only when that fails, it is structured again with detailed validation to
+    raise a ClassValidationError telling what is wrong.
+    """
+    from cattrs.gen import make_dict_structure_fn
+    from cattrs.gen import override
+
+    overrides = {}
+    for attribute in fields(cls):
+        type_ = optional_type(attribute.type)
+        if type_ is not None:
+            hook = make_optional_hook(type_, converter)
+            overrides[attribute.name] = override(struct_hook=hook)
+
+    fast = make_dict_structure_fn(
+        cls, converter, _cattrs_detailed_validation=False, **overrides
+    )
+    detailed = make_dict_structure_fn(
+        cls, converter, _cattrs_detailed_validation=True, **overrides
+    )
+
+    def structure(data, _):
+        try:
+            return fast(data, cls)
+        except Exception:
+            return detailed(data, cls)
+
+    return structure
+
+
+def make_optional_hook(type_, converter: "cattrs.Converter"):
+    """Returns a structure hook for `type_ | None` without dispatching per value."""
+    if type_ in (bool, float, int, str):
+        return lambda v, _: v if v is None else type_(v)
+
+    hook = converter.get_structure_hook(type_)
+    return lambda v, _: v if v is None else hook(v, type_)
+
+
+def make_unstructure_fn(cls, converter: "cattrs.Converter"):
+    """Returns an unstructure function which leaves out attributes set to None.
+
+    The hooks for all attributes are looked up once. Attributes which need no
+    conversion are copied as they are.
+    """
+    from cattrs.fns import identity
+
+    names = []
+    hooks = []
+    for attribute in fields(cls):
+        # None is never unstructured, so optionals only need the inner hook.
+        type_ = optional_type(attribute.type) or attribute.type
+        hook = converter.get_unstructure_hook(type_)
+        names.append(attribute.name)
+        hooks.append(None if hook is identity else hook)
+
+    pairs = list(zip(names, hooks, strict=True))
+    values = attrgetter(*names)
+    if len(names) == 1:
+        # attrgetter returns a plain value instead of a tuple for one name.
+        values = attrgetter(names[0], names[0])
+
+    def unstructure(obj):
+        return {
+            name: value if hook is None else hook(value)
+            for (name, hook), value in zip(pairs, values(obj), strict=False)
+            if value is not None
+        }
+
+    return unstructure
+
+
+def structure(data, cls, converter: "cattrs.Converter"):
+    import cattrs
 
-    log.debug("Structuring data")
-    log.debug(f"cls={cls}")
-    log.debug(f"data={data}")
     try:
-        r = cattrs.structure(data, cls)
-        log.debug(f"result={r}")
-        return r
+        r = converter.structure(data, cls)
     except cattrs.errors.ClassValidationError as err:
-        log.error(f"ClassValidationError: {err.args}")
+        log.error("ClassValidationError: %s", err.args)
         raise
 
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug(
+            "Structured %s: data=%s result=%s",
+            cls.__name__,
+            sample_payload(data),
+            sample_payload(r),
+        )
+    return r
+
 
 @define
 class VisomaResponse:
@@ -37,7 +201,33 @@ class VisomaResponse:
             # Invalidate data to fail the struct
             # TODO: Find a better way
             del data["Success"]
-        return cattrs.structure(data, cls)
+        return response_converter().structure(data, cls)
+
+
+@define
+class Outcome:
+    """Represents the outcome of one operation of a bulk request."""
+
+    Id: int
+    Success: bool
+    Message: str = ""
+
+    @classmethod
+    def from_result(cls, idx: int, result) -> "Outcome":
+        """Returns the outcome for a response, an exception or None (no response)."""
+        if isinstance(result, Exception):
+            return cls(idx, False, str(result) or type(result).__name__)
+        if isinstance(result, VisomaResponse):
+            return cls(idx, result.Success, result.Message)
+        return cls(idx, True)
+
+
+@cache
+def response_converter() -> "cattrs.Converter":
+    """Returns the converter for responses, created on first use."""
+    converter = make_converter()
+    register_models(converter, VisomaResponse)
+    return converter
 
 
 def visoma_params_from_filters_with_limit(filters, limit):
@@ -56,5 +246,172 @@ def visoma_params_from_filters_with_limit(filters, limit):
     # Add limit. This param is case sensitive.
     params["params[QueryLimit]"] = limit
 
-    log.debug(f"Visoma params: {params}")
+    log.debug("Visoma params: %s", params)
     return params
+
+
+def scan_bounds(start, end, step=None):
+    """Returns normalized bounds and step for a range scan.
+
+    Ranges are either date ranges or Id ranges. Dates can be given as ISO
+    strings like they come in from the command line. The step is the number of
+    days or Ids per window.
+    """
+    if isinstance(start, str):
+        start = date.fromisoformat(start)
+    if isinstance(end, str):
+        end = date.fromisoformat(end)
+
+    if isinstance(start, int) and isinstance(end, int):
+        step = step if step else 1000
+    elif isinstance(start, date) and isinstance(end, date):
+        step = step if step else 7
+        step = step if isinstance(step, timedelta) else timedelta(days=step)
+    else:
+        raise FiltersError(f"Scan bounds must be two dates or two Ids: {start}, {end}")
+
+    if end < start:
+        raise FiltersError(f"Scan end must not be before start: {start}, {end}")
+
+    return start, end, step
+
+
+# Search filters for the lower and upper bound of an Id window of a scan.
+SCAN_ID_FILTERS = ("IdFrom", "IdTo")
+# Upper bound of the Ids of a day which has more records than the limit.
+MAX_ID = 2**63 - 1
+
+
+def scan(
+    list_,
+    date_filters,
+    start,
+    end,
+    step=None,
+    limit=500,
+    filters=None,
+    concurrency=4,
+):
+    """Returns an iterator of all records of a search in a date or Id range.
+
+    The range is searched in windows with `list_(limit=..., filters=...)`,
+    the `list` method of a manager, see `scan_windows`. The bounds of a
+    window are added to the filters: `date_filters` like ("StartFrom",
+    "StartTo") for dates, IdFrom and IdTo for Ids. A window without results
+    answers with a message like "No Timer found" and counts as empty, other
+    errors are raised. A day with more records than the limit is searched
+    in Id windows within the day.
+    """
+    start, end, step = scan_bounds(start, end, step)
+    lo_key, hi_key = SCAN_ID_FILTERS if isinstance(start, int) else date_filters
+
+    def fetch(lo, hi, ids=None):
+        window = (filters or {}) | {lo_key: lo, hi_key: hi}
+        if ids is not None:
+            window |= dict(zip(SCAN_ID_FILTERS, ids, strict=True))
+        try:
+            return list_(limit=limit, filters=window)
+        except ValueError as err:
+            # An empty window answers with a message instead of a list.
+            if not is_no_results(err):
+                raise
+            log.debug("Empty scan window %s..%s %s: %s", lo, hi, ids or "", err)
+            return []
+
+    return scan_windows(fetch, start, end, step, limit, concurrency)
+
+
+def scan_windows(fetch, start, end, step, limit, concurrency=4):
+    """Yields all items in a range by fetching it in windows.
+
+    The range [start, end] is cut into closed windows of size step. Each window
+    is fetched with `fetch(lo, hi, ids)` in a thread pool, where ids is None.
+    When a window returns `limit` items it may be truncated, so it is split in
+    half and the halves are fetched again. A single day which is full is
+    split into the Ids (lo, hi) up to and after the median Id of its items,
+    which have an `Id`, and these are split again until they fit. Items are
+    yielded as soon as their window completes, so the order follows
+    completion, not the range.
+
+    At most `concurrency` windows are fetched or waiting to be consumed at a
+    time, so memory stays bounded however slowly the items are used. Closing
+    the generator cancels the windows not started yet.
+    """
+    unit = 1 if isinstance(start, int) else timedelta(days=1)
+
+    def cut():
+        lo = start
+        while lo <= end:
+            hi = min(lo + step - unit, end)
+            yield lo, hi, None
+            lo = hi + unit
+
+    def split(lo, hi, ids, items):
+        """Returns the halves of a full window, or None for a single record."""
+        if ids is None and lo < hi:
+            mid = lo + (hi - lo) // 2
+            log.debug("Splitting scan window %s..%s at %s", lo, hi, mid)
+            return [(lo, mid, None), (mid + unit, hi, None)]
+        if ids is None and unit == 1:
+            # A single Id has at most one record.
+            return None
+        first, last = ids or (0, MAX_ID)
+        if first == last:
+            return None
+        seen = sorted(item.Id for item in items)
+        mid = min(max(seen[len(seen) // 2], first), last - 1)
+        log.debug("Splitting scan window %s by Ids %s..%s at %s", lo, first, last, mid)
+        return [(lo, hi, (first, mid)), (lo, hi, (mid + 1, last))]
+
+    windows = cut()
+    # Halves of split windows, fetched before the next new window.
+    splits = deque()
+    pool = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        pending = {}
+        while True:
+            while len(pending) < concurrency:
+                window = splits.popleft() if splits else next(windows, None)
+                if window is None:
+                    break
+                pending[pool.submit(fetch, *window)] = window
+            if not pending:
+                return
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                window = pending.pop(future)
+                items = future.result()
+
+                if len(items) >= limit:
+                    halves = split(*window, items)
+                    if halves is not None:
+                        splits += halves
+                        continue
+
+                yield from items
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def map_concurrently(func, items, concurrency=8):
+    """Yields `func(item)` for all items, in order, with bounded concurrency.
+
+    At most `concurrency` calls run at the same time and only a few more items
+    are read ahead, so a long iterator of items is consumed as the results
+    are used. A failing call yields its exception instead of raising it, so
+    it does not abort the other calls.
+    """
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        pending = deque(
+            pool.submit(func, item) for item in islice(items, 2 * concurrency)
+        )
+        while pending:
+            future = pending.popleft()
+            for item in islice(items, 1):
+                pending.append(pool.submit(func, item))
+            try:
+                yield future.result()
+            except Exception as err:
+                yield err
@@ -0,0 +1,301 @@
+"""Per-endpoint metrics of the HTTP clients.
+
+Requests are counted by endpoint template, like `/api2/timer/{id}`, and
+method. Per endpoint, `Metrics` records the status classes of responses, a
+histogram of the latency until the response headers arrive, request bytes,
+the response bytes downloaded and a histogram of the time spent structuring
+responses into models. The metrics are collected with httpx event hooks and read with
+`snapshot` or exported in the Prometheus text format with `prometheus`.
+"""
+
+from attrs import define
+from attrs import field
+from collections import Counter
+from collections.abc import Callable
+from contextlib import contextmanager
+import bisect
+import httpx
+import logging
+import os
+import re
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+# Upper bounds in seconds of the histogram buckets, like those of Prometheus.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+STARTED = "visoma.started"
+
+ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+DATE_SEGMENT = re.compile(r"/\d{4}-\d{2}-\d{2}(?=/|$)")
+
+
+def endpoint_template(path: str) -> str:
+    """Returns the template of a path, like /api2/timer/{id} for /api2/timer/42."""
+    path = DATE_SEGMENT.sub("/{date}", path)
+    return ID_SEGMENT.sub("/{id}", path)
+
+
+@define
+class Histogram:
+    """Counts of observed values per bucket, with their sum."""
+
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    counts: list[int] = field(init=False)
+    count: int = field(default=0, init=False)
+    sum: float = field(default=0.0, init=False)
+
+    def __attrs_post_init__(self):
+        # The last count is for values above the largest bucket.
+        self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> dict[str, int]:
+        """Returns the number of values up to each bucket bound, with "+Inf"."""
+        total = 0
+        result = {}
+        for bound, count in zip(self.buckets, self.counts, strict=False):
+            total += count
+            result[f"{bound:g}"] = total
+        result["+Inf"] = self.count
+        return result
+
+    def snapshot(self) -> dict:
+        return {"count": self.count, "sum": self.sum, "buckets": self.cumulative()}
+
+
+@define
+class Stopwatch:
+    """Sums the time spent inside it, which can be entered many times."""
+
+    clock: Callable[[], float]
+    elapsed: float = 0.0
+    _started: float = field(default=0.0, init=False, repr=False)
+
+    def __enter__(self) -> "Stopwatch":
+        self._started = self.clock()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.elapsed += self.clock() - self._started
+
+
+class CountedStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """A response stream which calls `on_close` when the response is closed."""
+
+    def __init__(self, stream, on_close: Callable[[], None]):
+        self.stream = stream
+        self.on_close = on_close
+
+    def __iter__(self):
+        yield from self.stream
+
+    async def __aiter__(self):
+        async for chunk in self.stream:
+            yield chunk
+
+    def close(self) -> None:
+        try:
+            self.stream.close()
+        finally:
+            self.on_close()
+
+    async def aclose(self) -> None:
+        try:
+            await self.stream.aclose()
+        finally:
+            self.on_close()
+
+
+@define
+class EndpointMetrics:
+    """Metrics of one endpoint and method."""
+
+    requests: int = 0
+    statuses: Counter = field(factory=Counter)
+    latency: Histogram = field(factory=Histogram)
+    request_bytes: int = 0
+    response_bytes: int = 0
+    structuring: Histogram = field(factory=Histogram)
+
+    def snapshot(self) -> dict:
+        return {
+            "requests": self.requests,
+            "statuses": dict(sorted(self.statuses.items())),
+            "latency_seconds": self.latency.snapshot(),
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+            "structuring_seconds": self.structuring.snapshot(),
+        }
+
+
+@define
+class Metrics:
+    """Metrics of all requests of a client, by method and endpoint template.
+
+    The latency of a request is the time from sending it until the response
+    headers arrive. Response bytes are those downloaded, counted when the
+    response is closed, so compressed bodies count compressed and bodies
+    which are not read count as far as they were read.
+    """
+
+    clock: Callable[[], float] = time.perf_counter
+
+    endpoints: dict[tuple[str, str], EndpointMetrics] = field(factory=dict, init=False)
+    _lock: threading.Lock = field(factory=threading.Lock, init=False, repr=False)
+
+    def _endpoint(self, method: str, path: str) -> EndpointMetrics:
+        key = (method, endpoint_template(path))
+        endpoint = self.endpoints.get(key)
+        if endpoint is None:
+            endpoint = self.endpoints.setdefault(key, EndpointMetrics())
+        return endpoint
+
+    def on_request(self, request: httpx.Request) -> None:
+        """Event hook which starts to measure a request."""
+        request.extensions[STARTED] = self.clock()
+
+    def on_response(self, response: httpx.Response) -> None:
+        """Event hook which records a response."""
+        request = response.request
+        started = request.extensions.get(STARTED)
+        latency = self.clock() - started if started is not None else 0.0
+        try:
+            sent = len(request.content)
+        except httpx.RequestNotRead:
+            sent = 0
+
+        with self._lock:
+            endpoint = self._endpoint(request.method, request.url.path)
+            endpoint.requests += 1
+            endpoint.statuses[f"{response.status_code // 100}xx"] += 1
+            endpoint.latency.observe(latency)
+            endpoint.request_bytes += sent
+
+        # The body is read after the hooks ran.
+        def on_close():
+            with self._lock:
+                endpoint.response_bytes += response.num_bytes_downloaded
+
+        if response.is_closed:
+            on_close()
+        else:
+            response.stream = CountedStream(response.stream, on_close)
+
+    async def on_async_request(self, request: httpx.Request) -> None:
+        """Event hook which starts to measure a request of an async client."""
+        self.on_request(request)
+
+    async def on_async_response(self, response: httpx.Response) -> None:
+        """Event hook which records a response of an async client."""
+        self.on_response(response)
+
+    @contextmanager
+    def structuring(self, url: str, method: str = "GET"):
+        """Measures the time spent structuring the response of an endpoint."""
+        started = self.clock()
+        try:
+            yield
+        finally:
+            elapsed = self.clock() - started
+            with self._lock:
+                self._endpoint(method, url).structuring.observe(elapsed)
+
+    @contextmanager
+    def structuring_items(self, url: str, method: str = "GET"):
+        """Measures the time spent structuring the items of a streamed response.
+
+        Yields a `Stopwatch` to enter around structuring each item, so the
+        download in between is not measured. The sum is recorded once.
+        """
+        stopwatch = Stopwatch(self.clock)
+        try:
+            yield stopwatch
+        finally:
+            with self._lock:
+                self._endpoint(method, url).structuring.observe(stopwatch.elapsed)
+
+    def snapshot(self) -> dict[str, dict]:
+        """Returns the metrics per endpoint, keyed like "GET /api2/timer/search/"."""
+        with self._lock:
+            return {
+                f"{method} {path}": endpoint.snapshot()
+                for (method, path), endpoint in sorted(self.endpoints.items())
+            }
+
+    def prometheus(self, prefix: str = "visoma") -> str:
+        """Returns the metrics in the Prometheus text exposition format."""
+        counters = (
+            ("requests_total", "Requests by status class.", "requests"),
+            ("request_bytes_total", "Bytes of request bodies.", "request_bytes"),
+            (
+                "response_bytes_total",
+                "Bytes of response bodies downloaded.",
+                "response_bytes",
+            ),
+        )
+        histograms = (
+            ("request_duration_seconds", "Time until response headers.", "latency"),
+            (
+                "structuring_duration_seconds",
+                "Time structuring responses.",
+                "structuring",
+            ),
+        )
+        with self._lock:
+            endpoints = sorted(self.endpoints.items())
+            lines = []
+            for name, help, attribute in counters:
+                lines += [
+                    f"# HELP {prefix}_{name} {help}",
+                    f"# TYPE {prefix}_{name} counter",
+                ]
+                for (method, path), endpoint in endpoints:
+                    labels = f'endpoint="{path}",method="{method}"'
+                    if attribute == "requests":
+                        for status, count in sorted(endpoint.statuses.items()):
+                            lines.append(
+                                f'{prefix}_{name}{{{labels},status="{status}"}} {count}'
+                            )
+                    else:
+                        value = getattr(endpoint, attribute)
+                        lines.append(f"{prefix}_{name}{{{labels}}} {value}")
+
+            for name, help, attribute in histograms:
+                lines += [
+                    f"# HELP {prefix}_{name} {help}",
+                    f"# TYPE {prefix}_{name} histogram",
+                ]
+                for (method, path), endpoint in endpoints:
+                    histogram = getattr(endpoint, attribute)
+                    if not histogram.count:
+                        continue
+                    labels = f'endpoint="{path}",method="{method}"'
+                    for bound, count in histogram.cumulative().items():
+                        lines.append(
+                            f'{prefix}_{name}_bucket{{{labels},le="{bound}"}} {count}'
+                        )
+                    lines.append(f"{prefix}_{name}_sum{{{labels}}} {histogram.sum}")
+                    lines.append(f"{prefix}_{name}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_to_env_file(self) -> None:
+        """Writes the metrics to the file in VISOMA_METRICS_FILE, if it is set.
+
+        The file is replaced at once, so a Prometheus node exporter reading
+        it as a text file collector never sees a partial file.
+        """
+        path = os.getenv("VISOMA_METRICS_FILE")
+        if not path:
+            return
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as file:
+            file.write(self.prometheus())
+        os.replace(tmp, path)
+        log.debug("Wrote metrics to %s", path)
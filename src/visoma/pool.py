@@ -0,0 +1,171 @@
+"""Connection pool settings and statistics for the HTTP clients."""
+
+from attrs import define
+from attrs import field
+from attrs import frozen
+from collections.abc import Callable
+import httpx
+import importlib.util
+import logging
+import os
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 20
+
+
+def env_flag(name: str) -> bool:
+    return (os.getenv(name) or "").casefold() in ("1", "true", "yes", "on")
+
+
+@frozen
+class PoolSettings:
+    """Connection pool, keep-alive, HTTP/2 and timeout settings.
+
+    The defaults are the ones of httpx, except for the timeouts.
+    """
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 5.0
+    http2: bool = False
+    connect_timeout: float = DEFAULT_TIMEOUT
+    read_timeout: float = DEFAULT_TIMEOUT
+    pool_timeout: float = DEFAULT_TIMEOUT
+
+    @classmethod
+    def from_env(cls) -> "PoolSettings":
+        """Returns settings configured by environment variables.
+
+        Environment variables:
+            - VISOMA_POOL_SIZE: Maximum number of connections. The default
+              is 100.
+            - VISOMA_POOL_KEEPALIVE: Maximum number of idle connections
+              kept alive. The default is 20.
+            - VISOMA_POOL_KEEPALIVE_EXPIRY: Seconds an idle connection is
+              kept alive. The default is 5.
+            - VISOMA_HTTP2: Set to 1 to multiplex requests over HTTP/2
+              connections. This needs the h2 package, which comes with the
+              http2 extra of this package.
+            - VISOMA_CONNECT_TIMEOUT, VISOMA_READ_TIMEOUT,
+              VISOMA_POOL_TIMEOUT: Seconds to wait for a connection, for
+              response data and for a free connection in the pool. The
+              default is 20 each.
+
+        Raises:
+            ValueError when HTTP/2 is enabled but h2 is not installed.
+        """
+        settings = cls(
+            max_connections=int(os.getenv("VISOMA_POOL_SIZE") or 100),
+            max_keepalive_connections=int(os.getenv("VISOMA_POOL_KEEPALIVE") or 20),
+            keepalive_expiry=float(os.getenv("VISOMA_POOL_KEEPALIVE_EXPIRY") or 5),
+            http2=env_flag("VISOMA_HTTP2"),
+            connect_timeout=float(
+                os.getenv("VISOMA_CONNECT_TIMEOUT") or DEFAULT_TIMEOUT
+            ),
+            read_timeout=float(os.getenv("VISOMA_READ_TIMEOUT") or DEFAULT_TIMEOUT),
+            pool_timeout=float(os.getenv("VISOMA_POOL_TIMEOUT") or DEFAULT_TIMEOUT),
+        )
+        if settings.http2 and importlib.util.find_spec("h2") is None:
+            raise ValueError(
+                "VISOMA_HTTP2 needs the h2 package: pip install 'visoma[http2]'"
+            )
+        return settings
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(
+            DEFAULT_TIMEOUT,
+            connect=self.connect_timeout,
+            read=self.read_timeout,
+            pool=self.pool_timeout,
+        )
+
+
+@define
+class PoolStats:
+    """Counts new and reused connections and the time spent waiting for them.
+
+    The statistics are collected with the trace extension of httpcore. The
+    wait of a request is the time from sending it until a connection starts
+    to connect or, for a reused connection, until the request headers are
+    written. So it includes the wait for a free connection in the pool.
+    """
+
+    clock: Callable[[], float] = time.perf_counter
+
+    requests: int = field(default=0, init=False)
+    new_connections: int = field(default=0, init=False)
+    reused_connections: int = field(default=0, init=False)
+    wait_seconds: float = field(default=0.0, init=False)
+    max_wait_seconds: float = field(default=0.0, init=False)
+
+    _lock: threading.Lock = field(factory=threading.Lock, init=False, repr=False)
+
+    def tracer(self) -> Callable[[str, dict], None]:
+        """Returns a trace callback for a single request."""
+        started = self.clock()
+        pending = True
+
+        def trace(event: str, info: dict) -> None:
+            nonlocal pending
+            if not pending:
+                return
+            if event == "connection.connect_tcp.started":
+                reused = False
+            elif event.endswith(".send_request_headers.started"):
+                reused = True
+            else:
+                return
+            pending = False
+            self._record(self.clock() - started, reused)
+
+        return trace
+
+    def async_tracer(self):
+        """Returns a trace callback for a single request of an async client."""
+        trace = self.tracer()
+
+        async def atrace(event: str, info: dict) -> None:
+            trace(event, info)
+
+        return atrace
+
+    def on_request(self, request: httpx.Request) -> None:
+        """Event hook which traces a request of a client."""
+        request.extensions["trace"] = self.tracer()
+
+    async def on_async_request(self, request: httpx.Request) -> None:
+        """Event hook which traces a request of an async client."""
+        request.extensions["trace"] = self.async_tracer()
+
+    def _record(self, wait: float, reused: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            if reused:
+                self.reused_connections += 1
+            else:
+                self.new_connections += 1
+            self.wait_seconds += wait
+            self.max_wait_seconds = max(self.max_wait_seconds, wait)
+
+    def stats(self) -> dict[str, int | float]:
+        """Returns connection reuse and pool wait statistics."""
+        with self._lock:
+            requests = self.requests
+            return {
+                "requests": requests,
+                "new_connections": self.new_connections,
+                "reused_connections": self.reused_connections,
+                "reuse_ratio": self.reused_connections / requests if requests else 0.0,
+                "avg_wait_seconds": self.wait_seconds / requests if requests else 0.0,
+                "max_wait_seconds": self.max_wait_seconds,
+            }
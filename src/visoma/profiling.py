@@ -0,0 +1,157 @@
+"""Profiling of CLI commands.
+
+`visoma --profile timers list --limit=1000` runs the command under cProfile.
+It writes the profile to `visoma.prof`, or the path given like
+`--profile=timers.prof`, which `python -m pstats` and tools like snakeviz
+load. A summary goes to stderr: wall and CPU time, time by category
+(network, JSON decoding, structuring, own code, fire output, imports) and
+the functions with the most cumulative time.
+
+Peak memory is measured with tracemalloc only with VISOMA_PROFILE_MEMORY=1,
+because tracing every allocation slows the run and inflates the timings.
+Profile memory and time in separate runs.
+
+With `VISOMA_PROFILER=pyinstrument`, the sampling profiler pyinstrument
+replaces cProfile. It writes a session to `visoma.pyisession`, which
+`pyinstrument --load` opens.
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+import cProfile
+import logging
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+
+from visoma.pool import env_flag
+
+log = logging.getLogger(__name__)
+
+# Profile files by profiler.
+DEFAULT_PATHS = {"cprofile": "visoma.prof", "pyinstrument": "visoma.pyisession"}
+
+# Packages of each category, matched against the directories of a file.
+CATEGORIES = {
+    "network": ("httpx", "httpcore", "h11", "h2", "anyio"),
+    "json": ("json",),
+    "structuring": ("cattrs", "cattr", "attr", "attrs"),
+    "visoma": ("visoma",),
+    "output": ("fire",),
+    "imports": ("frozen",),
+}
+# Builtins, like socket reads, have no file and are matched by their name.
+BUILTINS = {
+    "network": ("_socket", "_ssl", "select."),
+    "json": ("_json",),
+    "output": ("builtins.print",),
+    "imports": ("builtins.exec", "builtins.__import__", "marshal.loads"),
+}
+PACKAGES = {
+    package: name for name, packages in CATEGORIES.items() for package in packages
+}
+
+
+def category(file: str, function: str) -> str:
+    """Returns the category of a function in a profile."""
+    if file == "~":
+        for name, parts in BUILTINS.items():
+            if any(part in function for part in parts):
+                return name
+        return "other"
+    if file.startswith("<"):
+        # Generated code, like "<cattrs generated ...>", and the import system.
+        return PACKAGES.get(file[1:].partition(" ")[0], "other")
+    # The innermost package decides, for installs inside a checkout.
+    for directory in reversed(file.replace("\\", "/").split("/")[:-1]):
+        if directory in PACKAGES:
+            return PACKAGES[directory]
+    return "other"
+
+
+def categories(stats: pstats.Stats) -> dict[str, float]:
+    """Returns the own time of the functions of each category in seconds."""
+    totals = dict.fromkeys([*CATEGORIES, "other"], 0.0)
+    for (file, _, function), (_, _, own, _, _) in stats.stats.items():
+        totals[category(file, function)] += own
+    return totals
+
+
+@contextmanager
+def profiled(
+    path: str | None = None,
+    profiler: str | None = None,
+    out=None,
+    top: int = 15,
+    memory: bool | None = None,
+) -> Iterator[None]:
+    """Profiles the block and writes the profile to path and a summary to out.
+
+    Args:
+        path: File of the profile, by default visoma.prof or
+            visoma.pyisession.
+        profiler: "cprofile" or "pyinstrument", by default VISOMA_PROFILER or
+            "cprofile".
+        out: Stream of the summary, by default stderr.
+        top: Number of functions with the most cumulative time in the summary.
+        memory: Whether to measure peak memory with tracemalloc, by default
+            whether VISOMA_PROFILE_MEMORY is set. It slows the run.
+    """
+    profiler = profiler or os.getenv("VISOMA_PROFILER") or "cprofile"
+    if profiler not in DEFAULT_PATHS:
+        raise ValueError(f"Profiler must be one of {list(DEFAULT_PATHS)}: {profiler}")
+    path = path or DEFAULT_PATHS[profiler]
+    out = out if out is not None else sys.stderr
+    memory = env_flag("VISOMA_PROFILE_MEMORY") if memory is None else memory
+
+    if profiler == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError as err:
+            raise ValueError(
+                "Sampling profiles need pyinstrument: pip install 'visoma[profile]'"
+            ) from err
+        sampler = Profiler()
+    else:
+        sampler = cProfile.Profile()
+
+    if memory:
+        tracemalloc.start()
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    if profiler == "cprofile":
+        sampler.enable()
+    else:
+        sampler.start()
+    try:
+        yield
+    finally:
+        if profiler == "cprofile":
+            sampler.disable()
+        else:
+            session = sampler.stop()
+        wall = time.perf_counter() - wall
+        cpu = time.process_time() - cpu
+        summary = f"Profile: {wall:.3f}s wall, {cpu:.3f}s CPU"
+        if memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            summary += (
+                f", {peak / 2**20:.1f} MiB peak memory"
+                " (tracemalloc slows the run, profile time without it)"
+            )
+        print(summary, file=out)
+        if profiler == "cprofile":
+            sampler.dump_stats(path)
+            stats = pstats.Stats(sampler, stream=out)
+            print("Own time by category:", file=out)
+            for name, seconds in categories(stats).items():
+                print(f"  {name:<12} {seconds:8.3f}s", file=out)
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+        else:
+            session.save(path)
+            print(sampler.output_text(unicode=False, color=False), file=out)
+        print(f"Profile written to {path}", file=out)
+        log.debug("Wrote %s profile to %s", profiler, path)
@@ -4,15 +4,22 @@ from datetime import datetime
 import cattrs
 import logging
 
+from visoma.http import AsyncHttpClient
 from visoma.http import HttpClient
-from visoma.lib import visoma_params_from_filters_with_limit
+from visoma.lib import make_converter
+from visoma.lib import register_models
 from visoma.lib import structure
+from visoma.lib import visoma_params_from_filters_with_limit
+from visoma.tracing import sample_payload
 
 
 log = logging.getLogger(__name__)
 
-cattrs.register_structure_hook(date, lambda v, _: datetime.strptime(v, "%d.%m.%Y").date())
-cattrs.register_unstructure_hook(date, lambda v: v.strftime("%d.%m.%Y"))
+converter = make_converter()
+converter.register_structure_hook(
+    date, lambda v, _: datetime.strptime(v, "%d.%m.%Y").date()
+)
+converter.register_unstructure_hook(date, lambda v: v.strftime("%d.%m.%Y"))
 
 
 @define
@@ -31,11 +38,13 @@ class Project:
 
     @classmethod
     def from_dict(cls, data):
-        return structure(data, cls)
+        return structure(data, cls, converter)
 
     def to_dict(self):
-        d = cattrs.unstructure(self)
-        return {k: v for k, v in d.items() if v is not None}
+        return converter.unstructure(self)
+
+
+register_models(converter, Project)
 
 
 @define
@@ -70,6 +79,53 @@ class ProjectsManager:
         log.debug("Listing projects")
         params = visoma_params_from_filters_with_limit(filters, limit)
         response = self.client.get("/api2/project/search/", params=params)
-        log.debug(f"response={response}")
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("response=%s", sample_payload(response))
+
+        with self.client.structuring("/api2/project/search/"):
+            try:
+                return [Project.from_dict(item) for item in response]
+            except cattrs.errors.ClassValidationError as err:
+                raise ValueError(response["Message"]) from err
+
+
+@define
+class AsyncProjectsManager:
+    """Async manager for project resources."""
 
-        return [Project.from_dict(item) for item in response]
+    client: AsyncHttpClient
+
+    async def get(self, filters: dict[str, str] | None = None) -> Project:
+        """Returns a single project."""
+        log.debug("Getting project")
+        try:
+            projects = await self.list(filters=filters)
+        except ValueError as err:
+            raise ValueError(f"Project not found: '{filters}'") from err
+
+        if len(projects) > 1:
+            raise ValueError(f"More than one project found: {projects}")
+        project = projects[0]
+        return project
+
+    async def list(
+        self, limit: int = 2, filters: dict[str, str] | None = None
+    ) -> list[Project]:
+        """Report on projects.
+
+        Args:
+            limit: Fetch projects up to this limit. The default fetches 2
+            projects.
+            filters: Criteria to filter the project list.
+        """
+        log.debug("Listing projects")
+        params = visoma_params_from_filters_with_limit(filters, limit)
+        response = await self.client.get("/api2/project/search/", params=params)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("response=%s", sample_payload(response))
+
+        with self.client.structuring("/api2/project/search/"):
+            try:
+                return [Project.from_dict(item) for item in response]
+            except cattrs.errors.ClassValidationError as err:
+                raise ValueError(response["Message"]) from err
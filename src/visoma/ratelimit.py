@@ -0,0 +1,111 @@
+"""Client-side rate limiting for the HTTP clients."""
+
+from attrs import define
+from attrs import field
+from collections.abc import Callable
+import logging
+import os
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+@define
+class TokenBucket:
+    """A token bucket with `rate` tokens per second and room for `burst` tokens.
+
+    Each request reserves a token. When the bucket is empty, the reservation
+    is taken from future tokens and the caller has to wait until they are
+    there. So callers are served in the order they reserve, and the same
+    bucket works for threads and for tasks of an event loop.
+    """
+
+    rate: float
+    burst: float = 1.0
+    clock: Callable[[], float] = time.monotonic
+
+    tokens: float = field(init=False)
+    updated: float = field(init=False)
+    _lock: threading.Lock = field(factory=threading.Lock, init=False, repr=False)
+
+    def __attrs_post_init__(self):
+        if self.rate <= 0 or self.burst < 1:
+            raise ValueError(
+                f"Rate must be positive and burst at least 1: {self.rate}, {self.burst}"
+            )
+        self.tokens = self.burst
+        self.updated = self.clock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Takes tokens and returns the seconds to wait until they are there."""
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            self.tokens -= tokens
+            return max(0.0, -self.tokens / self.rate)
+
+
+@define
+class RateLimiter:
+    """Separate request budgets for reads and writes.
+
+    Reads are GET, HEAD and OPTIONS requests, writes are all others. A budget
+    of None does not limit requests.
+    """
+
+    read: TokenBucket | None = None
+    write: TokenBucket | None = None
+
+    waits: int = field(default=0, init=False)
+    wait_seconds: float = field(default=0.0, init=False)
+    _lock: threading.Lock = field(factory=threading.Lock, init=False, repr=False)
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter | None":
+        """Returns a rate limiter configured by environment variables.
+
+        Environment variables:
+            - VISOMA_READ_RATE, VISOMA_WRITE_RATE: Requests per second.
+              Without a rate, requests are not limited.
+            - VISOMA_READ_BURST, VISOMA_WRITE_BURST: Requests which may be
+              sent at once after a pause. The default is 1.
+
+        Returns:
+            The rate limiter, or None when no rate is set.
+        """
+        read = bucket_from_env("VISOMA_READ_RATE", "VISOMA_READ_BURST")
+        write = bucket_from_env("VISOMA_WRITE_RATE", "VISOMA_WRITE_BURST")
+        if read is None and write is None:
+            return None
+        return cls(read, write)
+
+    def reserve(self, method: str) -> float:
+        """Reserves a request and returns the seconds to wait before sending it."""
+        bucket = self.read if method in READ_METHODS else self.write
+        if bucket is None:
+            return 0.0
+
+        delay = bucket.reserve()
+        if delay > 0:
+            with self._lock:
+                self.waits += 1
+                self.wait_seconds += delay
+            log.debug("Rate limited %s request for %.3fs", method, delay)
+        return delay
+
+    def stats(self) -> dict[str, int | float]:
+        """Returns how often and how long requests waited for their budget."""
+        return {"waits": self.waits, "wait_seconds": self.wait_seconds}
+
+
+def bucket_from_env(rate_name: str, burst_name: str) -> TokenBucket | None:
+    rate = os.getenv(rate_name)
+    if not rate:
+        return None
+    return TokenBucket(float(rate), float(os.getenv(burst_name) or 1))
@@ -0,0 +1,90 @@
+"""Index of the links between projects and tickets.
+
+The service reports the links from both sides: `Project.TicketIds` lists the
+tickets of a project and `Ticket.ProjectIds` the projects of a ticket. The
+index merges both into maps in each direction, so the tickets of a project
+and the projects of a ticket are looked up without further requests.
+"""
+
+from attrs import define
+from attrs import field
+from collections.abc import Iterable
+import logging
+
+from visoma.projects import Project
+from visoma.tickets import Ticket
+
+log = logging.getLogger(__name__)
+
+
+@define
+class ProjectTicketIndex:
+    """Links between projects and tickets, with the models fetched so far.
+
+    The index is updated with fetched projects and tickets. The latest
+    model of a project decides the tickets linked to it, the latest model
+    of a ticket the projects linked to it. Models without links (None)
+    keep the links known so far.
+    """
+
+    projects: dict[int, Project] = field(factory=dict)
+    tickets: dict[int, Ticket] = field(factory=dict)
+
+    _by_project: dict[int, set[int]] = field(factory=dict, init=False, repr=False)
+    _by_ticket: dict[int, set[int]] = field(factory=dict, init=False, repr=False)
+
+    @classmethod
+    def from_models(
+        cls, projects: Iterable[Project] = (), tickets: Iterable[Ticket] = ()
+    ) -> "ProjectTicketIndex":
+        index = cls()
+        index.update(projects, tickets)
+        return index
+
+    def update(
+        self, projects: Iterable[Project] = (), tickets: Iterable[Ticket] = ()
+    ) -> None:
+        """Adds or replaces projects and tickets and their links."""
+        for project in projects:
+            self.projects[project.Id] = project
+            link(self._by_project, self._by_ticket, project.Id, project.TicketIds)
+        for ticket in tickets:
+            self.tickets[ticket.Id] = ticket
+            ids = None if ticket.ProjectIds is None else ticket.project_ids
+            link(self._by_ticket, self._by_project, ticket.Id, ids)
+
+    def ticket_ids(self, project_id: int) -> frozenset[int]:
+        """Returns the Ids of the tickets of a project."""
+        return frozenset(self._by_project.get(project_id, ()))
+
+    def project_ids(self, ticket_id: int) -> frozenset[int]:
+        """Returns the Ids of the projects of a ticket."""
+        return frozenset(self._by_ticket.get(ticket_id, ()))
+
+    def tickets_of(self, project_id: int) -> list[Ticket]:
+        """Returns the fetched tickets of a project, ordered by Id."""
+        ids = sorted(self._by_project.get(project_id, ()))
+        return [self.tickets[idx] for idx in ids if idx in self.tickets]
+
+    def projects_of(self, ticket_id: int) -> list[Project]:
+        """Returns the fetched projects of a ticket, ordered by Id."""
+        ids = sorted(self._by_ticket.get(ticket_id, ()))
+        return [self.projects[idx] for idx in ids if idx in self.projects]
+
+
+def link(forward: dict, backward: dict, idx: int, targets: Iterable[int] | None):
+    """Replaces the links of `idx` in `forward` and mirrors them in `backward`."""
+    if targets is None:
+        return
+    new = set(targets)
+    old = forward.get(idx, set())
+    for target in old - new:
+        backward[target].discard(idx)
+        if not backward[target]:
+            del backward[target]
+    for target in new - old:
+        backward.setdefault(target, set()).add(idx)
+    if new:
+        forward[idx] = new
+    else:
+        forward.pop(idx, None)
@@ -0,0 +1,209 @@
+"""Retry policy and circuit breaker for the HTTP clients."""
+
+from attrs import define
+from attrs import field
+from collections import Counter
+from collections.abc import Callable
+from datetime import datetime
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+import httpx
+import logging
+import os
+import random
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+# Responses which are worth another try. Other errors are not transient.
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+@define
+class CircuitBreaker:
+    """Fails fast for a host after many failures in a row.
+
+    After `threshold` failed requests (server errors or transport errors) the
+    circuit of a host opens and requests are rejected without being sent.
+    After `reset_timeout` seconds the circuit is half-open: a single probe
+    request is let through and the others are still rejected. A successful
+    probe closes the circuit, a failed one opens it again. A probe without an
+    outcome after `reset_timeout` seconds is replaced by a new one.
+    """
+
+    threshold: int = 5
+    reset_timeout: float = 30.0
+    clock: Callable[[], float] = time.monotonic
+
+    trips: int = field(default=0, init=False)
+    rejections: int = field(default=0, init=False)
+
+    # host -> (failures in a row, time the circuit opened)
+    _hosts: dict[str, tuple[int, float]] = field(factory=dict, init=False, repr=False)
+    # host -> time the probe of a half-open circuit was let through
+    _probes: dict[str, float] = field(factory=dict, init=False, repr=False)
+    _lock: threading.Lock = field(factory=threading.Lock, init=False, repr=False)
+
+    def state(self, host: str) -> str:
+        """Returns "closed", "open" or "half-open"."""
+        failures, opened = self._hosts.get(host, (0, 0.0))
+        if failures < self.threshold:
+            return "closed"
+        if self.clock() - opened < self.reset_timeout:
+            return "open"
+        return "half-open"
+
+    def allow(self, host: str) -> bool:
+        """Returns whether a request to a host may be sent."""
+        with self._lock:
+            state = self.state(host)
+            if state == "closed":
+                return True
+            if state == "half-open":
+                probe = self._probes.get(host)
+                if probe is None or self.clock() - probe >= self.reset_timeout:
+                    self._probes[host] = self.clock()
+                    return True
+            self.rejections += 1
+            return False
+
+    def record(self, host: str, ok: bool) -> None:
+        """Records the outcome of a request to a host."""
+        with self._lock:
+            self._probes.pop(host, None)
+            if ok:
+                self._hosts.pop(host, None)
+                return
+
+            failures, opened = self._hosts.get(host, (0, 0.0))
+            failures += 1
+            if failures >= self.threshold:
+                if (
+                    failures == self.threshold
+                    or self.clock() - opened >= self.reset_timeout
+                ):
+                    self.trips += 1
+                    log.warning(
+                        "Circuit opened for %s after %s failures", host, failures
+                    )
+                opened = self.clock()
+            self._hosts[host] = (failures, opened)
+
+    def stats(self) -> dict:
+        return {
+            "trips": self.trips,
+            "rejections": self.rejections,
+            "open": sorted(h for h in self._hosts if self.state(h) != "closed"),
+        }
+
+
+@define
+class RetryPolicy:
+    """Retries failed requests with exponential backoff and full jitter.
+
+    GET requests are retried by default, other methods only when a call opts
+    in. The n-th retry waits a random time up to `backoff * 2**n` seconds,
+    but at most `max_backoff`. A Retry-After header of the response is
+    honored instead, up to `max_backoff`.
+    """
+
+    retries: int = 3
+    backoff: float = 0.5
+    max_backoff: float = 30.0
+    statuses: frozenset[int] = RETRY_STATUSES
+    breaker: CircuitBreaker = field(factory=CircuitBreaker)
+
+    attempts: Counter = field(factory=Counter, init=False)
+    exhausted: int = field(default=0, init=False)
+
+    _lock: threading.Lock = field(factory=threading.Lock, init=False, repr=False)
+
+    @classmethod
+    def from_env(cls, default: int = 0) -> "RetryPolicy | None":
+        """Returns a retry policy configured by environment variables.
+
+        Environment variables:
+            - VISOMA_RETRIES: Number of retries per request. The default is
+              `default`, which is 0 for the library; the CLI uses 3. With 0,
+              there are neither retries nor a circuit breaker.
+            - VISOMA_RETRY_BACKOFF: Base backoff in seconds. The default is
+              0.5.
+            - VISOMA_BREAKER_THRESHOLD: Failures in a row which open the
+              circuit of a host. The default is 5.
+            - VISOMA_BREAKER_RESET: Seconds until an open circuit lets
+              requests through again. The default is 30.
+        """
+        retries = int(os.getenv("VISOMA_RETRIES") or default)
+        if retries <= 0:
+            return None
+        return cls(
+            retries=retries,
+            backoff=float(os.getenv("VISOMA_RETRY_BACKOFF") or 0.5),
+            breaker=CircuitBreaker(
+                threshold=int(os.getenv("VISOMA_BREAKER_THRESHOLD") or 5),
+                reset_timeout=float(os.getenv("VISOMA_BREAKER_RESET") or 30),
+            ),
+        )
+
+    def delay(
+        self,
+        attempt: int,
+        retry: bool,
+        response: httpx.Response | None = None,
+        error: Exception | None = None,
+    ) -> float | None:
+        """Returns the seconds to wait before the next attempt, or None.
+
+        Args:
+            attempt: The number of the failed attempt, starting at 0.
+            retry: Whether the request may be retried at all.
+            response: The response of the attempt, if there is one.
+            error: The transport error of the attempt, if there is one.
+        """
+        if error is not None:
+            reason = type(error).__name__
+        elif response is not None and response.status_code in self.statuses:
+            reason = str(response.status_code)
+        else:
+            return None
+
+        if not retry:
+            return None
+        if attempt >= self.retries:
+            with self._lock:
+                self.exhausted += 1
+            return None
+
+        with self._lock:
+            self.attempts[reason] += 1
+
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+        if response is not None:
+            delay = retry_after(response, delay)
+        return min(delay, self.max_backoff)
+
+    def stats(self) -> dict:
+        """Returns retry counts per reason and the circuit breaker state."""
+        return {
+            "retries": sum(self.attempts.values()),
+            "retries_by_reason": dict(self.attempts),
+            "exhausted": self.exhausted,
+            "breaker": self.breaker.stats(),
+        }
+
+
+def retry_after(response: httpx.Response, default: float) -> float:
+    """Returns the wait from a Retry-After header in seconds or as a date."""
+    value = response.headers.get("retry-after")
+    if value is None:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        until = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    return max(0.0, (until - datetime.now(timezone.utc)).total_seconds())
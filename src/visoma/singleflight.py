@@ -0,0 +1,122 @@
+"""Coalescing of identical concurrent requests."""
+
+from attrs import define
+from attrs import field
+from collections.abc import Awaitable
+from collections.abc import Callable
+from concurrent.futures import Future
+from typing import TYPE_CHECKING
+import logging
+import threading
+
+# Only async clients need asyncio, which is slow to import.
+if TYPE_CHECKING:
+    import asyncio
+
+log = logging.getLogger(__name__)
+
+
+@define
+class SingleFlight:
+    """Runs a call only once for all threads which want it at the same time.
+
+    The first caller of a key runs the call. Callers of the same key arriving
+    while it runs wait for it and get the same result or exception. Nothing
+    is kept after the call, so results are never stale.
+    """
+
+    calls: int = field(default=0, init=False)
+    shared: int = field(default=0, init=False)
+
+    _flights: dict[str, Future] = field(factory=dict, init=False, repr=False)
+    _lock: threading.Lock = field(factory=threading.Lock, init=False, repr=False)
+
+    def do(self, key: str, call: Callable):
+        with self._lock:
+            self.calls += 1
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = Future()
+                leader = True
+            else:
+                self.shared += 1
+                leader = False
+
+        if not leader:
+            log.debug("Waiting for request in flight: %s", key)
+            return flight.result()
+
+        try:
+            result = call()
+        except BaseException as err:
+            self._land(key)
+            flight.set_exception(err)
+            raise
+        self._land(key)
+        flight.set_result(result)
+        return result
+
+    def _land(self, key: str) -> None:
+        with self._lock:
+            del self._flights[key]
+
+    def stats(self) -> dict[str, int]:
+        """Returns the number of calls and of calls which shared a request."""
+        return {"calls": self.calls, "shared": self.shared}
+
+
+@define
+class AsyncSingleFlight:
+    """Runs a call only once for all tasks which want it at the same time.
+
+    See `SingleFlight` for details. The call runs as a task of its own, so a
+    cancelled caller, the first one included, does not cancel it for the
+    others. It is only cancelled when all of its callers are.
+    """
+
+    calls: int = field(default=0, init=False)
+    shared: int = field(default=0, init=False)
+
+    _flights: "dict[str, asyncio.Task]" = field(factory=dict, init=False, repr=False)
+    # task -> number of callers waiting for it
+    _waiting: "dict[asyncio.Task, int]" = field(factory=dict, init=False, repr=False)
+
+    async def do(self, key: str, call: Callable[[], Awaitable]):
+        import asyncio
+
+        self.calls += 1
+        flight = self._flights.get(key)
+        if flight is None or flight.done():
+            flight = self._flights[key] = asyncio.ensure_future(call())
+            self._waiting[flight] = 0
+            flight.add_done_callback(lambda _: self._land(key, flight))
+        else:
+            self.shared += 1
+            log.debug("Waiting for request in flight: %s", key)
+
+        self._waiting[flight] += 1
+        try:
+            return await asyncio.shield(flight)
+        except asyncio.CancelledError:
+            if self._waiting[flight] == 1 and not flight.done():
+                # Nobody else waits for the result.
+                flight.cancel()
+            raise
+        finally:
+            self._waiting[flight] -= 1
+            if not self._waiting[flight] and flight.done():
+                del self._waiting[flight]
+
+    def _land(self, key: str, flight: "asyncio.Task") -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not self._waiting.get(flight):
+            # All callers were cancelled.
+            self._waiting.pop(flight, None)
+            if not flight.cancelled():
+                # Retrieve an error nobody waited for, so it is not reported.
+                flight.exception()
+
+    def stats(self) -> dict[str, int]:
+        """Returns the number of calls and of calls which shared a request."""
+        return {"calls": self.calls, "shared": self.shared}
@@ -0,0 +1,330 @@
+"""Local SQLite mirror of tickets and projects.
+
+The first sync loads all tickets. Later syncs only fetch tickets modified
+since the newest `Modified` timestamp in the mirror (the high-water mark).
+Projects have no such timestamp and are loaded in full, together with the
+links to their tickets from `Project.TicketIds`.
+
+Incremental syncs cannot see tickets deleted on the service. A full sync
+removes the tickets it did not get, unless it hit the query limit.
+"""
+
+from attrs import define
+from attrs import field
+from attrs import fields
+from datetime import datetime
+from pathlib import Path
+import logging
+import os
+import sqlite3
+
+from visoma.http import HttpClient
+from visoma.lib import is_no_results
+from visoma.projects import Project
+from visoma.projects import ProjectsManager
+from visoma.relations import ProjectTicketIndex
+from visoma.tickets import Ticket
+from visoma.tickets import TicketsManager
+
+log = logging.getLogger(__name__)
+
+# Search filter for tickets modified since the high-water mark.
+MODIFIED_FILTER = "ModifiedFrom"
+# Query limit of a sync. A sync hitting it may be incomplete.
+DEFAULT_SYNC_LIMIT = 100_000
+
+TICKET_COLUMNS = tuple(a.name for a in fields(Ticket))
+PROJECT_COLUMNS = tuple(a.name for a in fields(Project) if a.name != "TicketIds")
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS tickets ({", ".join(TICKET_COLUMNS)}, PRIMARY KEY (Id));
+CREATE INDEX IF NOT EXISTS tickets_modified ON tickets (Modified);
+CREATE INDEX IF NOT EXISTS tickets_status ON tickets (StatusId);
+CREATE INDEX IF NOT EXISTS tickets_customer ON tickets (CustomerId);
+CREATE TABLE IF NOT EXISTS projects ({", ".join(PROJECT_COLUMNS)}, PRIMARY KEY (Id));
+CREATE TABLE IF NOT EXISTS project_tickets (
+    ProjectId INTEGER NOT NULL,
+    TicketId INTEGER NOT NULL,
+    PRIMARY KEY (ProjectId, TicketId)
+);
+CREATE INDEX IF NOT EXISTS project_tickets_ticket ON project_tickets (TicketId);
+CREATE TABLE IF NOT EXISTS sync_state (
+    resource TEXT PRIMARY KEY,
+    high_water TEXT,
+    synced_at TEXT NOT NULL
+);
+"""
+
+
+@define
+class Mirror:
+    """SQLite database with copies of tickets and projects.
+
+    Models are stored in the format of the API (see `to_dict`), one column
+    per attribute, so they are read back with `from_dict`.
+    """
+
+    path: Path
+    _db: sqlite3.Connection | None = field(default=None, init=False, repr=False)
+
+    @classmethod
+    def from_env(cls, namespace: str) -> "Mirror":
+        """Returns the mirror of an account.
+
+        Environment variables:
+            - VISOMA_MIRROR_PATH: The database file. The default is
+              visoma/<namespace>.sqlite3 in the XDG data directory.
+        """
+        path = os.getenv("VISOMA_MIRROR_PATH")
+        if not path:
+            data_home = os.getenv("XDG_DATA_HOME") or Path.home() / ".local" / "share"
+            path = Path(data_home) / "visoma" / f"{namespace}.sqlite3"
+        return cls(Path(path))
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, isolation_level=None)
+            self._db.row_factory = sqlite3.Row
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(SCHEMA)
+        return self._db
+
+    def high_water(self, resource: str) -> str | None:
+        """Returns the high-water mark of the last sync of a resource."""
+        row = self.db.execute(
+            "SELECT high_water FROM sync_state WHERE resource = ?", (resource,)
+        ).fetchone()
+        return row["high_water"] if row else None
+
+    def save_tickets(self, tickets) -> int:
+        """Inserts or replaces tickets and moves the high-water mark.
+
+        Returns:
+            The number of saved tickets.
+        """
+        count = 0
+
+        def rows():
+            nonlocal count
+            for ticket in tickets:
+                count += 1
+                yield ticket_row(ticket)
+
+        placeholders = ", ".join("?" * len(TICKET_COLUMNS))
+        with self.db as db:
+            db.execute("BEGIN")
+            db.executemany(
+                f"INSERT OR REPLACE INTO tickets VALUES ({placeholders})", rows()
+            )
+            (high_water,) = db.execute("SELECT max(Modified) FROM tickets").fetchone()
+            self._mark(db, "tickets", high_water)
+        return count
+
+    def prune_tickets(self, ids) -> int:
+        """Deletes the tickets whose Ids are not given.
+
+        Returns:
+            The number of deleted tickets.
+        """
+        with self.db as db:
+            db.execute("BEGIN")
+            db.execute("CREATE TEMP TABLE IF NOT EXISTS kept (Id INTEGER PRIMARY KEY)")
+            db.execute("DELETE FROM kept")
+            db.executemany("INSERT OR IGNORE INTO kept VALUES (?)", ((i,) for i in ids))
+            deleted = db.execute(
+                "DELETE FROM tickets WHERE Id NOT IN (SELECT Id FROM kept)"
+            ).rowcount
+            db.execute("DELETE FROM kept")
+        return deleted
+
+    def save_projects(self, projects) -> int:
+        """Replaces all projects and their ticket links.
+
+        Returns:
+            The number of saved projects.
+        """
+        placeholders = ", ".join("?" * len(PROJECT_COLUMNS))
+        with self.db as db:
+            db.execute("BEGIN")
+            db.execute("DELETE FROM projects")
+            db.execute("DELETE FROM project_tickets")
+            count = 0
+            for project in projects:
+                data = project.to_dict()
+                db.execute(
+                    f"INSERT INTO projects VALUES ({placeholders})",
+                    [data.get(name) for name in PROJECT_COLUMNS],
+                )
+                db.executemany(
+                    "INSERT OR IGNORE INTO project_tickets VALUES (?, ?)",
+                    ((project.Id, idx) for idx in project.TicketIds or ()),
+                )
+                count += 1
+            self._mark(db, "projects", None)
+        return count
+
+    def _mark(self, db, resource, high_water):
+        db.execute(
+            "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)",
+            (resource, high_water, datetime.now().isoformat(sep=" ")),
+        )
+
+    def tickets(
+        self,
+        status_id: int | None = None,
+        customer_id: int | None = None,
+        project_id: int | None = None,
+        modified_from: str | None = None,
+    ) -> list[Ticket]:
+        """Returns the tickets in the mirror which match all given criteria."""
+        where = []
+        args = []
+        if status_id is not None:
+            where.append("StatusId = ?")
+            args.append(status_id)
+        if customer_id is not None:
+            where.append("CustomerId = ?")
+            args.append(customer_id)
+        if project_id is not None:
+            where.append(
+                "Id IN (SELECT TicketId FROM project_tickets WHERE ProjectId = ?)"
+            )
+            args.append(project_id)
+        if modified_from is not None:
+            where.append("Modified >= ?")
+            args.append(str(modified_from))
+
+        query = "SELECT * FROM tickets"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        rows = self.db.execute(query + " ORDER BY Id", args)
+        return [Ticket.from_dict(without_nulls(row)) for row in rows]
+
+    def projects(self) -> list[Project]:
+        """Returns the projects in the mirror with their ticket Ids."""
+        links = {}
+        for project_id, ticket_id in self.db.execute(
+            "SELECT ProjectId, TicketId FROM project_tickets ORDER BY TicketId"
+        ):
+            links.setdefault(project_id, []).append(ticket_id)
+
+        projects = []
+        for row in self.db.execute("SELECT * FROM projects ORDER BY Id"):
+            data = without_nulls(row)
+            data["TicketIds"] = links.get(row["Id"], [])
+            projects.append(Project.from_dict(data))
+        return projects
+
+    def index(self) -> ProjectTicketIndex:
+        """Returns the links between the projects and tickets in the mirror."""
+        return ProjectTicketIndex.from_models(self.projects(), self.tickets())
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+def ticket_row(ticket: Ticket) -> list:
+    data = ticket.to_dict()
+    return [data.get(name) for name in TICKET_COLUMNS]
+
+
+def without_nulls(row: sqlite3.Row) -> dict:
+    return {key: row[key] for key in row.keys() if row[key] is not None}
+
+
+@define
+class SyncManager:
+    """Keeps a local mirror of tickets and projects up to date."""
+
+    client: HttpClient
+    mirror: Mirror
+
+    def run(self, full: bool = False, limit: int = DEFAULT_SYNC_LIMIT) -> dict:
+        """Sync projects and tickets.
+
+        Args:
+            full: Load all tickets instead of the modified ones.
+            limit: Fetch records up to this limit per resource.
+
+        Returns:
+            The number of synced records per resource and the new high-water
+            mark of tickets.
+        """
+        projects = self.projects(limit=limit)
+        tickets = self.tickets(full=full, limit=limit)
+        return {
+            "projects": projects,
+            "tickets": tickets,
+            "high_water": self.mirror.high_water("tickets"),
+        }
+
+    def tickets(self, full: bool = False, limit: int = DEFAULT_SYNC_LIMIT) -> int:
+        """Sync tickets modified since the last sync, or all with `full`.
+
+        A full sync also removes tickets which were deleted on the service,
+        unless it hit the limit.
+
+        Returns:
+            The number of synced tickets.
+        """
+        high_water = None if full else self.mirror.high_water("tickets")
+        filters = {MODIFIED_FILTER: high_water} if high_water else {}
+        log.info("Syncing tickets modified from %s", high_water or "the beginning")
+
+        manager = TicketsManager(client=self.client)
+        ids = []
+
+        def tickets():
+            for ticket in manager.iter(limit=limit, filters=filters):
+                ids.append(ticket.Id)
+                yield ticket
+
+        try:
+            count = self.mirror.save_tickets(tickets())
+        except ValueError as err:
+            # No modified tickets answer with a message instead of a list.
+            if not is_no_results(err):
+                raise
+            log.debug("No tickets to sync: %s", err)
+            count = 0
+
+        if count >= limit:
+            log.warning("Ticket sync hit the limit of %s and may be incomplete", limit)
+        elif full:
+            deleted = self.mirror.prune_tickets(ids)
+            log.info("Removed %s tickets deleted on the service", deleted)
+        return count
+
+    def projects(self, limit: int = DEFAULT_SYNC_LIMIT) -> int:
+        """Sync all projects and their ticket links.
+
+        Returns:
+            The number of synced projects.
+        """
+        manager = ProjectsManager(client=self.client)
+        try:
+            projects = manager.list(limit=limit)
+        except ValueError as err:
+            if not is_no_results(err):
+                raise
+            log.debug("No projects to sync: %s", err)
+            projects = []
+        return self.mirror.save_projects(projects)
+
+    def query(
+        self,
+        status_id: int | None = None,
+        customer_id: int | None = None,
+        project_id: int | None = None,
+        modified_from: str | None = None,
+    ) -> list[Ticket]:
+        """Returns tickets from the mirror without asking the service."""
+        return self.mirror.tickets(status_id, customer_id, project_id, modified_from)
+
+    def index(self) -> ProjectTicketIndex:
+        """Returns the links between projects and tickets from the mirror."""
+        return self.mirror.index()
@@ -0,0 +1,193 @@
+"""Columnar containers for large results.
+
+A `Table` keeps each attribute of a model in one typed `array`: integers,
+floats, booleans, dates and timestamps as machine numbers. Strings with few
+distinct values, like user names, are encoded as Ids into a dictionary of
+those values; other strings, like descriptions, are stored as UTF-8 in one
+buffer with an array of offsets. Rows are only made into model objects when
+they are accessed, so a table needs a fraction of the memory of a list of
+models.
+"""
+
+from array import array
+from attrs import define
+from attrs import field
+from attrs import fields
+from collections.abc import Iterable
+from collections.abc import Sequence
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+from typing import Any
+from typing import ClassVar
+
+from visoma.lib import optional_type
+
+EPOCH = datetime(1970, 1, 1)
+EPOCH_DAY = EPOCH.toordinal()
+
+# Array type codes of the kinds of columns. Integers start with 4 bytes and
+# are widened to 8 when a value needs them.
+TYPECODES = {
+    bool: "b",
+    int: "i",
+    float: "d",
+    datetime: "q",
+    date: "i",
+    str: "I",
+}
+
+
+@define
+class Column:
+    """Values of one attribute of all rows.
+
+    Missing values are marked in `nulls`, which only optional attributes
+    have. Strings of a dictionary column are stored in `strings` once and
+    referenced by their index. Other strings are appended to `text` as UTF-8
+    and `values` holds the offset after each of them. Attributes of other
+    types are kept in a plain list.
+    """
+
+    type: type
+    values: array | list
+    nulls: bytearray | None = None
+    strings: list[str] = field(factory=list, repr=False)
+    codes: dict[str, int] = field(factory=dict, repr=False)
+    text: bytearray | None = field(default=None, repr=False)
+
+    @classmethod
+    def for_type(cls, type_, dictionary: bool = True) -> "Column":
+        """Returns an empty column for the type of an attribute.
+
+        Strings are dictionary-encoded, unless `dictionary` is false.
+        """
+        inner = optional_type(type_)
+        nulls = bytearray() if inner is not None else None
+        type_ = inner or type_
+        if type_ is str and not dictionary:
+            return cls(type_, array("Q"), nulls, text=bytearray())
+        if type_ in TYPECODES:
+            return cls(type_, array(TYPECODES[type_]), nulls)
+        return cls(type_, [], nulls)
+
+    def append(self, value) -> None:
+        if self.nulls is not None:
+            self.nulls.append(value is None)
+        if self.text is not None:
+            if value is not None:
+                self.text += value.encode()
+            value = len(self.text)
+        elif value is None and isinstance(self.values, array):
+            value = 0
+        elif self.type is datetime:
+            value = micros(value)
+        elif self.type is date:
+            value = value.toordinal()
+        elif self.type is str:
+            code = self.codes.get(value)
+            if code is None:
+                code = self.codes[value] = len(self.strings)
+                self.strings.append(value)
+            value = code
+        try:
+            self.values.append(value)
+        except OverflowError:
+            # Only integers start narrow.
+            self.values = array("q", self.values)
+            self.values.append(value)
+
+    def get(self, idx: int):
+        if self.nulls is not None and self.nulls[idx]:
+            return None
+        value = self.values[idx]
+        if self.text is not None:
+            start = self.values[idx - 1] if idx else 0
+            return self.text[start:value].decode()
+        if self.type is datetime:
+            return EPOCH + timedelta(microseconds=value)
+        if self.type is date:
+            return date.fromordinal(value)
+        if self.type is str:
+            return self.strings[value]
+        if self.type is bool:
+            return bool(value)
+        return value
+
+    def nbytes(self) -> int:
+        """Returns the approximate size of the stored values in bytes."""
+        size = len(self.nulls) if self.nulls is not None else 0
+        if isinstance(self.values, array):
+            size += self.values.itemsize * len(self.values)
+        else:
+            size += 8 * len(self.values)
+        if self.text is not None:
+            size += len(self.text)
+        return size + sum(len(s) for s in self.strings)
+
+
+def micros(value: datetime) -> int:
+    """Returns the microseconds of a datetime since the epoch, ignoring time zones."""
+    days = value.toordinal() - EPOCH_DAY
+    seconds = days * 86400 + value.hour * 3600 + value.minute * 60 + value.second
+    return seconds * 1_000_000 + value.microsecond
+
+
+@define
+class Table(Sequence):
+    """Models of one class stored in columns.
+
+    Subclasses set `model` and, in `dictionary`, the string attributes with
+    few distinct values. A table is a sequence of models, which are made
+    when rows are accessed by index or in a loop. Use `column` to read one
+    attribute of all rows without making models.
+    """
+
+    model: ClassVar[type]
+    dictionary: ClassVar[frozenset[str]] = frozenset()
+
+    columns: dict[str, Column] = field(init=False)
+
+    def __attrs_post_init__(self):
+        self.columns = {
+            a.name: Column.for_type(a.type, a.name in self.dictionary)
+            for a in fields(self.model)
+        }
+
+    @classmethod
+    def from_models(cls, models: Iterable) -> "Table":
+        """Returns a table with the models, which may be a generator."""
+        table = cls()
+        for model in models:
+            table.append(model)
+        return table
+
+    def append(self, model) -> None:
+        for name, column in self.columns.items():
+            column.append(getattr(model, name))
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values())).values)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self.row(i) for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(f"{type(self).__name__} index out of range: {idx}")
+        return self.row(idx)
+
+    def row(self, idx: int):
+        return self.model(
+            **{name: column.get(idx) for name, column in self.columns.items()}
+        )
+
+    def column(self, name: str) -> list[Any]:
+        """Returns the values of one attribute of all rows."""
+        column = self.columns[name]
+        return [column.get(idx) for idx in range(len(self))]
+
+    def nbytes(self) -> int:
+        """Returns the approximate size of the table in bytes."""
+        return sum(column.nbytes() for column in self.columns.values())
@@ -1,9 +1,14 @@
 from attrs import define
 import cattrs
 
+from visoma.http import AsyncHttpClient
 from visoma.http import HttpClient
+from visoma.lib import make_converter
+from visoma.lib import register_models
 from visoma.lib import visoma_params_from_filters_with_limit
 
+converter = make_converter()
+
 
 @define
 class TicketStatus:
@@ -18,11 +23,13 @@ class TicketStatus:
 
     @classmethod
     def from_dict(cls, data):
-        return cattrs.structure(data, cls)
+        return converter.structure(data, cls)
 
     def to_dict(self):
-        d = cattrs.unstructure(self)
-        return {k: v for k, v in d.items() if v is not None}
+        return converter.unstructure(self)
+
+
+register_models(converter, TicketStatus)
 
 
 @define
@@ -57,7 +64,47 @@ class TicketStatusesManager:
         params = visoma_params_from_filters_with_limit(filters, limit)
         response = self.client.get("/api2/ticketstatus/search/", params=params)
 
+        with self.client.structuring("/api2/ticketstatus/search/"):
+            try:
+                return [TicketStatus.from_dict(item) for item in response]
+            except cattrs.errors.ClassValidationError as err:
+                raise ValueError(response["Message"]) from err
+
+
+@define
+class AsyncTicketStatusesManager:
+    """Async manager for ticket status resources."""
+
+    client: AsyncHttpClient
+
+    async def get(self, filters: dict[str, str] | None = None) -> TicketStatus:
+        """Returns a single ticket status."""
         try:
-            return [TicketStatus.from_dict(item) for item in response]
-        except cattrs.errors.ClassValidationError as err:
-            raise ValueError(response["Message"]) from err
+            ticket_status = await self.list(filters=filters)
+        except ValueError as err:
+            raise ValueError(f"Ticket status not found: '{filters}'") from err
+
+        if len(ticket_status) > 1:
+            raise ValueError(f"More than one ticket status found: {ticket_status}")
+
+        ticket_status = ticket_status[0]
+        return ticket_status
+
+    async def list(
+        self, limit: int = 2, filters: dict[str, str] | None = None
+    ) -> list[TicketStatus]:
+        """Report on ticket statuses.
+
+        Args:
+            limit: Fetch ticket statuses up to this limit. The default fetches 2
+            ticket statuses.
+            filters: Criteria to filter the ticket statuses list.
+        """
+        params = visoma_params_from_filters_with_limit(filters, limit)
+        response = await self.client.get("/api2/ticketstatus/search/", params=params)
+
+        with self.client.structuring("/api2/ticketstatus/search/"):
+            try:
+                return [TicketStatus.from_dict(item) for item in response]
+            except cattrs.errors.ClassValidationError as err:
+                raise ValueError(response["Message"]) from err
@@ -1,9 +1,14 @@
 from attrs import define
 import cattrs
 
+from visoma.http import AsyncHttpClient
 from visoma.http import HttpClient
+from visoma.lib import make_converter
+from visoma.lib import register_models
 from visoma.lib import visoma_params_from_filters_with_limit
 
+converter = make_converter()
+
 
 @define
 class TicketType:
@@ -18,11 +23,13 @@ class TicketType:
 
     @classmethod
     def from_dict(cls, data):
-        return cattrs.structure(data, cls)
+        return converter.structure(data, cls)
 
     def to_dict(self):
-        d = cattrs.unstructure(self)
-        return {k: v for k, v in d.items() if v is not None}
+        return converter.unstructure(self)
+
+
+register_models(converter, TicketType)
 
 
 @define
@@ -57,7 +64,47 @@ class TicketTypesManager:
         params = visoma_params_from_filters_with_limit(filters, limit)
         response = self.client.get("/api2/tickettype/search/", params=params)
 
+        with self.client.structuring("/api2/tickettype/search/"):
+            try:
+                return [TicketType.from_dict(item) for item in response]
+            except cattrs.errors.ClassValidationError as err:
+                raise ValueError(response["Message"]) from err
+
+
+@define
+class AsyncTicketTypesManager:
+    """Async manager for ticket type resources."""
+
+    client: AsyncHttpClient
+
+    async def get(self, filters: dict[str, str] | None = None) -> TicketType:
+        """Returns a single ticket type."""
         try:
-            return [TicketType.from_dict(item) for item in response]
-        except cattrs.errors.ClassValidationError as err:
-            raise ValueError(response["Message"]) from err
+            ticket_types = await self.list(filters=filters)
+        except ValueError as err:
+            raise ValueError(f"Ticket type not found: '{filters}'") from err
+
+        if len(ticket_types) > 1:
+            raise ValueError(f"More than one ticket type found: {ticket_types}")
+
+        ticket_type = ticket_types[0]
+        return ticket_type
+
+    async def list(
+        self, limit: int = 2, filters: dict[str, str] | None = None
+    ) -> list[TicketType]:
+        """Report on ticket types.
+
+        Args:
+            limit: Fetch ticket types up to this limit. The default fetches 2
+            ticket types.
+            filters: Criteria to filter the ticket types list.
+        """
+        params = visoma_params_from_filters_with_limit(filters, limit)
+        response = await self.client.get("/api2/tickettype/search/", params=params)
+
+        with self.client.structuring("/api2/tickettype/search/"):
+            try:
+                return [TicketType.from_dict(item) for item in response]
+            except cattrs.errors.ClassValidationError as err:
+                raise ValueError(response["Message"]) from err
@@ -1,20 +1,36 @@
 from attrs import define
+from collections.abc import AsyncIterator
+from collections.abc import Iterator
+from datetime import date
 from datetime import datetime
+from functools import lru_cache
 import cattrs
 import logging
 
+from visoma.http import AsyncHttpClient
 from visoma.http import HttpClient
 from visoma.lib import VisomaResponse
-from visoma.lib import visoma_params_from_filters_with_limit
+from visoma.lib import make_converter
+from visoma.lib import register_models
+from visoma.lib import scan
 from visoma.lib import structure
+from visoma.lib import visoma_params_from_filters_with_limit
+from visoma.table import Table
+from visoma.tracing import sample_payload
 
 
 log = logging.getLogger(__name__)
 
+converter = make_converter()
+
 # cattrs.register_structure_hook(datetime, lambda v, _: datetime.strptime(v, "%d.%m.%Y %H:%M:%S"))
 # cattrs.register_unstructure_hook(datetime, lambda v: v.strftime("%d.%m.%Y %H:%M:%S"))
 
 
+# Search filters for the first and last day of a scan window.
+SCAN_DATE_FILTERS = ("CreatedFrom", "CreatedTo")
+
+
 @define(str=True)
 class Ticket:
     """Details for a ticket managed by the Visoma service."""
@@ -38,11 +54,32 @@ class Ticket:
 
     @classmethod
     def from_dict(cls, data):
-        return structure(data, cls)
+        return structure(data, cls, converter)
 
     def to_dict(self):
-        d = cattrs.unstructure(self)
-        return {k: v for k, v in d.items() if v is not None}
+        return converter.unstructure(self)
+
+    @property
+    def project_ids(self) -> tuple[int, ...]:
+        """Returns the Ids in `ProjectIds` as integers."""
+        return parse_ids(self.ProjectIds)
+
+
+# Tickets of the same projects share their ProjectIds, so they are parsed once.
+@lru_cache(maxsize=4096)
+def parse_ids(value: str | None) -> tuple[int, ...]:
+    """Returns the Ids in a comma separated list like "6,87,10"."""
+    if not value:
+        return ()
+    return tuple(int(idx) for idx in value.split(",") if idx.strip())
+
+
+@define
+class TicketTable(Table):
+    """Tickets stored in columns, see `visoma.table.Table`."""
+
+    model = Ticket
+    dictionary = frozenset({"CustomerName", "Status", "ProjectIds"})
 
 
 @define
@@ -61,12 +98,13 @@ class TicketRequest:
 
     @classmethod
     def from_dict(cls, data):
-        return structure(data, cls)
-
+        return structure(data, cls, converter)
 
     def to_dict(self):
-        d = cattrs.unstructure(self)
-        return {k: v for k, v in d.items() if v is not None}
+        return converter.unstructure(self)
+
+
+register_models(converter, Ticket, TicketRequest)
 
 
 @define
@@ -89,31 +127,189 @@ class TicketsManager:
         return ticket
 
     def list(
-        self, limit: int = 2, filters: dict[str, str] | None = None
-    ) -> list[Ticket]:
+        self,
+        limit: int = 2,
+        filters: dict[str, str] | None = None,
+        columnar: bool = False,
+    ) -> list[Ticket] | TicketTable:
         """Report on tickets.
 
         Args:
             limit: Fetch tickets up to this limit. The default fetches 2
             tickets.
             filters: Criteria to filter the ticket list.
+            columnar: Return a `TicketTable`, which stores the tickets in columns
+            and needs much less memory for large results.
         """
+        if columnar:
+            return TicketTable.from_models(self.iter(limit=limit, filters=filters))
+
         params = visoma_params_from_filters_with_limit(filters, limit)
         response = self.client.get("/api2/tickets/search/", params=params)
 
+        with self.client.structuring("/api2/tickets/search/"):
+            try:
+                return [Ticket.from_dict(item) for item in response]
+            except cattrs.errors.ClassValidationError as err:
+                raise ValueError(response["Message"]) from err
+
+    def iter(
+        self, limit: int = 2, filters: dict[str, str] | None = None
+    ) -> Iterator[Ticket]:
+        """Report on tickets one at a time.
+
+        Like `list`, but the response is decoded while it streams in, so
+        memory stays flat for large results.
+
+        Args:
+            limit: Fetch tickets up to this limit. The default fetches 2
+            tickets.
+            filters: Criteria to filter the ticket list.
+        """
+        params = visoma_params_from_filters_with_limit(filters, limit)
+        items = self.client.iter_json("/api2/tickets/search/", params=params)
+        with self.client.structuring_items("/api2/tickets/search/") as stopwatch:
+            for item in items:
+                with stopwatch:
+                    try:
+                        ticket = Ticket.from_dict(item)
+                    except cattrs.errors.ClassValidationError as err:
+                        raise ValueError(item["Message"]) from err
+                yield ticket
+
+    def scan(
+        self,
+        start: date | str | int,
+        end: date | str | int,
+        step: int | None = None,
+        limit: int = 500,
+        filters: dict[str, str] | None = None,
+        concurrency: int = 4,
+    ) -> Iterator[Ticket]:
+        """Report on all tickets in a date or Id range.
+
+        The range is fetched in windows which run concurrently. Windows that
+        hit the limit are split until they fit, a single day into Id ranges,
+        so no ticket is lost to the QueryLimit. Tickets are yielded as their window completes.
+
+        Args:
+            start: First day or Id of the range.
+            end: Last day or Id of the range.
+            step: Days or Ids per window. The default is 7 days or 1000 Ids.
+            limit: Fetch tickets up to this limit per window.
+            filters: Criteria to filter the ticket list.
+            concurrency: Number of windows fetched at the same time.
+        """
+        return scan(
+            self.list,
+            SCAN_DATE_FILTERS,
+            start,
+            end,
+            step,
+            limit,
+            filters,
+            concurrency,
+        )
+
+    def create(self, request: TicketRequest):
+        """Create a ticket."""
+        log.debug("Creating ticket")
+        data = request.to_dict()
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("request=%s", sample_payload(data))
+        response = self.client.post("/api2/ticket/", data=data)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("response=%s", sample_payload(response))
         try:
-            return [Ticket.from_dict(item) for item in response]
+            return VisomaResponse.from_dict(response)
         except cattrs.errors.ClassValidationError as err:
+            log.error("ClassValidationError: %s", err.args)
             raise ValueError(response["Message"]) from err
 
-    def create(self, request: TicketRequest):
+
+@define
+class AsyncTicketsManager:
+    """Async manager for ticket resources."""
+
+    client: AsyncHttpClient
+
+    async def get(self, filters: dict[str, str]) -> Ticket:
+        """Returns a single ticket."""
+        try:
+            tickets = await self.list(filters=filters)
+        except ValueError as err:
+            raise ValueError(f"Ticket not found: '{filters}'") from err
+
+        if len(tickets) > 1:
+            raise ValueError(f"More than one ticket found: {tickets}")
+
+        ticket = tickets[0]
+        return ticket
+
+    async def list(
+        self,
+        limit: int = 2,
+        filters: dict[str, str] | None = None,
+        columnar: bool = False,
+    ) -> list[Ticket] | TicketTable:
+        """Report on tickets.
+
+        Args:
+            limit: Fetch tickets up to this limit. The default fetches 2
+            tickets.
+            filters: Criteria to filter the ticket list.
+            columnar: Return a `TicketTable`, which stores the tickets in columns
+            and needs much less memory for large results.
+        """
+        if columnar:
+            table = TicketTable()
+            async for ticket in self.iter(limit=limit, filters=filters):
+                table.append(ticket)
+            return table
+
+        params = visoma_params_from_filters_with_limit(filters, limit)
+        response = await self.client.get("/api2/tickets/search/", params=params)
+
+        with self.client.structuring("/api2/tickets/search/"):
+            try:
+                return [Ticket.from_dict(item) for item in response]
+            except cattrs.errors.ClassValidationError as err:
+                raise ValueError(response["Message"]) from err
+
+    async def iter(
+        self, limit: int = 2, filters: dict[str, str] | None = None
+    ) -> AsyncIterator[Ticket]:
+        """Report on tickets one at a time.
+
+        See `TicketsManager.iter` for details.
+
+        Args:
+            limit: Fetch tickets up to this limit. The default fetches 2
+            tickets.
+            filters: Criteria to filter the ticket list.
+        """
+        params = visoma_params_from_filters_with_limit(filters, limit)
+        items = self.client.iter_json("/api2/tickets/search/", params=params)
+        with self.client.structuring_items("/api2/tickets/search/") as stopwatch:
+            async for item in items:
+                with stopwatch:
+                    try:
+                        ticket = Ticket.from_dict(item)
+                    except cattrs.errors.ClassValidationError as err:
+                        raise ValueError(item["Message"]) from err
+                yield ticket
+
+    async def create(self, request: TicketRequest):
         """Create a ticket."""
         log.debug("Creating ticket")
-        log.debug(f"request={request}")
-        response = self.client.post("/api2/ticket/", data=request.to_dict())
-        log.debug(f"response={response}")
+        data = request.to_dict()
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("request=%s", sample_payload(data))
+        response = await self.client.post("/api2/ticket/", data=data)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("response=%s", sample_payload(response))
         try:
             return VisomaResponse.from_dict(response)
         except cattrs.errors.ClassValidationError as err:
-            log.error(f"ClassValidationError: {err.args}")
+            log.error("ClassValidationError: %s", err.args)
             raise ValueError(response["Message"]) from err
@@ -1,9 +1,14 @@
 from attrs import define
 import cattrs
 
+from visoma.http import AsyncHttpClient
 from visoma.http import HttpClient
+from visoma.lib import make_converter
+from visoma.lib import register_models
 from visoma.lib import visoma_params_from_filters_with_limit
 
+converter = make_converter()
+
 
 @define
 class TimerType:
@@ -20,11 +25,13 @@ class TimerType:
 
     @classmethod
     def from_dict(cls, data):
-        return cattrs.structure(data, cls)
+        return converter.structure(data, cls)
 
     def to_dict(self):
-        d = cattrs.unstructure(self)
-        return {k: v for k, v in d.items() if v is not None}
+        return converter.unstructure(self)
+
+
+register_models(converter, TimerType)
 
 
 @define
@@ -59,7 +66,47 @@ class TimerTypesManager:
         params = visoma_params_from_filters_with_limit(filters, limit)
         response = self.client.get("/api2/timertype/search/", params=params)
 
+        with self.client.structuring("/api2/timertype/search/"):
+            try:
+                return [TimerType.from_dict(item) for item in response]
+            except cattrs.errors.ClassValidationError as err:
+                raise ValueError(response["Message"]) from err
+
+
+@define
+class AsyncTimerTypesManager:
+    """Async manager for timer type resources."""
+
+    client: AsyncHttpClient
+
+    async def get(self, filters: dict[str, str] | None = None) -> TimerType:
+        """Returns a single timer type."""
         try:
-            return [TimerType.from_dict(item) for item in response]
-        except cattrs.errors.ClassValidationError as err:
-            raise ValueError(response["Message"]) from err
+            timer_types = await self.list(filters=filters)
+        except ValueError as err:
+            raise ValueError(f"Timer type not found: '{filters}'") from err
+
+        if len(timer_types) > 1:
+            raise ValueError(f"More than one timer type found: {timer_types}")
+
+        timer_type = timer_types[0]
+        return timer_type
+
+    async def list(
+        self, limit: int = 2, filters: dict[str, str] | None = None
+    ) -> list[TimerType]:
+        """Report on timer types.
+
+        Args:
+            limit: Fetch timer types up to this limit. The default fetches 2
+            timer types.
+            filters: Criteria to filter the timer types list.
+        """
+        params = visoma_params_from_filters_with_limit(filters, limit)
+        response = await self.client.get("/api2/timertype/search/", params=params)
+
+        with self.client.structuring("/api2/timertype/search/"):
+            try:
+                return [TimerType.from_dict(item) for item in response]
+            except cattrs.errors.ClassValidationError as err:
+                raise ValueError(response["Message"]) from err
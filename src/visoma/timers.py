@@ -1,10 +1,30 @@
 from attrs import define
+from collections.abc import AsyncIterator
+from collections.abc import Iterable
+from collections.abc import Iterator
+from datetime import date
 from datetime import datetime
 import cattrs
+import logging
 
+from visoma.http import AsyncHttpClient
 from visoma.http import HttpClient
+from visoma.lib import Outcome
 from visoma.lib import VisomaResponse
+from visoma.lib import make_converter
+from visoma.lib import map_concurrently
+from visoma.lib import register_models
+from visoma.lib import scan
 from visoma.lib import visoma_params_from_filters_with_limit
+from visoma.table import Table
+
+log = logging.getLogger(__name__)
+
+converter = make_converter()
+
+
+# Search filters for the first and last day of a scan window.
+SCAN_DATE_FILTERS = ("StartFrom", "StartTo")
 
 
 @define
@@ -30,11 +50,18 @@ class Timer:
 
     @classmethod
     def from_dict(cls, data):
-        return cattrs.structure(data, cls)
+        return converter.structure(data, cls)
 
     def to_dict(self):
-        d = cattrs.unstructure(self)
-        return {k: v for k, v in d.items() if v is not None}
+        return converter.unstructure(self)
+
+
+@define
+class TimerTable(Table):
+    """Timers stored in columns, see `visoma.table.Table`."""
+
+    model = Timer
+    dictionary = frozenset({"User"})
 
 
 @define
@@ -67,11 +94,13 @@ class TimerRequest:
 
     @classmethod
     def from_dict(cls, data):
-        return cattrs.structure(data, cls)
+        return converter.structure(data, cls)
 
     def to_dict(self):
-        d = cattrs.unstructure(self)
-        return {k: v for k, v in d.items() if v is not None}
+        return converter.unstructure(self)
+
+
+register_models(converter, Timer, TimerRequest)
 
 
 @define
@@ -94,22 +123,89 @@ class TimersManager:
         return timer
 
     def list(
-        self, limit: int = 2, filters: dict[str, str] | None = None
-    ) -> list[Timer]:
+        self,
+        limit: int = 2,
+        filters: dict[str, str] | None = None,
+        columnar: bool = False,
+    ) -> list[Timer] | TimerTable:
         """Report on timers.
 
         Args:
             limit: Fetch timers up to this limit. The default fetches 2
             timers.
             filters: Criteria to filter the timer list.
+            columnar: Return a `TimerTable`, which stores the timers in columns
+            and needs much less memory for large results.
         """
+        if columnar:
+            return TimerTable.from_models(self.iter(limit=limit, filters=filters))
+
         params = visoma_params_from_filters_with_limit(filters, limit)
         response = self.client.get("/api2/timer/search/", params=params)
 
-        try:
-            return [Timer.from_dict(item) for item in response]
-        except cattrs.errors.ClassValidationError as err:
-            raise ValueError(response["Message"]) from err
+        with self.client.structuring("/api2/timer/search/"):
+            try:
+                return [Timer.from_dict(item) for item in response]
+            except cattrs.errors.ClassValidationError as err:
+                raise ValueError(response["Message"]) from err
+
+    def iter(
+        self, limit: int = 2, filters: dict[str, str] | None = None
+    ) -> Iterator[Timer]:
+        """Report on timers one at a time.
+
+        Like `list`, but the response is decoded while it streams in, so
+        memory stays flat for large results.
+
+        Args:
+            limit: Fetch timers up to this limit. The default fetches 2
+            timers.
+            filters: Criteria to filter the timer list.
+        """
+        params = visoma_params_from_filters_with_limit(filters, limit)
+        items = self.client.iter_json("/api2/timer/search/", params=params)
+        with self.client.structuring_items("/api2/timer/search/") as stopwatch:
+            for item in items:
+                with stopwatch:
+                    try:
+                        timer = Timer.from_dict(item)
+                    except cattrs.errors.ClassValidationError as err:
+                        raise ValueError(item["Message"]) from err
+                yield timer
+
+    def scan(
+        self,
+        start: date | str | int,
+        end: date | str | int,
+        step: int | None = None,
+        limit: int = 500,
+        filters: dict[str, str] | None = None,
+        concurrency: int = 4,
+    ) -> Iterator[Timer]:
+        """Report on all timers in a date or Id range.
+
+        The range is fetched in windows which run concurrently. Windows that
+        hit the limit are split until they fit, a single day into Id ranges,
+        so no timer is lost to the QueryLimit. Timers are yielded as their window completes.
+
+        Args:
+            start: First day or Id of the range.
+            end: Last day or Id of the range.
+            step: Days or Ids per window. The default is 7 days or 1000 Ids.
+            limit: Fetch timers up to this limit per window.
+            filters: Criteria to filter the timer list.
+            concurrency: Number of windows fetched at the same time.
+        """
+        return scan(
+            self.list,
+            SCAN_DATE_FILTERS,
+            start,
+            end,
+            step,
+            limit,
+            filters,
+            concurrency,
+        )
 
     def delete(self, idx: Timer | int):
         """Delete a timer.
@@ -142,7 +238,49 @@ class TimersManager:
         if isinstance(idx, Timer):
             idx = idx.Id
 
-        self.client.get(f"/timer/close/id/{idx}")
+        self.client.send("GET", f"/timer/close/id/{idx}")
+
+    def delete_many(
+        self, timers: Iterable[Timer | int], concurrency: int = 8
+    ) -> "list[Outcome]":
+        """Delete many timers concurrently.
+
+        Args:
+            timers: Timers or identifiers of timers to be deleted.
+            concurrency: Number of requests sent at the same time.
+
+        Returns:
+            One outcome per timer, in order.
+        """
+        return self._bulk(self.delete, "delete", timers, concurrency)
+
+    def close_many(
+        self, timers: Iterable[Timer | int], concurrency: int = 8
+    ) -> "list[Outcome]":
+        """Close many timers concurrently.
+
+        The redirect pages answering the requests are not downloaded.
+
+        Args:
+            timers: Timers or identifiers of timers to be closed.
+            concurrency: Number of requests sent at the same time.
+
+        Returns:
+            One outcome per timer, in order.
+        """
+        return self._bulk(self.close, "close", timers, concurrency)
+
+    def _bulk(self, operation, name, timers, concurrency):
+        ids = [timer.Id if isinstance(timer, Timer) else timer for timer in timers]
+        results = map_concurrently(operation, ids, concurrency)
+        outcomes = [
+            Outcome.from_result(idx, result)
+            for idx, result in zip(ids, results, strict=True)
+        ]
+        failed = sum(not outcome.Success for outcome in outcomes)
+        if failed:
+            log.warning("Failed to %s %s of %s timers", name, failed, len(outcomes))
+        return outcomes
 
     def create(self, request: TimerRequest):
         """Create a timer."""
@@ -151,3 +289,139 @@ class TimersManager:
             return VisomaResponse.from_dict(response)
         except cattrs.errors.ClassValidationError as err:
             raise ValueError(response["Message"]) from err
+
+    def create_many(
+        self, requests: Iterable[TimerRequest], concurrency: int = 8
+    ) -> "list[VisomaResponse | Exception]":
+        """Create many timers concurrently.
+
+        Requests are read from the iterable as slots become free, so it can be
+        a generator over a large import.
+
+        Args:
+            requests: The timers to be created.
+            concurrency: Number of requests sent at the same time.
+
+        Returns:
+            One result per request, in order: the response, or the exception
+            when the timer could not be created.
+        """
+        results = list(map_concurrently(self.create, requests, concurrency))
+        failed = sum(isinstance(result, Exception) for result in results)
+        if failed:
+            log.warning("Failed to create %s of %s timers", failed, len(results))
+        return results
+
+
+@define
+class AsyncTimersManager:
+    """Async manager for timer resources."""
+
+    client: AsyncHttpClient
+
+    async def get(self, filters: dict[str, str] | None = None) -> Timer:
+        """Returns a single timer."""
+        try:
+            timers = await self.list(filters=filters)
+        except ValueError as err:
+            raise ValueError(f"Timer not found: '{filters}'") from err
+
+        if len(timers) > 1:
+            raise ValueError(f"More than one timer found: {timers}")
+
+        timer = timers[0]
+        return timer
+
+    async def list(
+        self,
+        limit: int = 2,
+        filters: dict[str, str] | None = None,
+        columnar: bool = False,
+    ) -> list[Timer] | TimerTable:
+        """Report on timers.
+
+        Args:
+            limit: Fetch timers up to this limit. The default fetches 2
+            timers.
+            filters: Criteria to filter the timer list.
+            columnar: Return a `TimerTable`, which stores the timers in columns
+            and needs much less memory for large results.
+        """
+        if columnar:
+            table = TimerTable()
+            async for timer in self.iter(limit=limit, filters=filters):
+                table.append(timer)
+            return table
+
+        params = visoma_params_from_filters_with_limit(filters, limit)
+        response = await self.client.get("/api2/timer/search/", params=params)
+
+        with self.client.structuring("/api2/timer/search/"):
+            try:
+                return [Timer.from_dict(item) for item in response]
+            except cattrs.errors.ClassValidationError as err:
+                raise ValueError(response["Message"]) from err
+
+    async def iter(
+        self, limit: int = 2, filters: dict[str, str] | None = None
+    ) -> AsyncIterator[Timer]:
+        """Report on timers one at a time.
+
+        See `TimersManager.iter` for details.
+
+        Args:
+            limit: Fetch timers up to this limit. The default fetches 2
+            timers.
+            filters: Criteria to filter the timer list.
+        """
+        params = visoma_params_from_filters_with_limit(filters, limit)
+        items = self.client.iter_json("/api2/timer/search/", params=params)
+        with self.client.structuring_items("/api2/timer/search/") as stopwatch:
+            async for item in items:
+                with stopwatch:
+                    try:
+                        timer = Timer.from_dict(item)
+                    except cattrs.errors.ClassValidationError as err:
+                        raise ValueError(item["Message"]) from err
+                yield timer
+
+    async def delete(self, idx: Timer | int):
+        """Delete a timer.
+
+        Args:
+            idx: Identifier for timer to be deleted.
+        """
+
+        if isinstance(idx, Timer):
+            idx = idx.Id
+
+        response = await self.client.delete(f"/api2/timer/{idx}")
+        try:
+            return VisomaResponse.from_dict(response)
+        except cattrs.errors.ClassValidationError as err:
+            raise ValueError(response["Message"]) from err
+
+    async def close(self, idx: Timer | int):
+        """Close a timer.
+
+        There is currently no API endpoint for this operation. We can also send
+        this request when the timer is already closed. Then it has no effect.
+        The response to this is a 302 redirect to a Visoma HTML page:
+        /workend/index/date/
+
+        Args:
+            idx: Identifier for timer to be closed.
+        """
+
+        if isinstance(idx, Timer):
+            idx = idx.Id
+
+        await self.client.send("GET", f"/timer/close/id/{idx}")
+
+    async def create(self, request: TimerRequest):
+        """Create a timer."""
+        response = await self.client.post("/api2/timer/", data=request.to_dict())
+        try:
+            return VisomaResponse.from_dict(response)
+        except cattrs.errors.ClassValidationError as err:
+            raise ValueError(response["Message"]) from err
@@ -0,0 +1,86 @@
+"""Cheap debug tracing for the request and structuring paths.
+
+Log calls in hot paths pass their arguments lazily and check the log level
+first, so nothing is formatted while debug logging is off. Payloads (request
+data, decoded responses, structured models) are opt-in: they are only logged
+for a sample of calls and cut to a maximum size.
+
+Environment variables:
+    - VISOMA_LOG_PAYLOADS: Fraction of payloads to log, from 0 (never, the
+      default) to 1 (always).
+    - VISOMA_LOG_PAYLOAD_MAX: Maximum number of characters logged per
+      payload. The default is 1000.
+"""
+
+from attrs import define
+import json
+import logging
+import os
+import random
+
+log = logging.getLogger(__name__)
+
+OMITTED = "<payload omitted, set VISOMA_LOG_PAYLOADS to log it>"
+
+
+@define
+class Payload:
+    """A payload which is rendered only when a log record is emitted."""
+
+    value: object
+    max_chars: int
+
+    def __str__(self) -> str:
+        value = self.value
+        if isinstance(value, str):
+            text = value
+        elif isinstance(value, list):
+            # Render items only until the cap is reached.
+            parts = []
+            size = 0
+            for item in value:
+                if size > self.max_chars:
+                    parts.append(f"... {len(value) - len(parts)} more items")
+                    break
+                part = json.dumps(item, default=str)
+                parts.append(part)
+                size += len(part)
+            text = f"[{', '.join(parts)}]"
+        else:
+            text = json.dumps(value, default=str)
+
+        if len(text) > self.max_chars:
+            return f"{text[: self.max_chars]}... ({len(text)} chars)"
+        return text
+
+
+@define
+class PayloadSampler:
+    """Decides which payloads are logged and how much of them."""
+
+    rate: float = 0.0
+    max_chars: int = 1000
+
+    @classmethod
+    def from_env(cls) -> "PayloadSampler":
+        """Returns the sampler of the env, or the default for invalid values.
+
+        It is created when visoma is imported, so invalid values only warn.
+        """
+        try:
+            return cls(
+                rate=float(os.getenv("VISOMA_LOG_PAYLOADS") or 0),
+                max_chars=int(os.getenv("VISOMA_LOG_PAYLOAD_MAX") or 1000),
+            )
+        except ValueError as err:
+            log.warning("Ignoring invalid payload logging settings: %s", err)
+            return cls()
+
+    def __call__(self, value) -> Payload | str:
+        """Returns a lazy payload for logging, or a placeholder when not sampled."""
+        if self.rate <= 0 or (self.rate < 1 and random.random() >= self.rate):
+            return OMITTED
+        return Payload(value, self.max_chars)
+
+
+sample_payload = PayloadSampler.from_env()
@@ -1,9 +1,14 @@
 from attrs import define
 import cattrs
 
+from visoma.http import AsyncHttpClient
 from visoma.http import HttpClient
+from visoma.lib import make_converter
+from visoma.lib import register_models
 from visoma.lib import visoma_params_from_filters_with_limit
 
+converter = make_converter()
+
 
 @define
 class UserGroup:
@@ -15,11 +20,13 @@ class UserGroup:
 
     @classmethod
     def from_dict(cls, data):
-        return cattrs.structure(data, cls)
+        return converter.structure(data, cls)
 
     def to_dict(self):
-        d = cattrs.unstructure(self)
-        return {k: v for k, v in d.items() if v is not None}
+        return converter.unstructure(self)
+
+
+register_models(converter, UserGroup)
 
 
 @define
@@ -54,7 +61,47 @@ class UserGroupsManager:
         params = visoma_params_from_filters_with_limit(filters, limit)
         response = self.client.get("/api2/usergroups/search/", params=params)
 
+        with self.client.structuring("/api2/usergroups/search/"):
+            try:
+                return [UserGroup.from_dict(item) for item in response]
+            except cattrs.errors.ClassValidationError as err:
+                raise ValueError(response["Message"]) from err
+
+
+@define
+class AsyncUserGroupsManager:
+    """Async manager for user group resources."""
+
+    client: AsyncHttpClient
+
+    async def get(self, filters: dict[str, str] | None = None) -> UserGroup:
+        """Returns a single user group."""
         try:
-            return [UserGroup.from_dict(item) for item in response]
-        except cattrs.errors.ClassValidationError as err:
-            raise ValueError(response["Message"]) from err
+            user_groups = await self.list(filters=filters)
+        except ValueError as err:
+            raise ValueError(f"User group not found: '{filters}'") from err
+
+        if len(user_groups) > 1:
+            raise ValueError(f"More than one user group found: {user_groups}")
+
+        user_group = user_groups[0]
+        return user_group
+
+    async def list(
+        self, limit: int = 2, filters: dict[str, str] | None = None
+    ) -> list[UserGroup]:
+        """Report on user groups.
+
+        Args:
+            limit: Fetch user groups up to this limit. The default fetches 2
+            user groups.
+            filters: Criteria to filter the user groups list.
+        """
+        params = visoma_params_from_filters_with_limit(filters, limit)
+        response = await self.client.get("/api2/usergroups/search/", params=params)
+
+        with self.client.structuring("/api2/usergroups/search/"):
+            try:
+                return [UserGroup.from_dict(item) for item in response]
+            except cattrs.errors.ClassValidationError as err:
+                raise ValueError(response["Message"]) from err
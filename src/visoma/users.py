@@ -2,9 +2,14 @@ from attrs import define
 from datetime import datetime
 import cattrs
 
+from visoma.http import AsyncHttpClient
 from visoma.http import HttpClient
+from visoma.lib import make_converter
+from visoma.lib import register_models
 from visoma.lib import visoma_params_from_filters_with_limit
 
+converter = make_converter()
+
 
 @define(str=True)
 class User:
@@ -20,11 +25,13 @@ class User:
 
     @classmethod
     def from_dict(cls, data):
-        return cattrs.structure(data, cls)
+        return converter.structure(data, cls)
 
     def to_dict(self):
-        d = cattrs.unstructure(self)
-        return {k: v for k, v in d.items() if v is not None}
+        return converter.unstructure(self)
+
+
+register_models(converter, User)
 
 
 @define
@@ -57,7 +64,47 @@ class UsersManager:
         params = visoma_params_from_filters_with_limit(filters, limit)
         response = self.client.get("/api2/user/search/", params=params)
 
+        with self.client.structuring("/api2/user/search/"):
+            try:
+                return [User.from_dict(item) for item in response]
+            except cattrs.errors.ClassValidationError as err:
+                raise ValueError(response["Message"]) from err
+
+
+@define
+class AsyncUsersManager:
+    """Async manager for user resources."""
+
+    client: AsyncHttpClient
+
+    async def get(self, filters: dict[str, str]) -> User:
+        """Returns a single user."""
         try:
-            return [User.from_dict(item) for item in response]
-        except cattrs.errors.ClassValidationError as err:
-            raise ValueError(response["Message"]) from err
+            users = await self.list(filters=filters)
+        except ValueError as err:
+            raise ValueError(f"User not found: '{filters}'") from err
+
+        if len(users) > 1:
+            raise ValueError(f"More than one user found: {users}")
+
+        user = users[0]
+        return user
+
+    async def list(
+        self, limit: int = 2, filters: dict[str, str] | None = None
+    ) -> list[User]:
+        """Report on users.
+
+        Args:
+            limit: Fetch users up to this limit. The default fetches 2
+            users.
+            filters: Criteria to filter the user list.
+        """
+        params = visoma_params_from_filters_with_limit(filters, limit)
+        response = await self.client.get("/api2/user/search/", params=params)
+
+        with self.client.structuring("/api2/user/search/"):
+            try:
+                return [User.from_dict(item) for item in response]
+            except cattrs.errors.ClassValidationError as err:
+                raise ValueError(response["Message"]) from err
@@ -1,8 +1,64 @@
 from attrs import define
+from attrs import field
+from collections.abc import Iterator
 from datetime import date
+from datetime import timedelta
+from pathlib import Path
+import logging
+import os
 import re
 
+from visoma.http import AsyncHttpClient
 from visoma.http import HttpClient
+from visoma.lib import Outcome
+from visoma.lib import map_concurrently
+
+log = logging.getLogger(__name__)
+
+
+@define
+class WorkCalendar:
+    """Tells which days are workdays.
+
+    Weekdays are numbered like `date.weekday`, so the default weekend is
+    Saturday (5) and Sunday (6).
+    """
+
+    holidays: frozenset[date] = field(factory=frozenset, converter=frozenset)
+    weekend: frozenset[int] = field(default=frozenset({5, 6}), converter=frozenset)
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> "WorkCalendar":
+        """Reads holidays from a file with one ISO date per line.
+
+        Empty lines and text after # are ignored.
+        """
+        holidays = set()
+        for line in Path(path).read_text().splitlines():
+            line = line.partition("#")[0].strip()
+            if line:
+                holidays.add(date.fromisoformat(line))
+        return cls(holidays)
+
+    @classmethod
+    def from_env(cls) -> "WorkCalendar":
+        """Returns a calendar with the holidays from the file in VISOMA_HOLIDAYS.
+
+        Without the variable only weekends are skipped.
+        """
+        path = os.getenv("VISOMA_HOLIDAYS")
+        return cls.from_file(path) if path else cls()
+
+    def is_workday(self, day: date) -> bool:
+        return day.weekday() not in self.weekend and day not in self.holidays
+
+    def workdays(self, start: date, end: date) -> Iterator[date]:
+        """Yields the workdays from start to end, both included."""
+        day = start
+        while day <= end:
+            if self.is_workday(day):
+                yield day
+            day += timedelta(days=1)
 
 
 @define
@@ -24,6 +80,9 @@ class WorkdaysManager:
 
         Args:
             day: The workday to be closed.
+
+        Returns:
+            The workday Id.
         """
 
         # We need to get a workday ID for a date.
@@ -31,7 +90,72 @@ class WorkdaysManager:
             self.client.get(f"/workend/index/date/{day}", as_json=False)
         )
 
-        self.client.get(f"/workend/submitworkend/id/{idx}")
+        self.client.send("GET", f"/workend/submitworkend/id/{idx}")
+        return idx
+
+    def close_range(
+        self,
+        start: date | str,
+        end: date | str,
+        calendar: WorkCalendar | None = None,
+        concurrency: int = 4,
+    ) -> dict[date, Outcome]:
+        """Close all workdays in a range concurrently.
+
+        Each day still takes two requests one after the other, but the days
+        are closed at the same time.
+
+        Args:
+            start: The first day of the range.
+            end: The last day of the range, included.
+            calendar: Days which are no workdays are skipped. The default
+                skips weekends and the holidays in VISOMA_HOLIDAYS.
+            concurrency: Number of days closed at the same time.
+
+        Returns:
+            An outcome per closed day. Its Id is the workday Id, or -1 when
+            it is unknown.
+        """
+        start = date.fromisoformat(start) if isinstance(start, str) else start
+        end = date.fromisoformat(end) if isinstance(end, str) else end
+        calendar = calendar if calendar is not None else WorkCalendar.from_env()
+
+        days = list(calendar.workdays(start, end))
+        results = map_concurrently(self.close, days, concurrency)
+        outcomes = {
+            day: Outcome.from_result(
+                -1 if isinstance(result, Exception) else result, result
+            )
+            for day, result in zip(days, results, strict=True)
+        }
+        failed = sum(not outcome.Success for outcome in outcomes.values())
+        if failed:
+            log.warning("Failed to close %s of %s workdays", failed, len(outcomes))
+        return outcomes
+
+
+@define
+class AsyncWorkdaysManager:
+    """Async manager for workday resources."""
+
+    client: AsyncHttpClient
+
+    async def close(self, day: date):
+        """Close a workday.
+
+        See `WorkdaysManager.close` for details.
+
+        Args:
+            day: The workday to be closed.
+        """
+
+        # We need to get a workday ID for a date.
+        idx = extract_workday_id_from_html(
+            await self.client.get(f"/workend/index/date/{day}", as_json=False)
+        )
+
+        await self.client.send("GET", f"/workend/submitworkend/id/{idx}")
+        return idx
 
 
 def extract_workday_id_from_html(html: str) -> int:
@@ -0,0 +1,76 @@
+"""Benchmarks of response handling and requests against mocked transports.
+
+The benchmarks are marked slow and skipped by the normal test run. Run them
+with `pixi run bench`, which saves the results as a JSON baseline in
+benchmarks/baselines. `pixi run bench-compare` compares a run with the latest
+baseline and fails on regressions of the mean time.
+"""
+
+import httpx
+import json
+import pytest
+
+from visoma.http import handle_response
+from visoma.workdays import extract_workday_id_from_html
+import tests
+
+pytest.importorskip("pytest_benchmark")
+
+pytestmark = pytest.mark.slow
+
+KB = 1024
+MB = 1024 * KB
+
+TIMER = {
+    "Id": 1,
+    "UserId": 1,
+    "User": "user-1",
+    "Start": "2024-03-01 08:00:00",
+    "Stop": "2024-03-01 10:30:00",
+    "Description": "A timer with a description of a few words.",
+    "TicketId": 42,
+    "Billable": True,
+}
+
+
+def timers_json(size: int) -> bytes:
+    """Returns a JSON array of timers of about `size` bytes."""
+    item = len(json.dumps(TIMER)) + 2
+    count = max(1, size // item)
+    return json.dumps([TIMER | {"Id": i} for i in range(count)]).encode()
+
+
+def workday_page(size: int) -> str:
+    """Returns an HTML page like the workday page, with the link at the end."""
+    row = '<tr><td class="time">08:00</td><td><a href="/ticket/view/id/1/">Ticket</a></td></tr>\n'
+    rows = row * (size // len(row))
+    link = '<a id="btnworkend" href="/workend/submitworkend/id/154942/">Close</a>'
+    return f"<html><body><table>\n{rows}</table>{link}</body></html>"
+
+
+@pytest.mark.parametrize("size", [1 * KB, 100 * KB, 1 * MB, 50 * MB], ids=str)
+def test_handle_response(benchmark, size):
+    response = httpx.Response(200, content=timers_json(size))
+    # Decoding is cached on the response, so each round uses a fresh one.
+    data = benchmark(
+        lambda: handle_response(httpx.Response(200, content=response.content))
+    )
+    assert data[0]["Id"] == 0
+
+
+@pytest.mark.parametrize("size", [10 * KB, 200 * KB], ids=str)
+def test_extract_workday_id_from_html(benchmark, size):
+    page = workday_page(size)
+    assert benchmark(extract_workday_id_from_html, page) == 154942
+
+
+@pytest.mark.parametrize("count", [10, 500])
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_timers_list(benchmark, client, respx_mock, count):
+    content = json.dumps([TIMER | {"Id": i} for i in range(count)]).encode()
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/timer/search/").mock(
+        return_value=httpx.Response(200, content=content)
+    )
+
+    timers = benchmark(client.timers.list, limit=count)
+    assert len(timers) == count
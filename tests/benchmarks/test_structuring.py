@@ -0,0 +1,77 @@
+"""Benchmarks of structuring, unstructuring and request parameters.
+
+Run with `pixi run bench`, see tests/benchmarks/test_requests.py.
+"""
+
+import pytest
+
+from visoma.lib import visoma_params_from_filters_with_limit
+from visoma.tickets import Ticket
+from visoma.timers import Timer
+
+pytest.importorskip("pytest_benchmark")
+
+pytestmark = pytest.mark.slow
+
+COUNT = 10_000
+
+
+def timer_dicts(count):
+    return [
+        {
+            "Id": i,
+            "UserId": i % 50,
+            "User": f"user-{i % 50}",
+            "Start": "2024-03-01 08:00:00",
+            "Stop": "2024-03-01 10:30:00",
+            "Description": f"Timer {i}",
+            "TicketId": i % 1000,
+            "TypeId": 3,
+            "Billable": i % 2 == 0,
+        }
+        for i in range(count)
+    ]
+
+
+def ticket_dicts(count):
+    return [
+        {
+            "Id": i,
+            "Number": 10_000 + i,
+            "Title": f"Ticket {i}",
+            "Description": "A ticket with a description of a few words.",
+            "CustomerName": f"Customer {i % 20}",
+            "CustomerId": i % 20,
+            "Status": "Open",
+            "StatusId": 1,
+            "Created": "2024-03-01 08:00:00",
+            "Modified": "2024-03-02 09:15:00",
+            "NotifyCustomer": False,
+            "ProjectIds": "6,87,10",
+        }
+        for i in range(count)
+    ]
+
+
+def test_timer_from_dict(benchmark):
+    data = timer_dicts(COUNT)
+    timers = benchmark(lambda: [Timer.from_dict(item) for item in data])
+    assert len(timers) == COUNT
+
+
+def test_timer_to_dict(benchmark):
+    timers = [Timer.from_dict(item) for item in timer_dicts(COUNT)]
+    data = benchmark(lambda: [timer.to_dict() for timer in timers])
+    assert data[1]["Start"] == "2024-03-01 08:00:00"
+
+
+def test_ticket_from_dict(benchmark):
+    data = ticket_dicts(COUNT)
+    tickets = benchmark(lambda: [Ticket.from_dict(item) for item in data])
+    assert len(tickets) == COUNT
+
+
+def test_params_from_filters(benchmark):
+    filters = {"UserId": "1", "StartFrom": "2024-01-01", "StartTo": "2024-01-31"}
+    params = benchmark(visoma_params_from_filters_with_limit, filters, 500)
+    assert params["params[QueryLimit]"] == 500
@@ -1,15 +1,34 @@
 import os
 import pytest
 
+from visoma import AsyncVisomaClient
 from visoma import VisomaClient
 import tests
 
 
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
 @pytest.fixture
 def client():
     os.environ["VISOMA_HOST"] = tests.VISOMA_HOST
     os.environ["VISOMA_USER"] = tests.VISOMA_USER
     os.environ["VISOMA_PASSWORD"] = tests.VISOMA_PASSWORD
+    # Mocked error responses must not be retried.
+    os.environ["VISOMA_RETRIES"] = "0"
     client = VisomaClient.from_env()
     yield client
     client.close()
+
+
+@pytest.fixture
+async def async_client():
+    os.environ["VISOMA_HOST"] = tests.VISOMA_HOST
+    os.environ["VISOMA_USER"] = tests.VISOMA_USER
+    os.environ["VISOMA_PASSWORD"] = tests.VISOMA_PASSWORD
+    # Mocked error responses must not be retried.
+    os.environ["VISOMA_RETRIES"] = "0"
+    async with AsyncVisomaClient.from_env() as client:
+        yield client
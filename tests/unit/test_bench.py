@@ -0,0 +1,112 @@
+import pytest
+import threading
+
+from visoma import VisomaClient
+from visoma.bench import parse_mix
+from visoma.bench import percentile
+from visoma.fakeserver import FakeData
+from visoma.fakeserver import FakeVisoma
+from visoma.fakeserver import make_server
+from visoma.http import HttpClient
+import tests
+
+
+@pytest.fixture
+def fake():
+    data = FakeData.generate(users=3, projects=2, tickets=40, timers=200)
+    app = FakeVisoma(data, error_rate=0.1, seed=2)
+    server = make_server(app, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = HttpClient.with_extra_headers(
+        f"http://127.0.0.1:{server.server_port}",
+        {"X_VSM_USERNAME": tests.VISOMA_USER, "X_VSM_PASSWORD": "secret"},
+    )
+    with VisomaClient(client, tests.VISOMA_USER) as visoma:
+        yield visoma, app
+    server.shutdown()
+    server.server_close()
+
+
+def test_parse_mix():
+    assert parse_mix(None) == {"tickets.list": 1, "timers.list": 1}
+    assert parse_mix("tickets.list:4, timers.create") == {
+        "tickets.list": 4,
+        "timers.create": 1,
+    }
+    assert parse_mix({"workdays.close": 2}) == {"workdays.close": 2}
+    with pytest.raises(ValueError, match="Operations of the mix"):
+        parse_mix("users.list:1")
+
+
+def test_percentile():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([3.0], 95) == 3
+    assert percentile([], 50) == 0
+
+
+def test_run(fake):
+    visoma, app = fake
+    mix = "tickets.list:2,timers.list:2,timers.create:1,workdays.close:1"
+
+    report = visoma.bench.run(duration=30, concurrency=4, mix=mix, requests=60)
+
+    total = report["total"]
+    assert total["calls"] == 60
+    assert sum(op["calls"] for op in report["operations"].values()) == 60
+    assert 0 < total["errors"] < 60
+    assert total["error_rate"] == total["errors"] / 60
+    assert 0 < total["p50_ms"] <= total["p95_ms"] <= total["p99_ms"]
+    assert report["operations"]["timers.create"]["bytes_sent"] > 0
+    assert total["bytes_received"] > 0
+    assert report["calls_per_second"] > 0
+    assert (
+        app.stats()["POST /api2/timer/"]
+        == report["operations"]["timers.create"]["calls"]
+    )
+    # Every call reaches the server, closing a workday takes two requests.
+    stats = app.stats()
+    assert total["requests"] == sum(stats.values()) - stats["errors"]
+    assert total["requests"] >= 60
+    assert total["bytes_received"] >= sum(
+        op["requests"] for op in report["operations"].values()
+    )
+
+
+def test_run_leaves_the_client_alone(fake):
+    visoma, app = fake
+    app.error_rate = 0
+    hooks = {
+        name: list(hooks) for name, hooks in visoma.client.client.event_hooks.items()
+    }
+
+    report = visoma.bench.run(mix="timers.list", requests=4)
+
+    assert report["total"]["requests"] == 4
+    assert visoma.client.client.event_hooks == hooks
+    # The client's own metrics did not see the bench.
+    assert visoma.metrics.snapshot() == {}
+    # The shared connections stay usable.
+    assert visoma.timers.list(limit=1)
+
+
+def test_run_does_not_coalesce(fake):
+    visoma, app = fake
+    app.error_rate = 0
+    app.latency = 0.05
+
+    report = visoma.bench.run(concurrency=4, mix="timers.list", requests=8)
+
+    assert report["total"]["requests"] == 8
+    assert app.stats()["GET /api2/timer/search/"] == 8
+
+
+def test_run_at_rate(fake):
+    visoma, _ = fake
+
+    report = visoma.bench.run(duration=0.5, concurrency=2, rate=20)
+
+    # 20 calls per second for half a second, the last one may not start.
+    assert 9 <= report["total"]["calls"] <= 10
@@ -0,0 +1,308 @@
+from pathlib import Path
+import httpx
+import pytest
+
+from visoma.cache import DiskCache
+from visoma.cache import ResponseCache
+from visoma.cache import cache_from_env
+from visoma.cache import cache_key
+from visoma.cache import resource_of
+from visoma.client import VisomaClient
+from visoma.http import HttpClient
+from visoma.users import UsersManager
+import tests
+
+FIRST_USER = {
+    "id": 1,
+    "username": "user-1",
+    "FullName": "First User",
+    "email": "user-1@example.com",
+    "usertype": "employee",
+    "comment": "The first test user.",
+    "lastlogin": "2024-01-01 00:00:00",
+}
+
+URL = "/api2/user/search/"
+
+
+@pytest.fixture
+def client(client, monkeypatch):
+    # The library does not cache by default.
+    monkeypatch.setenv("VISOMA_CACHE", "memory")
+    cached = VisomaClient.from_env()
+    yield cached
+    cached.close()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_key_is_independent_of_param_order():
+    assert cache_key(URL, {"b": 1, "a": 2}) == cache_key(URL, {"a": 2, "b": 1})
+    assert cache_key(URL, None) == URL
+
+
+def test_resource_of():
+    assert resource_of("/api2/tickets/search/?params[id]=1") == "ticket"
+    assert resource_of("/api2/ticket/") == "ticket"
+    assert resource_of("/api2/timer/1") == "timer"
+    assert resource_of("/api2/usergroups/search/") == "usergroup"
+
+
+def test_get_and_set():
+    cache = ResponseCache()
+    response = httpx.Response(200, json=[])
+
+    assert cache.get(URL, {"a": 1}) is None
+    cache.set(URL, {"a": 1}, response)
+
+    assert cache.get(URL, {"a": 1}) is response
+    assert cache.stats() == {
+        "size": 1,
+        "hits": 1,
+        "misses": 1,
+        "evictions": 0,
+        "invalidations": 0,
+    }
+
+
+def test_entries_expire():
+    clock = FakeClock()
+    cache = ResponseCache(ttls={URL: 10}, clock=clock)
+    cache.set(URL, None, httpx.Response(200))
+
+    clock.now = 9
+    assert cache.get(URL) is not None
+    clock.now = 10
+    assert cache.get(URL) is None
+    assert cache.get_stale(URL) is not None
+
+
+def test_least_recently_used_is_evicted():
+    cache = ResponseCache(maxsize=2)
+    for i in range(3):
+        cache.set(URL, {"id": i}, httpx.Response(200))
+        cache.get(URL, {"id": 0})
+
+    assert cache.get(URL, {"id": 0}) is not None
+    assert cache.get(URL, {"id": 1}) is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate():
+    cache = ResponseCache()
+    cache.set(URL, None, httpx.Response(200))
+    cache.set("/api2/timertype/search/", None, httpx.Response(200))
+
+    assert cache.invalidate("/api2/user/1") == 1
+    assert cache.get(URL) is None
+    assert cache.invalidate() == 1
+
+
+def test_cache_from_env(monkeypatch):
+    monkeypatch.delenv("VISOMA_CACHE", raising=False)
+    assert cache_from_env("ns") is None
+    assert isinstance(cache_from_env("ns", "memory"), ResponseCache)
+
+    monkeypatch.setenv("VISOMA_CACHE", "off")
+    assert cache_from_env("ns") is None
+
+    monkeypatch.setenv("VISOMA_CACHE", "disk")
+    monkeypatch.setenv("XDG_CACHE_HOME", "/tmp/xdg")
+    monkeypatch.delenv("VISOMA_CACHE_PATH", raising=False)
+    cache = cache_from_env("ns")
+    assert isinstance(cache, DiskCache)
+    assert cache.path == Path("/tmp/xdg/visoma/cache.sqlite3")
+
+    monkeypatch.setenv("VISOMA_CACHE", "redis")
+    with pytest.raises(ValueError, match="Unknown cache"):
+        cache_from_env("ns")
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_client_serves_reference_data_from_cache(client, respx_mock):
+    route = respx_mock.get(f"https://{tests.VISOMA_HOST}{URL}").mock(
+        httpx.Response(200, json=[FIRST_USER])
+    )
+
+    first = client.users.get({"id": "1"})
+    second = client.users.get({"ID": "1"})
+
+    assert first == second
+    assert first is not second
+    assert route.call_count == 1
+    assert client.cache.stats()["hits"] == 1
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_library_does_not_cache_by_default(monkeypatch, respx_mock):
+    monkeypatch.setenv("VISOMA_HOST", tests.VISOMA_HOST)
+    monkeypatch.setenv("VISOMA_USER", tests.VISOMA_USER)
+    monkeypatch.setenv("VISOMA_PASSWORD", tests.VISOMA_PASSWORD)
+    monkeypatch.delenv("VISOMA_CACHE", raising=False)
+    route = respx_mock.get(f"https://{tests.VISOMA_HOST}{URL}").mock(
+        httpx.Response(200, json=[FIRST_USER])
+    )
+
+    with VisomaClient.from_env() as client:
+        client.users.list()
+        client.users.list()
+
+    assert client.cache is None
+    assert route.call_count == 2
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_client_does_not_cache_timers(client, respx_mock):
+    route = respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/timer/search/").mock(
+        httpx.Response(200, json=[])
+    )
+
+    client.timers.list()
+    client.timers.list()
+
+    assert route.call_count == 2
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_client_write_invalidates_cache(client, respx_mock):
+    route = respx_mock.get(f"https://{tests.VISOMA_HOST}{URL}").mock(
+        httpx.Response(200, json=[FIRST_USER])
+    )
+    respx_mock.delete(f"https://{tests.VISOMA_HOST}/api2/user/1").mock(
+        httpx.Response(200, json={"Success": True, "Id": 1, "Message": ""})
+    )
+
+    client.users.list()
+    client.client.delete("/api2/user/1")
+    client.users.list()
+
+    assert route.call_count == 2
+
+
+def response(json, headers=None):
+    return httpx.Response(
+        200,
+        json=json,
+        headers=headers,
+        request=httpx.Request("GET", f"https://{tests.VISOMA_HOST}{URL}"),
+    )
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    cache = DiskCache(tmp_path / "cache.sqlite3", "user-1@host")
+    yield cache
+    cache.close()
+
+
+def test_disk_cache_get_and_set(disk_cache):
+    assert disk_cache.get(URL, {"a": 1}) is None
+    disk_cache.set(URL, {"a": 1}, response([FIRST_USER], {"etag": '"v1"'}))
+
+    actual = disk_cache.get(URL, {"a": 1})
+
+    assert actual.json() == [FIRST_USER]
+    assert actual.headers["etag"] == '"v1"'
+    assert disk_cache.stats() == {
+        "size": 1,
+        "hits": 1,
+        "misses": 1,
+        "evictions": 0,
+        "invalidations": 0,
+    }
+
+
+def test_disk_cache_is_shared_between_instances(tmp_path):
+    first = DiskCache(tmp_path / "cache.sqlite3", "user-1@host")
+    second = DiskCache(tmp_path / "cache.sqlite3", "user-1@host")
+    other = DiskCache(tmp_path / "cache.sqlite3", "user-2@host")
+
+    first.set(URL, None, response([FIRST_USER]))
+
+    assert second.get(URL).json() == [FIRST_USER]
+    assert other.get(URL) is None
+    for cache in (first, second, other):
+        cache.close()
+
+
+def test_disk_cache_entries_expire(tmp_path):
+    clock = FakeClock()
+    cache = DiskCache(tmp_path / "cache.sqlite3", "ns", ttls={URL: 10}, clock=clock)
+    cache.set(URL, None, response([]))
+
+    clock.now = 10
+    assert cache.get(URL) is None
+    assert cache.get_stale(URL) is not None
+    cache.close()
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    clock = FakeClock()
+    cache = DiskCache(tmp_path / "cache.sqlite3", "ns", maxsize=2, clock=clock)
+    for i in range(3):
+        clock.now += 1
+        cache.set(URL, {"id": i}, response([]))
+        clock.now += 1
+        cache.get(URL, {"id": 0})
+
+    assert cache.get(URL, {"id": 0}) is not None
+    assert cache.get(URL, {"id": 1}) is None
+    assert cache.stats()["evictions"] == 1
+    cache.close()
+
+
+def test_disk_cache_invalidate(disk_cache):
+    disk_cache.set(URL, None, response([]))
+    disk_cache.set("/api2/timertype/search/", None, response([]))
+
+    assert disk_cache.invalidate("/api2/user/") == 1
+    assert disk_cache.get(URL) is None
+    assert disk_cache.invalidate() == 1
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_revalidates_expired_entries(respx_mock):
+    clock = FakeClock()
+    cache = ResponseCache(clock=clock)
+    http = HttpClient.with_extra_headers(f"https://{tests.VISOMA_HOST}", {}, cache)
+    route = respx_mock.get(f"https://{tests.VISOMA_HOST}{URL}").mock(
+        side_effect=[
+            httpx.Response(200, json=[FIRST_USER], headers={"etag": '"v1"'}),
+            httpx.Response(304),
+        ]
+    )
+
+    UsersManager(http).list()
+    clock.now = 3600
+    actual = UsersManager(http).list()
+
+    assert actual[0].username == "user-1"
+    assert route.calls.last.request.headers["if-none-match"] == '"v1"'
+    assert cache.get(URL, {"params[QueryLimit]": 2}) is not None
+    http.close()
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_disk_cache_is_shared_between_clients(monkeypatch, tmp_path, respx_mock):
+    monkeypatch.setenv("VISOMA_HOST", tests.VISOMA_HOST)
+    monkeypatch.setenv("VISOMA_USER", tests.VISOMA_USER)
+    monkeypatch.setenv("VISOMA_PASSWORD", tests.VISOMA_PASSWORD)
+    monkeypatch.setenv("VISOMA_CACHE", "disk")
+    monkeypatch.setenv("VISOMA_CACHE_PATH", str(tmp_path / "cache.sqlite3"))
+    route = respx_mock.get(f"https://{tests.VISOMA_HOST}{URL}").mock(
+        httpx.Response(200, json=[FIRST_USER])
+    )
+
+    with VisomaClient.from_env() as client:
+        first = client.users.list()
+    with VisomaClient.from_env() as client:
+        second = client.users.list()
+
+    assert first == second
+    assert route.call_count == 1
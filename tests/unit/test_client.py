@@ -1,6 +1,9 @@
 import pytest
 import os
+import subprocess
+import sys
 
+from visoma import AsyncVisomaClient
 from visoma import VisomaClient
 import tests
 
@@ -23,3 +26,72 @@ def test_context_manager():
 
     with pytest.raises(RuntimeError, match="client has been closed"):
         client.tickets.list()
+
+
+def test_host_with_scheme(monkeypatch):
+    monkeypatch.setenv("VISOMA_HOST", "http://127.0.0.1:8000")
+    monkeypatch.setenv("VISOMA_USER", tests.VISOMA_USER)
+    monkeypatch.setenv("VISOMA_PASSWORD", tests.VISOMA_PASSWORD)
+
+    with VisomaClient.from_env() as client:
+        assert str(client.client.client.base_url) == "http://127.0.0.1:8000"
+
+
+@pytest.mark.anyio
+async def test_async_context_manager():
+    os.environ["VISOMA_HOST"] = tests.VISOMA_HOST
+    os.environ["VISOMA_USER"] = tests.VISOMA_USER
+    os.environ["VISOMA_PASSWORD"] = tests.VISOMA_PASSWORD
+
+    async with AsyncVisomaClient.from_env() as client:
+        pass
+
+    with pytest.raises(RuntimeError, match="client has been closed"):
+        await client.tickets.list()
+
+
+def test_async_missing_env_is_error():
+    os.environ["VISOMA_HOST"] = ""
+    os.environ["VISOMA_USER"] = ""
+    os.environ["VISOMA_PASSWORD"] = ""
+    with pytest.raises(ValueError, match="Missing values from env"):
+        AsyncVisomaClient.from_env()
+
+
+LAZY_MODULES = (
+    "asyncio",
+    "cattrs",
+    "fire",
+    "sqlite3",
+    "visoma.cache",
+    "visoma.metrics",
+    "visoma.ratelimit",
+    "visoma.retry",
+    "visoma.timers",
+)
+
+
+def imported(code: str, modules) -> list[str]:
+    """Returns which of the modules a fresh interpreter imports to run code."""
+    code = f"import sys; {code}; print(' '.join(m for m in {modules!r} if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    )
+    return result.stdout.split()
+
+
+def test_cli_import_is_lazy():
+    assert imported("import visoma.__cli__", LAZY_MODULES) == []
+
+
+def test_memory_cache_does_not_import_sqlite(monkeypatch):
+    monkeypatch.setenv("VISOMA_HOST", tests.VISOMA_HOST)
+    monkeypatch.setenv("VISOMA_USER", tests.VISOMA_USER)
+    monkeypatch.setenv("VISOMA_PASSWORD", tests.VISOMA_PASSWORD)
+    code = "from visoma import VisomaClient; VisomaClient.from_env(cache='memory')"
+    assert imported(code, ("sqlite3",)) == []
+
+
+def test_managers_are_imported_on_first_access(client):
+    assert type(client.timers).__module__ == "visoma.timers"
+    assert type(client.workdays).__module__ == "visoma.workdays"
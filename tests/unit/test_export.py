@@ -0,0 +1,113 @@
+from datetime import datetime
+import csv
+import gzip
+import httpx
+import json
+import pytest
+
+from visoma import export as export_module
+from visoma.export import export
+from visoma.timers import Timer
+import tests
+
+TIMERS_URL = f"https://{tests.VISOMA_HOST}/api2/timer/search/"
+
+
+def timer(idx, **kwargs):
+    return {
+        "Id": idx,
+        "UserId": 1,
+        "User": "user-1",
+        "Start": f"2024-01-{idx:02} 08:00:00",
+        "Stop": f"2024-01-{idx:02} 10:30:00",
+        "Description": f"Timer {idx}",
+    } | kwargs
+
+
+TIMERS = [Timer.from_dict(timer(idx, Billable=idx % 2 == 0)) for idx in range(1, 6)]
+
+
+def test_export_csv_gzip(tmp_path, monkeypatch):
+    # Small batches, so the export spans several of them.
+    monkeypatch.setattr(export_module, "BATCH_SIZE", 2)
+    path = tmp_path / "timers.csv.gz"
+
+    assert export(TIMERS, path) == 5
+    with gzip.open(path, "rt", newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert [row["Id"] for row in rows] == ["1", "2", "3", "4", "5"]
+    assert rows[0]["Start"] == "2024-01-01 08:00:00"
+    assert rows[0]["TicketId"] == ""
+
+
+def test_export_ndjson_columns(tmp_path):
+    path = tmp_path / "timers.jsonl"
+
+    assert export(iter(TIMERS), path, columns="Id, Billable") == 5
+    lines = path.read_text().splitlines()
+    assert [json.loads(line) for line in lines[:2]] == [
+        {"Id": 1, "Billable": False},
+        {"Id": 2, "Billable": True},
+    ]
+
+
+def test_export_parquet(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "timers.parquet"
+
+    assert export(TIMERS, path, columns=["Id", "Start", "Billable"]) == 5
+    table = pq.read_table(path)
+    assert table.column_names == ["Id", "Start", "Billable"]
+    assert table.column("Start")[0].as_py() == datetime(2024, 1, 1, 8)
+    assert table.column("Billable").to_pylist() == [False, True, False, True, False]
+
+
+def test_export_errors(tmp_path):
+    with pytest.raises(ValueError, match="format"):
+        export(TIMERS, tmp_path / "timers.xlsx")
+    with pytest.raises(ValueError, match="Compression"):
+        export(TIMERS, tmp_path / "timers.csv", compression="zip")
+    with pytest.raises(ValueError, match="Unknown columns"):
+        export(TIMERS, tmp_path / "timers.csv", columns=["Id", "Nope"])
+
+
+def test_export_nothing(tmp_path):
+    path = tmp_path / "timers.csv"
+    assert export([], path) == 0
+    assert not path.exists()
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_export_no_timers(client, respx_mock, tmp_path):
+    respx_mock.get(TIMERS_URL).mock(
+        return_value=httpx.Response(200, json={"Message": "No Timer found"})
+    )
+    path = tmp_path / "timers.csv"
+
+    assert client.export.timers(path) == 0
+    assert not path.exists()
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_export_raises_other_messages(client, respx_mock, tmp_path):
+    respx_mock.get(TIMERS_URL).mock(
+        return_value=httpx.Response(200, json={"Message": "Invalid filter"})
+    )
+
+    with pytest.raises(ValueError, match="Invalid filter"):
+        client.export.timers(tmp_path / "timers.csv")
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_export_timers(client, respx_mock, tmp_path):
+    route = respx_mock.get(TIMERS_URL).mock(
+        return_value=httpx.Response(200, json=[timer(1), timer(2)])
+    )
+    path = tmp_path / "timers.ndjson"
+
+    assert client.export.timers(path, filters={"UserId": "1"}, limit=10) == 2
+    assert route.calls.last.request.url.params["params[userid]"] == "1"
+    assert [json.loads(line)["Id"] for line in path.read_text().splitlines()] == [
+        1,
+        2,
+    ]
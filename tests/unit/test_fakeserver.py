@@ -0,0 +1,190 @@
+from datetime import date
+import httpx
+import pytest
+import threading
+import time
+
+from visoma import AsyncVisomaClient
+from visoma import VisomaClient
+from visoma.fakeserver import FakeData
+from visoma.fakeserver import FakeVisoma
+from visoma.fakeserver import make_server
+from visoma.fakeserver import matches
+from visoma.http import AsyncHttpClient
+from visoma.http import HttpClient
+from visoma.http import HttpError
+from visoma.retry import CircuitBreaker
+from visoma.retry import RetryPolicy
+from visoma.timers import TimerRequest
+import tests
+
+HEADERS = {"X_VSM_USERNAME": tests.VISOMA_USER, "X_VSM_PASSWORD": "secret"}
+
+
+@pytest.fixture
+def app():
+    data = FakeData.generate(users=5, projects=4, tickets=50, timers=500, days=28)
+    return FakeVisoma(data, seed=1)
+
+
+@pytest.fixture
+async def fake_client(app):
+    client = AsyncHttpClient.with_extra_headers(
+        "http://visoma.fake", HEADERS, transport=httpx.ASGITransport(app)
+    )
+    async with AsyncVisomaClient(client, tests.VISOMA_USER) as visoma:
+        yield visoma
+
+
+def test_generate_is_deterministic():
+    data = FakeData.generate(tickets=20, timers=30)
+    assert data == FakeData.generate(tickets=20, timers=30)
+    assert len(data.timers) == 30
+    assert data.projects[0]["TicketIds"] == [
+        ticket["Id"]
+        for ticket in data.tickets
+        if "1" in ticket["ProjectIds"].split(",")
+    ]
+
+
+def test_matches():
+    timer = {"Id": 7, "UserId": 2, "Start": "2024-01-05 08:00:00", "User": "User-2"}
+    assert matches(timer, {})
+    assert matches(timer, {"userid": "2", "user": "user-2"})
+    assert not matches(timer, {"userid": "3"})
+    assert matches(timer, {"startfrom": "2024-01-05", "startto": "2024-01-05"})
+    assert not matches(timer, {"startto": "2024-01-04"})
+    assert matches(timer, {"idfrom": "7", "idto": "10"})
+    assert not matches(timer, {"idfrom": "8"})
+
+
+@pytest.mark.anyio
+async def test_search(fake_client, app):
+    timers = await fake_client.timers.list(limit=20, filters={"UserId": "2"})
+    assert len(timers) == 20
+    assert {timer.UserId for timer in timers} == {2}
+
+    tickets = await fake_client.tickets.list(limit=1000, filters={"StatusId": 3})
+    assert 0 < len(tickets) < 50
+
+    with pytest.raises(ValueError, match="No Project found"):
+        await fake_client.projects.list(filters={"Title": "nope"})
+
+    assert app.stats()["GET /api2/timer/search/"] == 1
+
+
+@pytest.mark.anyio
+async def test_writes(fake_client, app):
+    request = TimerRequest.from_dict(
+        {
+            "UserId": 1,
+            "Start": "2024-03-01 08:00:00",
+            "Stop": "2024-03-01 09:00:00",
+            "Description": "New timer",
+        }
+    )
+    created = await fake_client.timers.create(request)
+    assert created.Success
+    assert app.data.timers[-1]["Description"] == "New timer"
+
+    await fake_client.timers.close(created.Id)
+    assert app.data.timers[-1]["Closed"] is True
+
+    deleted = await fake_client.timers.delete(created.Id)
+    assert deleted.Success
+    assert len(app.data.timers) == 500
+
+    idx = await fake_client.workdays.close(date(2024, 1, 5))
+    assert idx == date(2024, 1, 5).toordinal()
+
+
+@pytest.mark.anyio
+async def test_redirects(app):
+    client = AsyncHttpClient.with_extra_headers(
+        "http://visoma.fake", HEADERS, transport=httpx.ASGITransport(app)
+    )
+    timer = app.data.timers[0]
+    response = await client.client.get(f"/timer/close/id/{timer['Id']}")
+    assert response.status_code == 302
+    assert response.headers["location"] == (
+        f"/workend/index/date/{timer['Start'][:10]}"
+    )
+
+    idx = date(2024, 1, 5).toordinal()
+    response = await client.client.get(f"/workend/submitworkend/id/{idx}/")
+    assert response.status_code == 302
+    assert response.headers["location"] == "/workend/index/date/2024-01-05"
+    await client.close()
+
+
+@pytest.mark.anyio
+async def test_injected_errors(app):
+    app.error_rate = 1.0
+    client = AsyncHttpClient.with_extra_headers(
+        "http://visoma.fake", HEADERS, transport=httpx.ASGITransport(app)
+    )
+    with pytest.raises(HttpError, match="503"):
+        await client.get("/api2/user/search/")
+    await client.close()
+    assert app.stats()["errors"] == 1
+
+
+def test_served_with_retries(app):
+    # A third of the requests fail, the retries make up for them.
+    app.error_rate = 0.3
+    server = make_server(app, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    breaker = CircuitBreaker(threshold=100)
+    retry = RetryPolicy(retries=20, backoff=0.001, max_backoff=0.001, breaker=breaker)
+    client = HttpClient.with_extra_headers(
+        f"http://127.0.0.1:{server.server_port}", HEADERS, retry=retry
+    )
+    with VisomaClient(client, tests.VISOMA_USER) as visoma:
+        timers = list(visoma.timers.scan("2024-01-01", "2024-01-14", limit=50))
+    server.shutdown()
+    server.server_close()
+
+    expected = [timer for timer in app.data.timers if timer["Start"] < "2024-01-15"]
+    assert sorted(timer.Id for timer in timers) == sorted(t["Id"] for t in expected)
+    assert app.stats()["errors"] > 0
+
+
+def test_scan_splits_full_days_by_id(app):
+    # About 18 timers a day, the limit fits only 5.
+    server = make_server(app, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    client = HttpClient.with_extra_headers(
+        f"http://127.0.0.1:{server.server_port}", HEADERS
+    )
+    with VisomaClient(client, tests.VISOMA_USER) as visoma:
+        timers = list(visoma.timers.scan("2024-01-01", "2024-01-07", limit=5))
+    server.shutdown()
+    server.server_close()
+
+    expected = [timer for timer in app.data.timers if timer["Start"] < "2024-01-08"]
+    assert len(expected) > 7 * 5
+    assert sorted(timer.Id for timer in timers) == sorted(t["Id"] for t in expected)
+
+
+def test_served_without_delay_on_reused_connections(app):
+    server = make_server(app, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    with httpx.Client(
+        base_url=f"http://127.0.0.1:{server.server_port}", headers=HEADERS
+    ) as client:
+        client.get("/api2/user/search/")
+        started = time.perf_counter()
+        for _ in range(10):
+            client.get("/api2/timer/search/")
+        elapsed = (time.perf_counter() - started) / 10
+    server.shutdown()
+    server.server_close()
+
+    # Nagle's algorithm with delayed ACKs took about 40 ms per request.
+    assert elapsed < 0.02
@@ -2,6 +2,7 @@ from attrs import define
 import pytest
 
 from visoma.http import HttpError
+from visoma.http import JsonArrayDecoder
 from visoma.http import handle_response
 
 
@@ -25,3 +26,46 @@ def test_redirect_response_is_nothing():
 
 def test_success_response_is_something():
     assert handle_response(FakeResponse(200, "Something"), as_json=False) == "Something"
+
+
+def decode_in_chunks(text, size):
+    decoder = JsonArrayDecoder()
+    items = []
+    for i in range(0, len(text), size):
+        items.extend(decoder.feed(text[i : i + size]))
+    items.extend(decoder.close())
+    return items
+
+
+def test_json_array_decoder_any_chunk_size():
+    text = ' [ {"Id": 1, "Text": "a, ] b"}, 12345, [1, 2], "x" , true, null ] '
+    expected = [{"Id": 1, "Text": "a, ] b"}, 12345, [1, 2], "x", True, None]
+    for size in range(1, len(text) + 1):
+        assert decode_in_chunks(text, size) == expected
+
+
+def test_json_array_decoder_split_numbers():
+    # Prefixes like "1." or "1.5" decode as numbers of their own.
+    text = "[1.5e3, -12, 0.25, 1E+2, 7]"
+    expected = [1500.0, -12, 0.25, 100.0, 7]
+    for first in range(len(text) + 1):
+        for second in range(first, len(text) + 1):
+            decoder = JsonArrayDecoder()
+            items = decoder.feed(text[:first])
+            items += decoder.feed(text[first:second])
+            items += decoder.feed(text[second:])
+            assert items + decoder.close() == expected, (first, second)
+
+
+def test_json_array_decoder_empty_array():
+    assert decode_in_chunks("[]", 1) == []
+
+
+def test_json_array_decoder_non_array_is_single_item():
+    text = '{"Message": "No Timer found"}'
+    assert decode_in_chunks(text, 3) == [{"Message": "No Timer found"}]
+
+
+def test_json_array_decoder_incomplete_is_error():
+    with pytest.raises(ValueError):
+        decode_in_chunks('[{"Id": 1}, {"Id"', 4)
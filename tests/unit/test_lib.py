@@ -1,9 +1,71 @@
+from attrs import define
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+import cattrs
 import pytest
+import time
 
 from visoma.lib import FiltersError
+from visoma.lib import make_converter
+from visoma.lib import map_concurrently
+from visoma.lib import register_models
+from visoma.lib import scan_windows
+from visoma.lib import scan_bounds
 from visoma.lib import visoma_params_from_filters_with_limit
 
 
+@define
+class Model:
+    Id: int
+    Start: datetime
+    Note: str | None = None
+    Billable: bool | None = False
+
+
+@define
+class Single:
+    Id: int
+
+
+converter = make_converter()
+register_models(converter, Model, Single)
+
+
+def test_converter_round_trip():
+    data = {"Id": 1, "Start": "2024-01-01 08:00:00", "Billable": False}
+    model = converter.structure(data, Model)
+    assert model == Model(1, datetime(2024, 1, 1, 8), None, False)
+    assert converter.unstructure(model) == data
+
+
+def test_converter_leaves_out_none():
+    model = Model(1, datetime(2024, 1, 1, 8), Note=None, Billable=None)
+    assert converter.unstructure(model) == {"Id": 1, "Start": "2024-01-01 08:00:00"}
+
+
+def test_converter_single_attribute():
+    assert converter.unstructure(converter.structure({"Id": 1}, Single)) == {"Id": 1}
+
+
+def test_converter_compiles_hooks_on_first_use():
+    lazy = make_converter()
+    register_models(lazy, Single)
+    hook = lazy.get_structure_hook(Single)
+
+    assert lazy.structure({"Id": 1}, Single) == Single(1)
+    assert lazy.get_structure_hook(Single) is not hook
+    assert lazy.structure({"Id": 2}, Single) == Single(2)
+
+
+def test_converter_invalid_data_is_validation_error():
+    with pytest.raises(cattrs.errors.ClassValidationError):
+        converter.structure({"Start": "2024-01-01 08:00:00"}, Model)
+
+    with pytest.raises(cattrs.errors.ClassValidationError):
+        converter.structure("Message", Model)
+
+
 def test_non_dict_filter_is_error():
     with pytest.raises(FiltersError, match="Filters must be a dictionary"):
         visoma_params_from_filters_with_limit("str", 1)
@@ -32,3 +94,125 @@ def test_default_limit():
 def test_filter_normalization():
     params = visoma_params_from_filters_with_limit({"USERNAME": "User-1"}, 6)
     assert params == {"params[username]": "user-1", "params[QueryLimit]": 6}
+
+
+def test_scan_bounds_from_strings():
+    assert scan_bounds("2024-03-01", "2024-03-31") == (
+        date(2024, 3, 1),
+        date(2024, 3, 31),
+        timedelta(days=7),
+    )
+
+
+def test_scan_bounds_for_ids():
+    assert scan_bounds(1, 5000, 100) == (1, 5000, 100)
+
+
+def test_scan_bounds_mixed_is_error():
+    with pytest.raises(FiltersError, match="two dates or two Ids"):
+        scan_bounds("2024-03-01", 10)
+
+
+def test_scan_bounds_reversed_is_error():
+    with pytest.raises(FiltersError, match="must not be before start"):
+        scan_bounds(10, 1)
+
+
+def test_scan_covers_range_in_windows():
+    windows = []
+
+    def fetch(lo, hi, ids):
+        windows.append((lo, hi))
+        return list(range(lo, hi + 1))
+
+    actual = scan_windows(fetch, 1, 25, step=10, limit=100)
+
+    assert sorted(actual) == list(range(1, 26))
+    assert sorted(windows) == [(1, 10), (11, 20), (21, 25)]
+
+
+def test_scan_splits_windows_at_limit():
+    windows = []
+
+    def fetch(lo, hi, ids):
+        windows.append((lo, hi))
+        return list(range(lo, hi + 1))[:4]
+
+    actual = scan_windows(fetch, 1, 10, step=10, limit=4)
+
+    assert sorted(actual) == list(range(1, 11))
+    assert (1, 10) in windows
+    assert (1, 5) in windows
+
+
+@define
+class Record:
+    Id: int
+    Day: date
+
+
+def test_scan_splits_full_days_by_id():
+    # Two days with 7 records each, the search returns at most 3.
+    records = [Record(idx, date(2024, 3, 1 + idx % 2)) for idx in range(100, 114)]
+    windows = []
+
+    def fetch(lo, hi, ids):
+        windows.append((lo, hi, ids))
+        first, last = ids or (0, 1000)
+        found = [r for r in records if lo <= r.Day <= hi and first <= r.Id <= last]
+        return found[:3]
+
+    actual = scan_windows(fetch, date(2024, 3, 1), date(2024, 3, 2), timedelta(2), 3)
+
+    assert sorted(r.Id for r in actual) == list(range(100, 114))
+    assert (date(2024, 3, 1), date(2024, 3, 1), None) in windows
+    assert any(ids is not None for _, _, ids in windows)
+
+
+def test_scan_fetches_only_as_items_are_consumed():
+    windows = []
+
+    def fetch(lo, hi, ids):
+        windows.append((lo, hi))
+        return list(range(lo, hi + 1))
+
+    items = scan_windows(fetch, 1, 200, step=1, limit=100, concurrency=4)
+    assert next(items) in range(1, 5)
+    time.sleep(0.05)
+    items.close()
+
+    # Only the first windows were fetched, not all 200.
+    assert len(windows) <= 4
+
+
+def test_map_concurrently_keeps_order():
+    actual = map_concurrently(lambda x: x * 2, range(50), concurrency=4)
+
+    assert list(actual) == [x * 2 for x in range(50)]
+
+
+def test_map_concurrently_yields_errors():
+    def func(x):
+        if x == 2:
+            raise ValueError("boom")
+        return x
+
+    actual = list(map_concurrently(func, range(4), concurrency=2))
+
+    assert actual[:2] == [0, 1]
+    assert isinstance(actual[2], ValueError)
+    assert actual[3] == 3
+
+
+def test_map_concurrently_reads_items_lazily():
+    consumed = []
+
+    def items():
+        for x in range(100):
+            consumed.append(x)
+            yield x
+
+    actual = map_concurrently(lambda x: x, items(), concurrency=2)
+
+    assert next(actual) == 0
+    assert len(consumed) <= 5
@@ -0,0 +1,148 @@
+import httpx
+import pytest
+
+from visoma import AsyncVisomaClient
+from visoma.fakeserver import FakeData
+from visoma.fakeserver import FakeVisoma
+from visoma.cache import DiskCache
+from visoma.http import AsyncHttpClient
+from visoma.http import HttpClient
+from visoma.metrics import Histogram
+from visoma.metrics import Metrics
+from visoma.metrics import endpoint_template
+import tests
+
+HEADERS = {"X_VSM_USERNAME": tests.VISOMA_USER, "X_VSM_PASSWORD": "secret"}
+
+
+def test_endpoint_template():
+    assert endpoint_template("/api2/timer/search/") == "/api2/timer/search/"
+    assert endpoint_template("/api2/timer/42") == "/api2/timer/{id}"
+    assert endpoint_template("/timer/close/id/42/") == "/timer/close/id/{id}/"
+    assert endpoint_template("/workend/2024-01-05") == "/workend/{date}"
+
+
+def test_histogram():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+
+    assert histogram.snapshot() == {
+        "count": 4,
+        "sum": 3.65,
+        "buckets": {"0.1": 2, "1": 3, "+Inf": 4},
+    }
+
+
+def fake_clock(*times):
+    values = iter(times)
+    return lambda: next(values)
+
+
+def test_hooks_and_prometheus():
+    metrics = Metrics(clock=fake_clock(1.0, 1.02, 2.0, 2.5))
+
+    for path, status, body in (
+        ("/api2/timer/7", 200, "[]"),
+        ("/api2/timer/8", 503, ""),
+    ):
+        request = httpx.Request("POST", f"http://visoma.test{path}", content=b"{}")
+        metrics.on_request(request)
+        # Without Content-Length, like a chunked response.
+        response = httpx.Response(
+            status, request=request, stream=httpx.ByteStream(body.encode())
+        )
+        metrics.on_response(response)
+        response.read()
+
+    snapshot = metrics.snapshot()["POST /api2/timer/{id}"]
+    assert snapshot["requests"] == 2
+    assert snapshot["statuses"] == {"2xx": 1, "5xx": 1}
+    assert snapshot["latency_seconds"]["buckets"]["0.025"] == 1
+    assert snapshot["latency_seconds"]["buckets"]["0.5"] == 2
+    assert snapshot["request_bytes"] == 4
+    assert snapshot["response_bytes"] == 2
+
+    text = metrics.prometheus()
+    labels = 'endpoint="/api2/timer/{id}",method="POST"'
+    assert f'visoma_requests_total{{{labels},status="5xx"}} 1' in text
+    assert f"visoma_response_bytes_total{{{labels}}} 2" in text
+    assert f'visoma_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+    assert f"visoma_request_duration_seconds_count{{{labels}}} 2" in text
+    assert "# TYPE visoma_request_duration_seconds histogram" in text
+    # Nothing was structured.
+    assert "visoma_structuring_duration_seconds_count" not in text
+
+
+def test_write_to_env_file(tmp_path, monkeypatch):
+    path = tmp_path / "visoma.prom"
+    metrics = Metrics()
+    with metrics.structuring("/api2/tickets/search/"):
+        pass
+
+    monkeypatch.delenv("VISOMA_METRICS_FILE", raising=False)
+    metrics.write_to_env_file()
+    assert not path.exists()
+
+    monkeypatch.setenv("VISOMA_METRICS_FILE", str(path))
+    metrics.write_to_env_file()
+    assert "visoma_structuring_duration_seconds_count" in path.read_text()
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_close_when_metrics_cannot_be_written(tmp_path, monkeypatch):
+    monkeypatch.setenv("VISOMA_METRICS_FILE", str(tmp_path / "missing" / "x.prom"))
+    cache = DiskCache(tmp_path / "cache.sqlite", "test")
+    cache.db.execute("SELECT 1")
+    client = HttpClient.with_extra_headers("http://visoma.fake", HEADERS, cache=cache)
+
+    with pytest.raises(OSError):
+        client.close()
+
+    # The connection pool and the cache are closed anyway.
+    assert client.client.is_closed
+    assert cache._local.db is None
+
+
+@pytest.mark.anyio
+async def test_client_metrics():
+    app = FakeVisoma(FakeData.generate(tickets=20, timers=50))
+    client = AsyncHttpClient.with_extra_headers(
+        "http://visoma.fake", HEADERS, transport=httpx.ASGITransport(app)
+    )
+    async with AsyncVisomaClient(client, tests.VISOMA_USER) as visoma:
+        await visoma.timers.list(limit=10)
+        await visoma.timers.list(limit=10)
+        await visoma.timers.close(3)
+        await visoma.tickets.list(limit=5, columnar=True)
+        await visoma.users.list(limit=5)
+
+        snapshot = visoma.metrics.snapshot()
+
+    timers = snapshot["GET /api2/timer/search/"]
+    assert timers["requests"] == 2
+    assert timers["statuses"] == {"2xx": 2}
+    assert timers["latency_seconds"]["count"] == 2
+    assert timers["response_bytes"] > 0
+    assert timers["structuring_seconds"]["count"] == 2
+    assert snapshot["GET /timer/close/id/{id}"]["requests"] == 1
+    tickets = snapshot["GET /api2/tickets/search/"]
+    assert tickets["response_bytes"] > 0
+    # One measurement for the whole stream of the columnar list.
+    assert tickets["structuring_seconds"]["count"] == 1
+    assert snapshot["GET /api2/user/search/"]["structuring_seconds"]["count"] == 1
+
+
+def test_structuring_items():
+    metrics = Metrics(clock=fake_clock(0.0, 1.0, 5.0, 6.0))
+
+    with metrics.structuring_items("/api2/timer/search/") as stopwatch:
+        with stopwatch:
+            pass
+        # Time between items, like the download, is not measured.
+        with stopwatch:
+            pass
+
+    snapshot = metrics.snapshot()["GET /api2/timer/search/"]["structuring_seconds"]
+    assert snapshot["count"] == 1
+    assert snapshot["sum"] == 2.0
@@ -0,0 +1,147 @@
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+import httpx
+import pytest
+import threading
+
+from visoma.http import AsyncHttpClient
+from visoma.http import HttpClient
+from visoma.pool import PoolSettings
+from visoma.pool import PoolStats
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"[]"
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_settings_from_env(monkeypatch):
+    monkeypatch.setenv("VISOMA_POOL_SIZE", "8")
+    monkeypatch.setenv("VISOMA_POOL_KEEPALIVE", "4")
+    monkeypatch.setenv("VISOMA_POOL_KEEPALIVE_EXPIRY", "30")
+    monkeypatch.setenv("VISOMA_CONNECT_TIMEOUT", "2")
+    monkeypatch.setenv("VISOMA_READ_TIMEOUT", "60")
+    monkeypatch.setenv("VISOMA_POOL_TIMEOUT", "1.5")
+
+    settings = PoolSettings.from_env()
+
+    assert settings.limits() == httpx.Limits(
+        max_connections=8, max_keepalive_connections=4, keepalive_expiry=30
+    )
+    assert settings.timeout() == httpx.Timeout(20, connect=2, read=60, pool=1.5)
+    assert not settings.http2
+
+
+def test_settings_from_env_defaults(monkeypatch):
+    for name in ("VISOMA_POOL_SIZE", "VISOMA_HTTP2", "VISOMA_READ_TIMEOUT"):
+        monkeypatch.delenv(name, raising=False)
+
+    assert PoolSettings.from_env() == PoolSettings()
+
+
+def test_settings_http2_needs_h2(monkeypatch):
+    monkeypatch.setenv("VISOMA_HTTP2", "1")
+    monkeypatch.setattr("importlib.util.find_spec", lambda name: None)
+
+    with pytest.raises(ValueError, match="needs the h2 package"):
+        PoolSettings.from_env()
+
+
+def test_stats_new_and_reused_connections():
+    times = iter([0.0, 0.5, 1.0, 1.25])
+    stats = PoolStats(clock=lambda: next(times))
+
+    trace = stats.tracer()
+    trace("connection.connect_tcp.started", {})
+    trace("http11.send_request_headers.started", {})
+    trace = stats.tracer()
+    trace("http11.send_request_headers.started", {})
+
+    assert stats.stats() == {
+        "requests": 2,
+        "new_connections": 1,
+        "reused_connections": 1,
+        "reuse_ratio": 0.5,
+        "avg_wait_seconds": 0.375,
+        "max_wait_seconds": 0.5,
+    }
+
+
+def test_stats_are_collected_by_client(server):
+    client = HttpClient.with_extra_headers(server, {})
+
+    for _ in range(3):
+        client.get("/")
+    client.close()
+
+    stats = client.pool_stats.stats()
+    assert stats["requests"] == 3
+    assert stats["new_connections"] == 1
+    assert stats["reused_connections"] == 2
+
+
+def test_send_reuses_connections(server):
+    client = HttpClient.with_extra_headers(server, {})
+
+    for _ in range(3):
+        assert client.send("GET", "/") == 200
+    client.close()
+
+    stats = client.pool_stats.stats()
+    assert stats["new_connections"] == 1
+    assert stats["reused_connections"] == 2
+
+
+def test_stats_without_keepalive(server):
+    pool = PoolSettings(max_keepalive_connections=0)
+    client = HttpClient.with_extra_headers(server, {}, pool=pool)
+
+    for _ in range(2):
+        client.get("/")
+    client.close()
+
+    assert client.pool_stats.stats()["new_connections"] == 2
+
+
+@pytest.mark.anyio
+async def test_stats_are_collected_by_async_client(server):
+    client = AsyncHttpClient.with_extra_headers(server, {})
+
+    for _ in range(2):
+        await client.get("/")
+    await client.close()
+
+    stats = client.pool_stats.stats()
+    assert stats["new_connections"] == 1
+    assert stats["reused_connections"] == 1
+
+
+@pytest.mark.anyio
+async def test_async_send_reuses_connections(server):
+    client = AsyncHttpClient.with_extra_headers(server, {})
+
+    for _ in range(2):
+        assert await client.send("GET", "/") == 200
+    await client.close()
+
+    assert client.pool_stats.stats()["reused_connections"] == 1
@@ -0,0 +1,97 @@
+import httpx
+import io
+import pstats
+import pytest
+import sys
+import tracemalloc
+
+from visoma.__cli__ import main
+from visoma.__cli__ import split_profile_flag
+from visoma.profiling import category
+from visoma.profiling import profiled
+import tests
+
+TIMER = {
+    "Id": 1,
+    "UserId": 1,
+    "User": "user-1",
+    "Start": "2024-01-01 00:00:00",
+    "Stop": "2024-01-01 02:30:00",
+    "Description": "A test timer.",
+}
+
+
+def test_split_profile_flag():
+    assert split_profile_flag(["timers", "list"]) == (None, ["timers", "list"])
+    assert split_profile_flag(["--profile", "timers"]) == ("", ["timers"])
+    assert split_profile_flag(["timers", "--profile=t.prof"]) == ("t.prof", ["timers"])
+    assert split_profile_flag(["timers", "--", "--profile"]) == (
+        None,
+        ["timers", "--", "--profile"],
+    )
+
+
+def test_category():
+    site = "/venv/lib/python3.12/site-packages"
+    assert category(f"{site}/httpcore/_sync/connection.py", "read") == "network"
+    assert (
+        category("~", "<method 'recv_into' of '_socket.socket' objects>") == "network"
+    )
+    assert category("/usr/lib/python3.12/json/decoder.py", "decode") == "json"
+    assert category("<cattrs generated structure visoma.timers.Timer>", "f") == (
+        "structuring"
+    )
+    assert category("/home/me/visoma/src/visoma/timers.py", "list") == "visoma"
+    # The innermost package decides for packages installed in a checkout.
+    assert category(f"/home/me/visoma/.pixi{site}/fire/core.py", "Fire") == "output"
+    assert category("<frozen importlib._bootstrap>", "_find_and_load") == "imports"
+    assert category("~", "<built-in method builtins.getattr>") == "other"
+
+
+def test_profiled(tmp_path, monkeypatch):
+    monkeypatch.delenv("VISOMA_PROFILE_MEMORY", raising=False)
+    path = tmp_path / "run.prof"
+    out = io.StringIO()
+    with profiled(str(path), out=out):
+        assert not tracemalloc.is_tracing()
+        sorted(str(i) for i in range(1000))
+
+    summary = out.getvalue()
+    assert "peak memory" not in summary
+    assert "structuring" in summary
+    assert f"Profile written to {path}" in summary
+    assert pstats.Stats(str(path)).total_calls > 0
+
+
+def test_profiled_memory(tmp_path, monkeypatch):
+    monkeypatch.setenv("VISOMA_PROFILE_MEMORY", "1")
+    out = io.StringIO()
+    with profiled(str(tmp_path / "run.prof"), out=out):
+        assert tracemalloc.is_tracing()
+
+    assert "MiB peak memory" in out.getvalue()
+    assert not tracemalloc.is_tracing()
+
+
+def test_unknown_profiler():
+    with pytest.raises(ValueError, match="Profiler must be one of"):
+        with profiled(profiler="perf"):
+            pass
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_cli_profile(client, respx_mock, tmp_path, monkeypatch, capsys):
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/timer/search/").mock(
+        httpx.Response(200, json=[TIMER])
+    )
+    path = tmp_path / "timers.prof"
+    monkeypatch.setattr(
+        sys, "argv", ["visoma", f"--profile={path}", "timers", "list", "--limit=1"]
+    )
+
+    main()
+
+    captured = capsys.readouterr()
+    assert "A test timer." in captured.out
+    assert "Own time by category" in captured.err
+    assert path.exists()
@@ -1,9 +1,11 @@
+from datetime import date
 import httpx
 
 # import json
 import pytest
 
 from visoma.projects import Project
+from visoma.projects import AsyncProjectsManager
 from visoma.projects import ProjectsManager
 import tests
 
@@ -20,6 +22,15 @@ SECOND_PROJECT = {
 }
 
 
+def test_dates():
+    data = FIRST_PROJECT | {"Begin": "01.02.2024", "Deadline": "31.12.2024"}
+
+    project = Project.from_dict(data)
+
+    assert project.Begin == date(2024, 2, 1)
+    assert project.to_dict() == data
+
+
 def test_visoma_client(client):
     manager = client.projects
     assert isinstance(manager, ProjectsManager)
@@ -82,3 +93,35 @@ def test_list_not_found(client, respx_mock):
     with pytest.raises(ValueError, match="No Project found"):
         client.projects.list()
     assert route.call_count == 1
+
+
+@pytest.mark.anyio
+async def test_async_visoma_client(async_client):
+    manager = async_client.projects
+    assert isinstance(manager, AsyncProjectsManager)
+
+
+@pytest.mark.anyio
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+async def test_async_get(async_client, respx_mock):
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/project/search/").mock(
+        httpx.Response(200, json=[FIRST_PROJECT])
+    )
+
+    actual = await async_client.projects.get({"id": "1"})
+    assert isinstance(actual, Project)
+    assert actual.to_dict() == FIRST_PROJECT
+
+
+@pytest.mark.anyio
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+async def test_async_list(async_client, respx_mock):
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/project/search/").mock(
+        httpx.Response(200, json=[FIRST_PROJECT, SECOND_PROJECT])
+    )
+
+    actual = await async_client.projects.list()
+
+    assert len(actual) == 2
+    assert isinstance(actual[1], Project)
+    assert actual[1].Description == "The second test project."
@@ -0,0 +1,87 @@
+import httpx
+import pytest
+
+from visoma.http import HttpClient
+from visoma.ratelimit import RateLimiter
+from visoma.ratelimit import TokenBucket
+import tests
+
+
+def test_bucket_allows_burst_then_waits():
+    now = [0.0]
+    bucket = TokenBucket(rate=2, burst=3, clock=lambda: now[0])
+
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+    assert bucket.reserve() == 0.5
+    assert bucket.reserve() == 1.0
+
+
+def test_bucket_refills_up_to_burst():
+    now = [0.0]
+    bucket = TokenBucket(rate=1, burst=2, clock=lambda: now[0])
+    bucket.reserve()
+    bucket.reserve()
+
+    now[0] = 100.0
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 1.0]
+
+
+def test_bucket_invalid_is_error():
+    with pytest.raises(ValueError, match="Rate must be positive"):
+        TokenBucket(rate=0)
+
+
+def test_limiter_separates_reads_and_writes():
+    now = [0.0]
+    limiter = RateLimiter(
+        read=TokenBucket(rate=1, clock=lambda: now[0]),
+        write=TokenBucket(rate=0.5, clock=lambda: now[0]),
+    )
+
+    assert limiter.reserve("GET") == 0
+    assert limiter.reserve("POST") == 0
+    assert limiter.reserve("GET") == 1.0
+    assert limiter.reserve("DELETE") == 2.0
+    assert limiter.stats() == {"waits": 2, "wait_seconds": 3.0}
+
+
+def test_limiter_without_budget_does_not_limit():
+    limiter = RateLimiter(read=TokenBucket(rate=1))
+
+    assert [limiter.reserve("POST") for _ in range(5)] == [0] * 5
+
+
+def test_from_env(monkeypatch):
+    for name in ("VISOMA_READ_RATE", "VISOMA_WRITE_RATE"):
+        monkeypatch.delenv(name, raising=False)
+    assert RateLimiter.from_env() is None
+
+    monkeypatch.setenv("VISOMA_WRITE_RATE", "2.5")
+    monkeypatch.setenv("VISOMA_WRITE_BURST", "10")
+    limiter = RateLimiter.from_env()
+    assert limiter.read is None
+    assert (limiter.write.rate, limiter.write.burst) == (2.5, 10)
+
+
+def test_client_waits_for_budget(respx_mock, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("visoma.http.time.sleep", sleeps.append)
+    now = [0.0]
+    limiter = RateLimiter(read=TokenBucket(rate=10, burst=2, clock=lambda: now[0]))
+    http = HttpClient.with_extra_headers(
+        f"https://{tests.VISOMA_HOST}", {}, limiter=limiter
+    )
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/").mock(httpx.Response(200, json=[]))
+
+    for _ in range(4):
+        http.get("/")
+
+    assert sleeps == pytest.approx([0.1, 0.2])
+
+
+def test_visoma_client_shares_budget(client, monkeypatch):
+    monkeypatch.setenv("VISOMA_READ_RATE", "5")
+    with type(client).from_env() as client:
+        assert client.limiter.read.rate == 5
+        assert client.timers.client.limiter is client.limiter
+        assert client.users.client.limiter is client.limiter
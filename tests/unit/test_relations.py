@@ -0,0 +1,60 @@
+from attrs import evolve
+
+from visoma.projects import Project
+from visoma.relations import ProjectTicketIndex
+from visoma.tickets import Ticket
+
+
+def project(idx, ticket_ids):
+    return Project(idx, f"Project {idx}", "A test project.", TicketIds=ticket_ids)
+
+
+def ticket(idx, project_ids):
+    return Ticket(
+        idx,
+        idx,
+        f"Ticket {idx}",
+        "",
+        "Customer 1",
+        1,
+        "Open",
+        1,
+        ProjectIds=project_ids,
+    )
+
+
+def test_lookups_from_both_sides():
+    index = ProjectTicketIndex.from_models(
+        projects=[project(6, [1, 2]), project(7, None)],
+        tickets=[ticket(2, "6"), ticket(3, "7,6"), ticket(4, None)],
+    )
+
+    assert index.ticket_ids(6) == {1, 2, 3}
+    assert index.ticket_ids(7) == {3}
+    assert index.project_ids(3) == {6, 7}
+    assert index.project_ids(4) == frozenset()
+    assert index.ticket_ids(99) == frozenset()
+
+    # Ticket 1 was not fetched, so only tickets 2 and 3 are returned.
+    assert [t.Id for t in index.tickets_of(6)] == [2, 3]
+    assert [p.Id for p in index.projects_of(3)] == [6, 7]
+
+
+def test_incremental_update():
+    index = ProjectTicketIndex.from_models(
+        projects=[project(6, [1, 2])], tickets=[ticket(1, "6")]
+    )
+
+    # The latest model of a side decides its links.
+    index.update(tickets=[ticket(1, "7")])
+    assert index.project_ids(1) == {7}
+    assert index.ticket_ids(6) == {2}
+    assert index.ticket_ids(7) == {1}
+
+    index.update(projects=[project(6, [])])
+    assert index.ticket_ids(6) == frozenset()
+    assert index.project_ids(2) == frozenset()
+
+    index.update(tickets=[evolve(index.tickets[1], ProjectIds="")])
+    assert index.ticket_ids(7) == frozenset()
+    assert index.tickets[1].ProjectIds == ""
@@ -0,0 +1,223 @@
+from email.utils import format_datetime
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+import httpx
+import pytest
+
+from visoma import VisomaClient
+from visoma.http import AsyncHttpClient
+from visoma.http import CircuitOpenError
+from visoma.http import HttpClient
+from visoma.http import HttpError
+from visoma.retry import CircuitBreaker
+from visoma.retry import RetryPolicy
+from visoma.retry import retry_after
+import tests
+
+URL = f"https://{tests.VISOMA_HOST}/api2/timer/search/"
+
+
+@pytest.fixture
+def http():
+    client = HttpClient.with_extra_headers(
+        f"https://{tests.VISOMA_HOST}", {}, retry=RetryPolicy(backoff=0)
+    )
+    yield client
+    client.close()
+
+
+def test_delay_grows_exponentially_up_to_max():
+    policy = RetryPolicy(retries=10, backoff=1, max_backoff=5)
+    response = httpx.Response(503)
+
+    for attempt, limit in enumerate([1, 2, 4, 5, 5]):
+        assert 0 <= policy.delay(attempt, True, response=response) <= limit
+
+
+def test_delay_is_none_for_other_errors_and_opt_out():
+    policy = RetryPolicy()
+
+    assert policy.delay(0, True, response=httpx.Response(404)) is None
+    assert policy.delay(0, False, response=httpx.Response(503)) is None
+    assert policy.stats()["retries"] == 0
+
+
+def test_delay_is_none_when_exhausted():
+    policy = RetryPolicy(retries=1)
+
+    assert policy.delay(0, True, error=httpx.ConnectError("down")) is not None
+    assert policy.delay(1, True, error=httpx.ConnectError("down")) is None
+    assert policy.stats()["retries_by_reason"] == {"ConnectError": 1}
+    assert policy.stats()["exhausted"] == 1
+
+
+def test_retry_after_seconds_and_date():
+    response = httpx.Response(429, headers={"retry-after": "7"})
+    assert retry_after(response, 1.0) == 7.0
+
+    until = datetime.now(timezone.utc) + timedelta(seconds=60)
+    response = httpx.Response(503, headers={"retry-after": format_datetime(until)})
+    assert 55 < retry_after(response, 1.0) <= 60
+
+    response = httpx.Response(503, headers={"retry-after": "soon"})
+    assert retry_after(response, 1.0) == 1.0
+
+
+def test_delay_honors_retry_after_up_to_max():
+    policy = RetryPolicy(backoff=0, max_backoff=10)
+
+    response = httpx.Response(429, headers={"retry-after": "3"})
+    assert policy.delay(0, True, response=response) == 3.0
+
+    response = httpx.Response(429, headers={"retry-after": "300"})
+    assert policy.delay(0, True, response=response) == 10.0
+
+
+def test_breaker_opens_and_resets():
+    now = [0.0]
+    breaker = CircuitBreaker(threshold=2, reset_timeout=10, clock=lambda: now[0])
+
+    breaker.record("a", ok=False)
+    assert breaker.allow("a")
+    breaker.record("a", ok=False)
+    assert breaker.state("a") == "open"
+    assert not breaker.allow("a")
+    assert breaker.allow("b")
+
+    now[0] = 11.0
+    assert breaker.state("a") == "half-open"
+    assert breaker.allow("a")
+    breaker.record("a", ok=False)
+    assert breaker.state("a") == "open"
+
+    now[0] = 22.0
+    breaker.record("a", ok=True)
+    assert breaker.state("a") == "closed"
+    assert breaker.stats() == {"trips": 2, "rejections": 1, "open": []}
+
+
+def test_breaker_lets_one_probe_through_while_half_open():
+    now = [0.0]
+    breaker = CircuitBreaker(threshold=1, reset_timeout=10, clock=lambda: now[0])
+    breaker.record("a", ok=False)
+
+    now[0] = 11.0
+    assert breaker.allow("a")
+    assert not breaker.allow("a")
+    assert not breaker.allow("a")
+    breaker.record("a", ok=True)
+    assert breaker.allow("a")
+    assert breaker.allow("a")
+
+    # A probe without an outcome is replaced after the reset timeout.
+    breaker.record("a", ok=False)
+    now[0] = 22.0
+    assert breaker.allow("a")
+    now[0] = 31.0
+    assert not breaker.allow("a")
+    now[0] = 32.0
+    assert breaker.allow("a")
+    assert breaker.stats()["rejections"] == 3
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv("VISOMA_RETRIES", "5")
+    monkeypatch.setenv("VISOMA_BREAKER_THRESHOLD", "2")
+    policy = RetryPolicy.from_env()
+    assert policy.retries == 5
+    assert policy.breaker.threshold == 2
+
+    monkeypatch.setenv("VISOMA_RETRIES", "0")
+    assert RetryPolicy.from_env(default=3) is None
+
+
+def test_retries_are_off_by_default(monkeypatch):
+    monkeypatch.delenv("VISOMA_RETRIES", raising=False)
+    assert RetryPolicy.from_env() is None
+    assert RetryPolicy.from_env(default=3).retries == 3
+
+    monkeypatch.setenv("VISOMA_HOST", tests.VISOMA_HOST)
+    monkeypatch.setenv("VISOMA_USER", tests.VISOMA_USER)
+    monkeypatch.setenv("VISOMA_PASSWORD", "secret")
+    with VisomaClient.from_env() as client:
+        assert client.client.retry is None
+
+
+def test_get_is_retried(http, respx_mock):
+    route = respx_mock.get(URL).mock(
+        side_effect=[
+            httpx.ConnectError("down"),
+            httpx.Response(503),
+            httpx.Response(200, json=[]),
+        ]
+    )
+
+    assert http.get("/api2/timer/search/") == []
+    assert route.call_count == 3
+    assert http.retry.stats()["retries_by_reason"] == {"ConnectError": 1, "503": 1}
+
+
+def test_get_gives_up(http, respx_mock):
+    route = respx_mock.get(URL).mock(httpx.Response(503, text="Unavailable"))
+
+    with pytest.raises(HttpError, match="503: Unavailable"):
+        http.get("/api2/timer/search/")
+    assert route.call_count == 4
+
+
+def test_html_get_is_not_retried(http, respx_mock):
+    # Closing a timer is a GET which changes state.
+    route = respx_mock.get(f"https://{tests.VISOMA_HOST}/timer/close/id/1").mock(
+        httpx.Response(503)
+    )
+
+    with pytest.raises(HttpError, match="503"):
+        http.send("GET", "/timer/close/id/1")
+    assert route.call_count == 1
+
+
+def test_post_is_retried_only_on_request(http, respx_mock):
+    route = respx_mock.post(URL).mock(
+        side_effect=[
+            httpx.Response(503),
+            httpx.Response(503),
+            httpx.Response(200, json={}),
+        ]
+    )
+
+    with pytest.raises(HttpError):
+        http.post("/api2/timer/search/", data={})
+    assert route.call_count == 1
+
+    assert http.post("/api2/timer/search/", data={}, retry=True) == {}
+    assert route.call_count == 3
+
+
+def test_circuit_breaker_fails_fast(respx_mock):
+    retry = RetryPolicy(retries=1, backoff=0, breaker=CircuitBreaker(threshold=3))
+    http = HttpClient.with_extra_headers(
+        f"https://{tests.VISOMA_HOST}", {}, retry=retry
+    )
+    route = respx_mock.get(URL).mock(httpx.Response(500))
+
+    with pytest.raises(HttpError, match="500"):
+        http.get("/api2/timer/search/")
+    with pytest.raises(CircuitOpenError):
+        http.get("/api2/timer/search/")
+    assert route.call_count == 3
+    assert retry.stats()["breaker"]["open"] == [tests.VISOMA_HOST]
+
+
+@pytest.mark.anyio
+async def test_async_get_is_retried(respx_mock):
+    http = AsyncHttpClient.with_extra_headers(
+        f"https://{tests.VISOMA_HOST}", {}, retry=RetryPolicy(backoff=0)
+    )
+    route = respx_mock.get(URL).mock(
+        side_effect=[httpx.Response(502), httpx.Response(200, json=[])]
+    )
+
+    assert await http.get("/api2/timer/search/") == []
+    assert route.call_count == 2
+    await http.close()
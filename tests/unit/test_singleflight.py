@@ -0,0 +1,179 @@
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import httpx
+import pytest
+import threading
+import time
+
+from visoma.http import AsyncHttpClient
+from visoma.http import HttpClient
+from visoma.http import HttpError
+from visoma.singleflight import AsyncSingleFlight
+from visoma.singleflight import SingleFlight
+import tests
+
+BASE_URL = f"https://{tests.VISOMA_HOST}"
+URL = f"{BASE_URL}/api2/user/search/"
+
+
+def wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_concurrent_calls_share_one_call():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def call():
+        calls.append(1)
+        release.wait(5)
+        return ["result"]
+
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(flights.do, "key", call) for _ in range(4)]
+        wait_for(lambda: flights.calls == 4)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(calls) == 1
+    assert results == [["result"]] * 4
+    assert flights.stats() == {"calls": 4, "shared": 3}
+
+
+def test_errors_are_shared_and_not_kept():
+    flights = SingleFlight()
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        flights.do("key", fail)
+    assert flights.do("key", lambda: 1) == 1
+
+
+def test_get_coalesces_identical_requests(respx_mock):
+    http = HttpClient.with_extra_headers(BASE_URL, {})
+    release = threading.Event()
+
+    def respond(request):
+        release.wait(5)
+        return httpx.Response(200, json=[{"Id": 1}])
+
+    route = respx_mock.get(URL).mock(side_effect=respond)
+    params = {"params[querylimit]": 2}
+
+    with ThreadPoolExecutor(3) as pool:
+        futures = [
+            pool.submit(http.get, "/api2/user/search/", params=params) for _ in range(3)
+        ]
+        wait_for(lambda: http.flights.calls == 3)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert route.call_count == 1
+    assert results == [[{"Id": 1}]] * 3
+    # Each caller gets its own decoded copy.
+    assert results[0] is not results[1]
+    http.close()
+
+
+def test_get_does_not_coalesce_different_params(respx_mock):
+    http = HttpClient.with_extra_headers(BASE_URL, {})
+    route = respx_mock.get(URL).mock(httpx.Response(200, json=[]))
+
+    http.get("/api2/user/search/", params={"a": 1})
+    http.get("/api2/user/search/", params={"a": 2})
+    http.get("/api2/user/search/", headers={"x": "1"})
+
+    assert route.call_count == 3
+    assert http.flights.stats()["calls"] == 2
+    http.close()
+
+
+@pytest.mark.anyio
+async def test_async_concurrent_calls_share_one_call():
+    flights = AsyncSingleFlight()
+    release = asyncio.Event()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await release.wait()
+        return "result"
+
+    tasks = [asyncio.create_task(flights.do("key", call)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*tasks) == ["result"] * 3
+    assert len(calls) == 1
+
+
+@pytest.mark.anyio
+async def test_async_cancelled_leader_does_not_cancel_waiters():
+    flights = AsyncSingleFlight()
+    release = asyncio.Event()
+
+    async def call():
+        await release.wait()
+        return "result"
+
+    leader = asyncio.create_task(flights.do("key", call))
+    waiter = asyncio.create_task(flights.do("key", call))
+    await asyncio.sleep(0)
+    leader.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await waiter == "result"
+    assert leader.cancelled()
+    assert flights.stats() == {"calls": 2, "shared": 1}
+    assert flights._waiting == {}
+
+
+@pytest.mark.anyio
+async def test_async_call_is_cancelled_with_all_callers():
+    flights = AsyncSingleFlight()
+    cancelled = asyncio.Event()
+
+    async def call():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    tasks = [asyncio.create_task(flights.do("key", call)) for _ in range(2)]
+    await asyncio.sleep(0)
+    for task in tasks:
+        task.cancel()
+
+    await asyncio.wait_for(cancelled.wait(), 1)
+    await asyncio.sleep(0)
+    assert flights._flights == {}
+    assert flights._waiting == {}
+
+
+@pytest.mark.anyio
+async def test_async_get_shares_errors(respx_mock):
+    http = AsyncHttpClient.with_extra_headers(BASE_URL, {})
+
+    async def respond(request):
+        await asyncio.sleep(0.01)
+        return httpx.Response(500, text="Internal Server Error")
+
+    route = respx_mock.get(URL).mock(side_effect=respond)
+
+    results = await asyncio.gather(
+        http.get("/api2/user/search/"),
+        http.get("/api2/user/search/"),
+        return_exceptions=True,
+    )
+
+    assert route.call_count == 1
+    assert all(isinstance(result, HttpError) for result in results)
+    await http.close()
@@ -0,0 +1,169 @@
+from datetime import datetime
+import httpx
+import pytest
+
+from visoma.projects import Project
+from visoma.sync import Mirror
+from visoma.sync import SyncManager
+from visoma.tickets import Ticket
+import tests
+
+TICKETS_URL = f"https://{tests.VISOMA_HOST}/api2/tickets/search/"
+PROJECTS_URL = f"https://{tests.VISOMA_HOST}/api2/project/search/"
+
+
+def ticket(idx, modified, **kwargs):
+    return {
+        "Id": idx,
+        "Number": idx,
+        "Title": f"Ticket {idx}",
+        "Description": "A test ticket.",
+        "CustomerName": "Customer 1",
+        "CustomerId": 1,
+        "Status": "Open",
+        "StatusId": 1,
+        "Created": "2024-01-01 08:00:00",
+        "Modified": modified,
+    } | kwargs
+
+
+PROJECT = {
+    "Id": 7,
+    "Title": "Project 7",
+    "Description": "A test project.",
+    "Begin": "01.02.2024",
+    "TicketIds": [1, 2],
+}
+
+
+@pytest.fixture
+def sync(client, tmp_path):
+    mirror = Mirror(tmp_path / "mirror.sqlite3")
+    yield SyncManager(client.client, mirror)
+    mirror.close()
+
+
+def test_mirror_from_env(monkeypatch, tmp_path):
+    monkeypatch.delenv("VISOMA_MIRROR_PATH", raising=False)
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path))
+    assert Mirror.from_env("user@host").path == tmp_path / "visoma/user@host.sqlite3"
+
+    monkeypatch.setenv("VISOMA_MIRROR_PATH", str(tmp_path / "mirror.db"))
+    assert Mirror.from_env("user@host").path == tmp_path / "mirror.db"
+
+
+def test_mirror_round_trip(tmp_path):
+    mirror = Mirror(tmp_path / "mirror.sqlite3")
+    tickets = [
+        Ticket.from_dict(ticket(1, "2024-03-01 10:00:00", NotifyCustomer=True)),
+        Ticket.from_dict(ticket(2, "2024-03-02 10:00:00", StatusId=2)),
+    ]
+    projects = [Project.from_dict(PROJECT)]
+
+    assert mirror.save_tickets(tickets) == 2
+    assert mirror.save_projects(projects) == 1
+
+    assert mirror.tickets() == tickets
+    assert mirror.tickets(status_id=2) == tickets[1:]
+    assert mirror.tickets(project_id=7) == tickets
+    assert mirror.tickets(modified_from="2024-03-02") == tickets[1:]
+    assert mirror.projects() == projects
+    assert mirror.high_water("tickets") == "2024-03-02 10:00:00"
+    assert mirror.index().ticket_ids(7) == {1, 2}
+    mirror.close()
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_sync_is_incremental(sync, respx_mock):
+    respx_mock.get(PROJECTS_URL).mock(httpx.Response(200, json=[PROJECT]))
+    route = respx_mock.get(TICKETS_URL).mock(
+        side_effect=[
+            httpx.Response(
+                200,
+                json=[
+                    ticket(1, "2024-03-01 10:00:00"),
+                    ticket(2, "2024-03-02 10:00:00"),
+                ],
+            ),
+            httpx.Response(
+                200,
+                json=[
+                    ticket(2, "2024-03-05 09:00:00", Title="Changed"),
+                    ticket(3, "2024-03-04 10:00:00"),
+                ],
+            ),
+        ]
+    )
+
+    assert sync.run() == {
+        "projects": 1,
+        "tickets": 2,
+        "high_water": "2024-03-02 10:00:00",
+    }
+    assert "params[modifiedfrom]" not in route.calls[0].request.url.params
+
+    assert sync.tickets() == 2
+    params = route.calls[1].request.url.params
+    assert params["params[modifiedfrom]"] == "2024-03-02 10:00:00"
+
+    tickets = sync.query()
+    assert [t.Id for t in tickets] == [1, 2, 3]
+    assert tickets[1].Title == "Changed"
+    assert tickets[1].Modified == datetime(2024, 3, 5, 9)
+    assert [t.Id for t in sync.query(project_id=7)] == [1, 2]
+    assert sync.mirror.high_water("tickets") == "2024-03-05 09:00:00"
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_sync_without_changes(sync, respx_mock):
+    sync.mirror.save_tickets([Ticket.from_dict(ticket(1, "2024-03-01 10:00:00"))])
+    respx_mock.get(TICKETS_URL).mock(
+        httpx.Response(200, json={"Success": False, "Message": "No tickets found"})
+    )
+
+    assert sync.tickets() == 0
+    assert len(sync.query()) == 1
+    assert sync.mirror.high_water("tickets") == "2024-03-01 10:00:00"
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_sync_raises_other_messages(sync, respx_mock):
+    sync.mirror.save_tickets([Ticket.from_dict(ticket(1, "2024-03-01 10:00:00"))])
+    respx_mock.get(TICKETS_URL).mock(
+        httpx.Response(200, json={"Success": False, "Message": "Access denied"})
+    )
+
+    with pytest.raises(ValueError, match="Access denied"):
+        sync.tickets(full=True)
+    assert len(sync.query()) == 1
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_full_sync_removes_deleted_tickets(sync, respx_mock):
+    sync.mirror.save_tickets(
+        [Ticket.from_dict(ticket(idx, "2024-03-01 10:00:00")) for idx in (1, 2, 3)]
+    )
+    respx_mock.get(TICKETS_URL).mock(
+        httpx.Response(200, json=[ticket(2, "2024-03-01 10:00:00")])
+    )
+
+    # A sync hitting the limit may be incomplete, so it removes nothing.
+    assert sync.tickets(full=True, limit=1) == 1
+    assert [t.Id for t in sync.query()] == [1, 2, 3]
+
+    assert sync.tickets(full=True) == 1
+    assert [t.Id for t in sync.query()] == [2]
+
+
+def test_visoma_client_sync(client, monkeypatch, tmp_path):
+    monkeypatch.setenv("VISOMA_MIRROR_PATH", str(tmp_path / "mirror.sqlite3"))
+
+    assert isinstance(client.sync, SyncManager)
+    assert client.sync.mirror.path == tmp_path / "mirror.sqlite3"
+
+    # One mirror per client, closed with it.
+    mirror = client.sync.mirror
+    assert client.sync.mirror is mirror
+    mirror.high_water("tickets")
+    client.close()
+    assert mirror._db is None
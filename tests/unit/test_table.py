@@ -0,0 +1,74 @@
+from attrs import define
+from datetime import date
+from datetime import datetime
+import pytest
+
+from visoma.table import Table
+
+
+@define
+class Model:
+    Id: int
+    Name: str
+    Created: datetime
+    Due: date | None = None
+    Rate: float | None = None
+    Done: bool | None = None
+    Tags: list[int] | None = None
+    Note: str | None = None
+
+
+@define
+class ModelTable(Table):
+    model = Model
+    dictionary = frozenset({"Name"})
+
+
+MODELS = [
+    Model(1, "a", datetime(2024, 1, 1, 8, 30, 15, 250), date(2024, 2, 1), 1.5, True),
+    Model(2, "b", datetime(1960, 5, 4, 23, 59, 59), Tags=[1, 2], Note="Grüße"),
+    Model(3, "a", datetime(2024, 1, 2), Done=False, Note=""),
+]
+
+
+@pytest.fixture
+def table():
+    return ModelTable.from_models(iter(MODELS))
+
+
+def test_rows(table):
+    assert len(table) == 3
+    assert list(table) == MODELS
+    assert table[-1] == MODELS[2]
+    assert table[1:] == MODELS[1:]
+    with pytest.raises(IndexError):
+        table[3]
+
+
+def test_columns(table):
+    assert table.column("Name") == ["a", "b", "a"]
+    assert table.column("Done") == [True, None, False]
+    assert table.columns["Name"].strings == ["a", "b"]
+    assert table.column("Note") == [None, "Grüße", ""]
+    assert table.columns["Note"].text == "Grüße".encode()
+    assert table.columns["Note"].strings == []
+    assert table.columns["Id"].values.typecode == "i"
+
+
+def test_wide_integers(table):
+    table.append(Model(2**40, "c", datetime(2024, 1, 3)))
+    assert table.columns["Id"].values.typecode == "q"
+    assert table.column("Id") == [1, 2, 3, 2**40]
+
+
+def test_append_and_nbytes(table):
+    size = table.nbytes()
+    table.append(MODELS[0])
+    assert table[3] == MODELS[0]
+    assert table.nbytes() > size
+
+
+def test_empty():
+    table = ModelTable()
+    assert len(table) == 0
+    assert list(table) == []
@@ -2,6 +2,7 @@ import httpx
 import pytest
 
 from visoma.ticket_statuses import TicketStatus
+from visoma.ticket_statuses import AsyncTicketStatusesManager
 from visoma.ticket_statuses import TicketStatusesManager
 import tests
 
@@ -78,3 +79,35 @@ def test_list_not_found(client, respx_mock):
     with pytest.raises(ValueError, match="No Ticket Status found"):
         client.ticket_statuses.list()
     assert route.call_count == 1
+
+
+@pytest.mark.anyio
+async def test_async_visoma_client(async_client):
+    manager = async_client.ticket_statuses
+    assert isinstance(manager, AsyncTicketStatusesManager)
+
+
+@pytest.mark.anyio
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+async def test_async_get(async_client, respx_mock):
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/ticketstatus/search/").mock(
+        httpx.Response(200, json=[FIRST_TICKET_STATUS])
+    )
+
+    actual = await async_client.ticket_statuses.get({"id": "1"})
+    assert isinstance(actual, TicketStatus)
+    assert actual.to_dict() == FIRST_TICKET_STATUS
+
+
+@pytest.mark.anyio
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+async def test_async_list(async_client, respx_mock):
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/ticketstatus/search/").mock(
+        httpx.Response(200, json=[FIRST_TICKET_STATUS, SECOND_TICKET_STATUS])
+    )
+
+    actual = await async_client.ticket_statuses.list()
+
+    assert len(actual) == 2
+    assert isinstance(actual[1], TicketStatus)
+    assert actual[1].Title == "Ticket Status 2"
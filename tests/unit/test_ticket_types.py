@@ -2,6 +2,7 @@ import httpx
 import pytest
 
 from visoma.ticket_types import TicketType
+from visoma.ticket_types import AsyncTicketTypesManager
 from visoma.ticket_types import TicketTypesManager
 import tests
 
@@ -80,3 +81,35 @@ def test_list_not_found(client, respx_mock):
     with pytest.raises(ValueError, match="No Ticket Type found"):
         client.ticket_types.list()
     assert route.call_count == 1
+
+
+@pytest.mark.anyio
+async def test_async_visoma_client(async_client):
+    manager = async_client.ticket_types
+    assert isinstance(manager, AsyncTicketTypesManager)
+
+
+@pytest.mark.anyio
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+async def test_async_get(async_client, respx_mock):
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/tickettype/search/").mock(
+        httpx.Response(200, json=[FIRST_TICKET_TYPE])
+    )
+
+    actual = await async_client.ticket_types.get({"id": "1"})
+    assert isinstance(actual, TicketType)
+    assert actual.to_dict() == FIRST_TICKET_TYPE
+
+
+@pytest.mark.anyio
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+async def test_async_list(async_client, respx_mock):
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/tickettype/search/").mock(
+        httpx.Response(200, json=[FIRST_TICKET_TYPE, SECOND_TICKET_TYPE])
+    )
+
+    actual = await async_client.ticket_types.list()
+
+    assert len(actual) == 2
+    assert isinstance(actual[1], TicketType)
+    assert actual[1].Title == "Ticket Type 2"
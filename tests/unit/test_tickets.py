@@ -1,11 +1,15 @@
 import httpx
 import json
+import logging
 import pytest
 
 from visoma.lib import VisomaResponse
 from visoma.tickets import Ticket
 from visoma.tickets import TicketRequest
+from visoma.tickets import TicketTable
+from visoma.tickets import AsyncTicketsManager
 from visoma.tickets import TicketsManager
+from visoma.tracing import OMITTED
 import tests
 
 
@@ -45,6 +49,12 @@ def test_visoma_client(client):
     assert isinstance(manager, TicketsManager)
 
 
+def test_project_ids():
+    ticket = Ticket.from_dict(FIRST_TICKET | {"ProjectIds": "6,87, 10"})
+    assert ticket.project_ids == (6, 87, 10)
+    assert Ticket.from_dict(FIRST_TICKET).project_ids == ()
+
+
 @pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
 def test_get(client, respx_mock):
     respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/tickets/search/").mock(
@@ -93,6 +103,18 @@ def test_list(client, respx_mock):
     assert actual[1].Title == "Ticket 2"
 
 
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_list_columnar(client, respx_mock):
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/tickets/search/").mock(
+        httpx.Response(200, json=[FIRST_TICKET, SECOND_TICKET])
+    )
+
+    actual = client.tickets.list(columnar=True)
+
+    assert isinstance(actual, TicketTable)
+    assert [ticket.to_dict() for ticket in actual] == [FIRST_TICKET, SECOND_TICKET]
+
+
 @pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
 def test_list_not_found(client, respx_mock):
     route = respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/tickets/search/").mock(
@@ -118,6 +140,19 @@ def test_create(client, respx_mock):
     # assert title == "Ticket 3"
 
 
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_create_omits_payloads(client, respx_mock, caplog):
+    respx_mock.post(f"https://{tests.VISOMA_HOST}/api2/ticket/").mock(
+        httpx.Response(200, json={"Success": True, "Id": 1, "Message": ""})
+    )
+
+    with caplog.at_level(logging.DEBUG, logger="visoma"):
+        client.tickets.create(TicketRequest.from_dict(TICKET_REQUEST))
+
+    assert OMITTED in caplog.text
+    assert TICKET_REQUEST["Title"] not in caplog.text
+
+
 @pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
 def test_create_failed(client, respx_mock):
     route = respx_mock.post(f"https://{tests.VISOMA_HOST}/api2/ticket/").mock(
@@ -129,3 +164,87 @@ def test_create_failed(client, respx_mock):
     with pytest.raises(ValueError, match="Error creating ticket"):
         client.tickets.create(TicketRequest.from_dict(TICKET_REQUEST))
     assert route.call_count == 1
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_iter(client, respx_mock):
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/tickets/search/").mock(
+        httpx.Response(200, json=[FIRST_TICKET, SECOND_TICKET])
+    )
+
+    actual = list(client.tickets.iter())
+
+    assert [ticket.Title for ticket in actual] == ["Ticket 1", "Ticket 2"]
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_scan(client, respx_mock):
+    route = respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/tickets/search/").mock(
+        httpx.Response(200, json=[FIRST_TICKET, SECOND_TICKET])
+    )
+
+    actual = list(client.tickets.scan("2024-01-01", "2024-01-07"))
+
+    assert len(actual) == 2
+    assert route.call_count == 1
+    params = route.calls.last.request.url.params
+    assert params["params[createdfrom]"] == "2024-01-01"
+    assert params["params[createdto]"] == "2024-01-07"
+
+
+@pytest.mark.anyio
+async def test_async_visoma_client(async_client):
+    manager = async_client.tickets
+    assert isinstance(manager, AsyncTicketsManager)
+
+
+@pytest.mark.anyio
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+async def test_async_get(async_client, respx_mock):
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/tickets/search/").mock(
+        httpx.Response(200, json=[FIRST_TICKET])
+    )
+
+    actual = await async_client.tickets.get({"id": "1"})
+    assert isinstance(actual, Ticket)
+    assert actual.to_dict() == FIRST_TICKET
+
+
+@pytest.mark.anyio
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+async def test_async_list(async_client, respx_mock):
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/tickets/search/").mock(
+        httpx.Response(200, json=[FIRST_TICKET, SECOND_TICKET])
+    )
+
+    actual = await async_client.tickets.list()
+
+    assert len(actual) == 2
+    assert isinstance(actual[1], Ticket)
+    assert actual[1].Title == "Ticket 2"
+
+
+@pytest.mark.anyio
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+async def test_async_list_columnar(async_client, respx_mock):
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/tickets/search/").mock(
+        httpx.Response(200, json=[FIRST_TICKET, SECOND_TICKET])
+    )
+
+    actual = await async_client.tickets.list(columnar=True)
+
+    assert isinstance(actual, TicketTable)
+    assert actual[-1].Title == "Ticket 2"
+
+
+@pytest.mark.anyio
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+async def test_async_create_failed(async_client, respx_mock):
+    respx_mock.post(f"https://{tests.VISOMA_HOST}/api2/ticket/").mock(
+        httpx.Response(
+            200, json={"Success": False, "Id": -1, "Message": "Error creating ticket"}
+        )
+    )
+
+    with pytest.raises(ValueError, match="Error creating ticket"):
+        await async_client.tickets.create(TicketRequest.from_dict(TICKET_REQUEST))
@@ -2,6 +2,7 @@ import httpx
 import pytest
 
 from visoma.timer_types import TimerType
+from visoma.timer_types import AsyncTimerTypesManager
 from visoma.timer_types import TimerTypesManager
 import tests
 
@@ -80,3 +81,35 @@ def test_list_not_found(client, respx_mock):
     with pytest.raises(ValueError, match="No Timer Type found"):
         client.timer_types.list()
     assert route.call_count == 1
+
+
+@pytest.mark.anyio
+async def test_async_visoma_client(async_client):
+    manager = async_client.timer_types
+    assert isinstance(manager, AsyncTimerTypesManager)
+
+
+@pytest.mark.anyio
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+async def test_async_get(async_client, respx_mock):
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/timertype/search/").mock(
+        httpx.Response(200, json=[FIRST_TIMER_TYPE])
+    )
+
+    actual = await async_client.timer_types.get({"id": "1"})
+    assert isinstance(actual, TimerType)
+    assert actual.to_dict() == FIRST_TIMER_TYPE
+
+
+@pytest.mark.anyio
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+async def test_async_list(async_client, respx_mock):
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/timertype/search/").mock(
+        httpx.Response(200, json=[FIRST_TIMER_TYPE, SECOND_TIMER_TYPE])
+    )
+
+    actual = await async_client.timer_types.list()
+
+    assert len(actual) == 2
+    assert isinstance(actual[1], TimerType)
+    assert actual[1].title == "Timer Type 2"
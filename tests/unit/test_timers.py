@@ -1,10 +1,17 @@
+from datetime import datetime
+from datetime import timedelta
 import httpx
 import json
 import pytest
+import tracemalloc
 
+from visoma.http import HttpError
+from visoma.lib import Outcome
 from visoma.lib import VisomaResponse
 from visoma.timers import Timer
 from visoma.timers import TimerRequest
+from visoma.timers import TimerTable
+from visoma.timers import AsyncTimersManager
 from visoma.timers import TimersManager
 import tests
 
@@ -88,6 +95,53 @@ def test_list(client, respx_mock):
     assert actual[1].Description == "The second test timer."
 
 
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_list_columnar(client, respx_mock):
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/timer/search/").mock(
+        httpx.Response(200, json=[FIRST_TIMER, SECOND_TIMER])
+    )
+
+    actual = client.timers.list(columnar=True)
+
+    assert isinstance(actual, TimerTable)
+    assert len(actual) == 2
+    assert actual[1].to_dict() == SECOND_TIMER
+    assert actual.column("User") == ["user-1", "user-1"]
+
+
+def allocated(make) -> int:
+    """Returns the bytes still allocated for the result of make."""
+    tracemalloc.start()
+    try:
+        result = make()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+def test_table_memory():
+    start = datetime(2024, 1, 1)
+
+    def timers():
+        for i in range(10_000):
+            yield Timer(
+                Id=100_000 + i,
+                UserId=i % 20,
+                User=f"user-{i % 20}",
+                Start=start + timedelta(minutes=i),
+                Stop=start + timedelta(minutes=i + 30),
+                Description=f"Worked on ticket {i} with the customer.",
+            )
+
+    models = allocated(lambda: list(timers()))
+    table = allocated(lambda: TimerTable.from_models(timers()))
+
+    # About 425 bytes per timer in a list, 115 in a table.
+    assert table * 3 < models
+
+
 @pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
 def test_list_not_found(client, respx_mock):
     route = respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/timer/search/").mock(
@@ -125,6 +179,26 @@ def test_create_failed(client, respx_mock):
     assert route.call_count == 1
 
 
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_create_many(client, respx_mock):
+    responses = [
+        httpx.Response(200, json={"Success": True, "Id": 1, "Message": ""}),
+        httpx.Response(500, text="Internal Server Error"),
+        httpx.Response(200, json={"Success": False, "Id": -1, "Message": "Nope"}),
+    ]
+    route = respx_mock.post(f"https://{tests.VISOMA_HOST}/api2/timer/").mock(
+        side_effect=lambda request: responses[json.loads(request.content)["UserId"]]
+    )
+    requests = (TimerRequest.from_dict(TIMER_REQUEST | {"UserId": i}) for i in range(3))
+
+    actual = client.timers.create_many(requests, concurrency=2)
+
+    assert route.call_count == 3
+    assert isinstance(actual[0], VisomaResponse)
+    assert isinstance(actual[1], HttpError)
+    assert isinstance(actual[2], ValueError)
+
+
 @pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
 def test_delete(client, respx_mock):
     route = respx_mock.delete(f"https://{tests.VISOMA_HOST}/api2/timer/1").mock(
@@ -182,3 +256,229 @@ def test_close_from_object(client, respx_mock):
     timer = Timer.from_dict(FIRST_TIMER)
     client.timers.close(timer)
     assert route.call_count == 1
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_close_error(client, respx_mock):
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/timer/close/id/1").mock(
+        httpx.Response(500, text="Internal Server Error")
+    )
+
+    with pytest.raises(HttpError, match="500: Internal Server Error"):
+        client.timers.close(1)
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_delete_many(client, respx_mock):
+    respx_mock.delete(f"https://{tests.VISOMA_HOST}/api2/timer/1").mock(
+        httpx.Response(200, json={"Success": True, "Id": 1, "Message": ""})
+    )
+    respx_mock.delete(f"https://{tests.VISOMA_HOST}/api2/timer/2").mock(
+        httpx.Response(200, json={"Success": False, "Id": 2, "Message": "Locked"})
+    )
+    respx_mock.delete(f"https://{tests.VISOMA_HOST}/api2/timer/3").mock(
+        httpx.Response(404, text="Not Found")
+    )
+
+    timer = Timer.from_dict(FIRST_TIMER)
+    actual = client.timers.delete_many([timer, 2, 3], concurrency=2)
+
+    assert actual == [
+        Outcome(1, True, ""),
+        Outcome(2, False, "Locked"),
+        Outcome(3, False, "404: Not Found"),
+    ]
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_close_many(client, respx_mock):
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/timer/close/id/1").mock(
+        httpx.Response(302, text="<html>Redirect</html>")
+    )
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/timer/close/id/2").mock(
+        httpx.Response(500, text="Internal Server Error")
+    )
+
+    actual = client.timers.close_many([1, 2])
+
+    assert actual == [
+        Outcome(1, True, ""),
+        Outcome(2, False, "500: Internal Server Error"),
+    ]
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_iter(client, respx_mock):
+    route = respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/timer/search/").mock(
+        httpx.Response(200, json=[FIRST_TIMER, SECOND_TIMER])
+    )
+
+    actual = client.timers.iter(limit=10)
+
+    assert route.call_count == 0
+    assert next(actual).Description == "The first test timer."
+    assert next(actual).Description == "The second test timer."
+    assert list(actual) == []
+    assert route.calls.last.request.url.params["params[QueryLimit]"] == "10"
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_iter_not_found(client, respx_mock):
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/timer/search/").mock(
+        httpx.Response(200, json={"Message": "No Timer found"})
+    )
+
+    with pytest.raises(ValueError, match="No Timer found"):
+        list(client.timers.iter())
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_iter_http_error(client, respx_mock):
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/timer/search/").mock(
+        httpx.Response(500, text="Server error")
+    )
+
+    with pytest.raises(HttpError, match="500: Server error"):
+        list(client.timers.iter())
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_scan(client, respx_mock):
+    def search(request):
+        params = request.url.params
+        if params["params[startfrom]"] == "2024-01-01":
+            return httpx.Response(200, json=[FIRST_TIMER])
+        if params["params[startfrom]"] == "2024-02-01":
+            return httpx.Response(200, json=[SECOND_TIMER])
+        return httpx.Response(200, json={"Message": "No Timer found"})
+
+    route = respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/timer/search/").mock(
+        side_effect=search
+    )
+
+    actual = client.timers.scan("2024-01-01", "2024-02-14", step=31)
+
+    assert sorted(timer.Id for timer in actual) == [1, 2]
+    assert route.call_count == 2
+    assert route.calls[0].request.url.params["params[QueryLimit]"] == "500"
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_scan_raises_other_messages(client, respx_mock):
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/timer/search/").mock(
+        httpx.Response(200, json={"Message": "Invalid filter"})
+    )
+
+    with pytest.raises(ValueError, match="Invalid filter"):
+        list(client.timers.scan(1, 10))
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_scan_splits_full_windows(client, respx_mock):
+    def search(request):
+        params = request.url.params
+        if params["params[idfrom]"] == "1" and params["params[idto]"] == "2":
+            return httpx.Response(200, json=[FIRST_TIMER, SECOND_TIMER])
+        if params["params[idfrom]"] == "1":
+            return httpx.Response(200, json=[FIRST_TIMER])
+        return httpx.Response(200, json=[SECOND_TIMER])
+
+    route = respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/timer/search/").mock(
+        side_effect=search
+    )
+
+    actual = client.timers.scan(1, 2, limit=2)
+
+    assert sorted(timer.Id for timer in actual) == [1, 2]
+    assert route.call_count == 3
+
+
+@pytest.mark.anyio
+async def test_async_visoma_client(async_client):
+    manager = async_client.timers
+    assert isinstance(manager, AsyncTimersManager)
+
+
+@pytest.mark.anyio
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+async def test_async_get(async_client, respx_mock):
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/timer/search/").mock(
+        httpx.Response(200, json=[FIRST_TIMER])
+    )
+
+    actual = await async_client.timers.get({"id": "1"})
+    assert isinstance(actual, Timer)
+    assert actual.to_dict() == FIRST_TIMER
+
+
+@pytest.mark.anyio
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+async def test_async_list(async_client, respx_mock):
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/timer/search/").mock(
+        httpx.Response(200, json=[FIRST_TIMER, SECOND_TIMER])
+    )
+
+    actual = await async_client.timers.list()
+
+    assert len(actual) == 2
+    assert isinstance(actual[1], Timer)
+    assert actual[1].Description == "The second test timer."
+
+
+@pytest.mark.anyio
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+async def test_async_list_not_found(async_client, respx_mock):
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/timer/search/").mock(
+        httpx.Response(200, json={"Message": "No Timer found"})
+    )
+
+    with pytest.raises(ValueError, match="No Timer found"):
+        await async_client.timers.list()
+
+
+@pytest.mark.anyio
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+async def test_async_create(async_client, respx_mock):
+    route = respx_mock.post(f"https://{tests.VISOMA_HOST}/api2/timer/").mock(
+        httpx.Response(200, json={"Success": True, "Id": 1, "Message": ""})
+    )
+
+    actual = await async_client.timers.create(TimerRequest.from_dict(TIMER_REQUEST))
+
+    assert isinstance(actual, VisomaResponse)
+    assert json.loads(route.calls.last.request.content) == TIMER_REQUEST
+
+
+@pytest.mark.anyio
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+async def test_async_delete(async_client, respx_mock):
+    route = respx_mock.delete(f"https://{tests.VISOMA_HOST}/api2/timer/1").mock(
+        httpx.Response(200, json={"Success": True, "Id": 1, "Message": ""})
+    )
+
+    actual = await async_client.timers.delete(1)
+
+    assert isinstance(actual, VisomaResponse)
+    assert route.call_count == 1
+
+
+@pytest.mark.anyio
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+async def test_async_close(async_client, respx_mock):
+    route = respx_mock.get(f"https://{tests.VISOMA_HOST}/timer/close/id/1").mock(
+        httpx.Response(302)
+    )
+
+    await async_client.timers.close(1)
+    assert route.call_count == 1
+
+
+@pytest.mark.anyio
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+async def test_async_iter(async_client, respx_mock):
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/timer/search/").mock(
+        httpx.Response(200, json=[FIRST_TIMER, SECOND_TIMER])
+    )
+
+    actual = [timer.Id async for timer in async_client.timers.iter()]
+    assert actual == [1, 2]
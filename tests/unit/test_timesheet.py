@@ -0,0 +1,131 @@
+from datetime import date
+import httpx
+import pytest
+
+from visoma.timers import Timer
+from visoma.timers import TimerTable
+from visoma.timesheet import TimerColumns
+import tests
+
+np = pytest.importorskip("numpy")
+
+TIMERS_URL = f"https://{tests.VISOMA_HOST}/api2/timer/search/"
+
+
+def timer(idx, day, hours, user_id=1, billable=None, **kwargs):
+    minutes = int(hours * 60)
+    return {
+        "Id": idx,
+        "UserId": user_id,
+        "User": f"user-{user_id}",
+        "Start": f"{day} 08:00:00",
+        "Stop": f"{day} {8 + minutes // 60:02}:{minutes % 60:02}:00",
+        "Description": f"Timer {idx}",
+        "Billable": billable,
+    } | kwargs
+
+
+TIMERS = [
+    # Monday and Tuesday of week 2 of 2024.
+    timer(1, "2024-01-08", 2, user_id=1, billable=True, TicketId=10),
+    timer(2, "2024-01-09", 1.5, user_id=2, billable=False, TicketId=10),
+    timer(3, "2024-01-09", 4, user_id=1, billable=True),
+    # Sunday of week 2, then Monday of week 3.
+    timer(4, "2024-01-14", 0.5, user_id=2),
+    timer(5, "2024-01-15", 3, user_id=1, billable=False, TypeId=4),
+]
+
+
+@pytest.fixture
+def columns():
+    return TimerColumns.from_timers([Timer.from_dict(t) for t in TIMERS])
+
+
+def test_from_timers(columns):
+    assert len(columns) == 5
+    assert columns.hours.tolist() == [2, 1.5, 4, 0.5, 3]
+    assert columns.ticket_id.tolist() == [10, 10, -1, -1, -1]
+    assert columns.billable.tolist() == [True, False, True, False, False]
+    assert columns.start.dtype == np.int64
+
+
+def test_from_table(columns):
+    table = TimerTable.from_models(Timer.from_dict(t) for t in TIMERS)
+    from_table = TimerColumns.from_timers(table)
+
+    for name in ("start", "stop", "user_id", "ticket_id", "type_id", "billable"):
+        assert getattr(from_table, name).tolist() == getattr(columns, name).tolist()
+
+
+def test_from_iterator(columns):
+    # Timers which stream in, like those of a scan, are collected in a table.
+    from_iterator = TimerColumns.from_timers(Timer.from_dict(t) for t in TIMERS)
+
+    for name in ("start", "stop", "user_id", "ticket_id", "type_id", "billable"):
+        assert getattr(from_iterator, name).tolist() == getattr(columns, name).tolist()
+
+
+def test_summarize_by_user(columns):
+    assert columns.summarize("user") == {
+        1: {"count": 3, "hours": 9.0, "billable_hours": 6.0, "billable_ratio": 6 / 9},
+        2: {"count": 2, "hours": 2.0, "billable_hours": 0.0, "billable_ratio": 0.0},
+    }
+
+
+def test_summarize_by_ticket_and_type(columns):
+    assert columns.summarize("ticket")[None]["hours"] == 7.5
+    assert columns.summarize("ticket")[10]["hours"] == 3.5
+    assert list(columns.summarize("type")) == [None, 4]
+
+
+def test_summarize_rollups(columns):
+    days = columns.summarize("day")
+    assert list(days) == [
+        date(2024, 1, 8),
+        date(2024, 1, 9),
+        date(2024, 1, 14),
+        date(2024, 1, 15),
+    ]
+    assert days[date(2024, 1, 9)]["hours"] == 5.5
+
+    weeks = columns.summarize("week")
+    assert {week: report["hours"] for week, report in weeks.items()} == {
+        date(2024, 1, 8): 8.0,
+        date(2024, 1, 15): 3.0,
+    }
+
+
+def test_summarize_by_several_keys(columns):
+    report = columns.summarize("user,week")
+    assert list(report) == [
+        (1, date(2024, 1, 8)),
+        (1, date(2024, 1, 15)),
+        (2, date(2024, 1, 8)),
+    ]
+    assert report[(1, date(2024, 1, 8))]["hours"] == 6.0
+    assert columns.summarize(["user", "week"]) == report
+
+
+def test_summarize_errors_and_empty(columns):
+    with pytest.raises(ValueError, match="Group key"):
+        columns.summarize("month")
+    with pytest.raises(ValueError, match="at least one"):
+        columns.summarize(())
+
+    empty = TimerColumns.from_timers([])
+    assert empty.summarize(("user", "day")) == {}
+    assert empty.billable_ratio() == 0.0
+
+
+def test_billable_ratio(columns):
+    assert columns.billable_ratio() == pytest.approx(6 / 11)
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_timesheet_summarize(client, respx_mock):
+    respx_mock.get(TIMERS_URL).mock(return_value=httpx.Response(200, json=TIMERS[:2]))
+
+    report = client.timesheet.summarize("2024-01-08", "2024-01-09", by="ticket")
+    assert report == {
+        10: {"count": 2, "hours": 3.5, "billable_hours": 2.0, "billable_ratio": 2 / 3.5}
+    }
@@ -0,0 +1,59 @@
+from attrs import define
+import logging
+
+from visoma.http import handle_response
+from visoma.tracing import OMITTED
+from visoma.tracing import Payload
+from visoma.tracing import PayloadSampler
+
+
+@define
+class FakeResponse:
+    status_code: int
+    text: str
+
+
+def test_sampler_is_off_by_default(monkeypatch):
+    monkeypatch.delenv("VISOMA_LOG_PAYLOADS", raising=False)
+    sampler = PayloadSampler.from_env()
+    assert sampler("data") == OMITTED
+
+
+def test_sampler_from_env(monkeypatch):
+    monkeypatch.setenv("VISOMA_LOG_PAYLOADS", "1")
+    monkeypatch.setenv("VISOMA_LOG_PAYLOAD_MAX", "10")
+    sampler = PayloadSampler.from_env()
+    assert sampler("data") == Payload("data", 10)
+
+
+def test_sampler_from_invalid_env(monkeypatch, caplog):
+    monkeypatch.setenv("VISOMA_LOG_PAYLOADS", "all")
+    sampler = PayloadSampler.from_env()
+    assert sampler == PayloadSampler()
+    assert "Ignoring invalid payload logging settings" in caplog.text
+
+
+def test_payload_is_capped():
+    assert str(Payload("x" * 20, 10)) == "xxxxxxxxxx... (20 chars)"
+    assert str(Payload({"Id": 1}, 100)) == '{"Id": 1}'
+
+
+def test_payload_renders_list_items_up_to_cap():
+    payload = Payload([{"Id": i} for i in range(1000)], 30)
+    assert str(payload).startswith('[{"Id": 0}, {"Id": 1}, {"Id"')
+    assert str(payload).endswith("chars)")
+
+
+def test_handle_response_omits_payload(caplog):
+    with caplog.at_level(logging.DEBUG, logger="visoma.http"):
+        handle_response(FakeResponse(200, "<html>\nbody"), as_json=False)
+    assert OMITTED in caplog.text
+    assert "<html>" not in caplog.text
+
+
+def test_handle_response_logs_sampled_payload(caplog, monkeypatch):
+    monkeypatch.setattr("visoma.http.sample_payload", PayloadSampler(rate=1))
+    with caplog.at_level(logging.DEBUG, logger="visoma.http"):
+        handle_response(FakeResponse(200, "<html>\nbody"), as_json=False)
+    assert "Response: <html>" in caplog.text
+    assert "body" not in caplog.text
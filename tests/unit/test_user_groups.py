@@ -2,6 +2,7 @@ import httpx
 import pytest
 
 from visoma.user_groups import UserGroup
+from visoma.user_groups import AsyncUserGroupsManager
 from visoma.user_groups import UserGroupsManager
 import tests
 
@@ -80,3 +81,35 @@ def test_list_not_found(client, respx_mock):
     with pytest.raises(ValueError, match="No User Group found"):
         client.user_groups.list()
     assert route.call_count == 1
+
+
+@pytest.mark.anyio
+async def test_async_visoma_client(async_client):
+    manager = async_client.user_groups
+    assert isinstance(manager, AsyncUserGroupsManager)
+
+
+@pytest.mark.anyio
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+async def test_async_get(async_client, respx_mock):
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/usergroups/search/").mock(
+        httpx.Response(200, json=[FIRST_USER_GROUP])
+    )
+
+    actual = await async_client.user_groups.get({"id": "1"})
+    assert isinstance(actual, UserGroup)
+    assert actual.to_dict() == FIRST_USER_GROUP
+
+
+@pytest.mark.anyio
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+async def test_async_list(async_client, respx_mock):
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/usergroups/search/").mock(
+        httpx.Response(200, json=[FIRST_USER_GROUP, SECOND_USER_GROUP])
+    )
+
+    actual = await async_client.user_groups.list()
+
+    assert len(actual) == 2
+    assert isinstance(actual[1], UserGroup)
+    assert actual[1].title == "User Group 2"
@@ -2,6 +2,7 @@ import httpx
 import pytest
 
 from visoma.users import User
+from visoma.users import AsyncUsersManager
 from visoma.users import UsersManager
 import tests
 
@@ -88,3 +89,35 @@ def test_list_not_found(client, respx_mock):
     with pytest.raises(ValueError, match="No User found"):
         client.users.list()
     assert route.call_count == 1
+
+
+@pytest.mark.anyio
+async def test_async_visoma_client(async_client):
+    manager = async_client.users
+    assert isinstance(manager, AsyncUsersManager)
+
+
+@pytest.mark.anyio
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+async def test_async_get(async_client, respx_mock):
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/user/search/").mock(
+        httpx.Response(200, json=[FIRST_USER])
+    )
+
+    actual = await async_client.users.get({"id": "1"})
+    assert isinstance(actual, User)
+    assert actual.to_dict() == FIRST_USER
+
+
+@pytest.mark.anyio
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+async def test_async_list(async_client, respx_mock):
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/api2/user/search/").mock(
+        httpx.Response(200, json=[FIRST_USER, SECOND_USER])
+    )
+
+    actual = await async_client.users.list()
+
+    assert len(actual) == 2
+    assert isinstance(actual[1], User)
+    assert actual[1].username == "user-2"
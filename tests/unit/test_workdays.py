@@ -1,6 +1,10 @@
+from datetime import date
 import httpx
 import pytest
 
+from visoma.lib import Outcome
+from visoma.workdays import AsyncWorkdaysManager
+from visoma.workdays import WorkCalendar
 from visoma.workdays import WorkdaysManager
 from visoma.workdays import extract_workday_id_from_html
 import tests
@@ -43,3 +47,83 @@ def test_close_id_not_found(client, respx_mock):
     with pytest.raises(ValueError, match="Could not extract workday ID"):
         client.workdays.close("2024-01-08")
     assert route_1.call_count == 1
+
+
+def test_calendar_skips_weekends_and_holidays():
+    calendar = WorkCalendar(holidays={date(2024, 1, 1)})
+
+    actual = list(calendar.workdays(date(2023, 12, 29), date(2024, 1, 8)))
+
+    assert actual == [
+        date(2023, 12, 29),
+        date(2024, 1, 2),
+        date(2024, 1, 3),
+        date(2024, 1, 4),
+        date(2024, 1, 5),
+        date(2024, 1, 8),
+    ]
+
+
+def test_calendar_from_file(tmp_path):
+    path = tmp_path / "holidays.txt"
+    path.write_text("# New Year\n2024-01-01\n\n2024-12-25  # Christmas\n")
+
+    calendar = WorkCalendar.from_file(path)
+
+    assert calendar.holidays == {date(2024, 1, 1), date(2024, 12, 25)}
+
+
+def test_calendar_from_env(tmp_path, monkeypatch):
+    path = tmp_path / "holidays.txt"
+    path.write_text("2024-01-01\n")
+    monkeypatch.setenv("VISOMA_HOLIDAYS", str(path))
+
+    assert not WorkCalendar.from_env().is_workday(date(2024, 1, 1))
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+def test_close_range(client, respx_mock):
+    for day, idx in (("2024-01-05", 5), ("2024-01-08", 8)):
+        respx_mock.get(f"https://{tests.VISOMA_HOST}/workend/index/date/{day}").mock(
+            httpx.Response(200, text=f"<html>/workend/submitworkend/id/{idx}/</html>")
+        )
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/workend/submitworkend/id/5").mock(
+        httpx.Response(302)
+    )
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/workend/index/date/2024-01-09").mock(
+        httpx.Response(200, text="<html></html>")
+    )
+    respx_mock.get(f"https://{tests.VISOMA_HOST}/workend/submitworkend/id/8").mock(
+        httpx.Response(500, text="Internal Server Error")
+    )
+
+    calendar = WorkCalendar(holidays={date(2024, 1, 4)})
+    actual = client.workdays.close_range("2024-01-04", "2024-01-09", calendar)
+
+    assert list(actual) == [date(2024, 1, 5), date(2024, 1, 8), date(2024, 1, 9)]
+    assert actual[date(2024, 1, 5)] == Outcome(5, True)
+    assert actual[date(2024, 1, 8)] == Outcome(-1, False, "500: Internal Server Error")
+    assert not actual[date(2024, 1, 9)].Success
+    assert "Could not extract workday ID" in actual[date(2024, 1, 9)].Message
+
+
+@pytest.mark.anyio
+async def test_async_visoma_client(async_client):
+    manager = async_client.workdays
+    assert isinstance(manager, AsyncWorkdaysManager)
+
+
+@pytest.mark.anyio
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=True)
+async def test_async_close(async_client, respx_mock):
+    route_1 = respx_mock.get(
+        f"https://{tests.VISOMA_HOST}/workend/index/date/2024-01-08"
+    ).mock(httpx.Response(200, text="<html>/workend/submitworkend/id/1/</html>"))
+
+    route_2 = respx_mock.get(
+        f"https://{tests.VISOMA_HOST}/workend/submitworkend/id/1"
+    ).mock(httpx.Response(302))
+
+    await async_client.workdays.close("2024-01-08")
+    assert route_1.call_count == 1
+    assert route_2.call_count == 1